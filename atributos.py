@@ -0,0 +1,164 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# === Padrões ===
+MARCAS = [
+    "lg", "samsung", "tcl", "philco", "sony", "philips", "aoc", "multilaser", "semp", "toshiba",
+    "hisense", "panasonic", "britania", "xiaomi", "apple", "motorola", "jbl", "positivo", "dell",
+    "lenovo", "acer", "asus", "hp", "electrolux", "brastemp", "consul", "mondial", "arno", "midea",
+]
+CORES = {
+    "preto": "preto", "preta": "preto", "black": "preto",
+    "branco": "branco", "branca": "branco", "white": "branco",
+    "prata": "prata", "silver": "prata", "inox": "inox",
+    "cinza": "cinza", "grafite": "cinza", "titanium": "cinza",
+    "azul": "azul", "blue": "azul",
+    "vermelho": "vermelho", "vermelha": "vermelho", "red": "vermelho",
+    "rosa": "rosa", "pink": "rosa",
+    "dourado": "dourado", "dourada": "dourado", "gold": "dourado",
+    "verde": "verde", "green": "verde",
+}
+
+_RE_MARCA = r"\b(?P<marca>" + "|".join(MARCAS) + r")\b"
+_RE_COR = r"\b(?P<cor>" + "|".join(CORES) + r")\b"
+# Código do modelo: letras e dígitos misturados, 5+ caracteres (50tu801c0sa, un43t5300, kd-55x75k)
+_RE_CODIGO = r"\b(?=[a-z0-9-]*\d)(?=[a-z0-9-]*[a-z])[a-z0-9][a-z0-9-]{3,}[a-z0-9]\b"
+# Medidas, unidades e siglas técnicas com cara de código (1920x1080, 128gb, hdr10, wifi6...)
+_RE_NAO_CODIGO = re.compile(
+    r"\d+(?:x\d+|v|w|k|hz|gb|tb|mb|mah|pol|mm|cm|kg|ml|btus?)"
+    r"|(?:hdr|hdmi|wifi|ddr|usb|ram|ip|ipx|bt|dts)\d+(?:plus)?"
+)
+_RE_POLEGADAS = (
+    r"\b(?P<p1>\d{2,3})(?:[.,]\d)?\s*(?:\"|''|pol\b|polegadas\b|pulgadas\b)"
+    r"|\btv\s+(?:de\s+)?(?:[a-z]+\s+){0,2}(?P<p2>\d{2,3})\b"          # "smart tv lg 50"
+)
+_RE_VOLTAGEM = r"\b(?P<volt>110|127|220|bivolt)\s*v?\b"
+_RE_ANO = r"\b(?P<ano>20[0-3]\d)\b"
+
+
+def _limpar(serie):
+    """Minúsculas, sem acentos, com as aspas tipográficas (polegadas) trocadas por "."""
+    return (
+        serie.astype("string")
+        .fillna("")
+        .str.replace(r"[”“″]", '"', regex=True)
+        .str.lower()
+        .str.normalize("NFKD")
+        .str.encode("ascii", errors="ignore")
+        .str.decode("ascii")
+    )
+
+
+def _codigos(lista):
+    return frozenset(c.replace("-", "") for c in lista if not _RE_NAO_CODIGO.fullmatch(c))
+
+
+def _extrair(titulos):
+    texto = _limpar(titulos)
+    polegadas = texto.str.extract(_RE_POLEGADAS)
+    return pd.DataFrame({
+        "marcas": texto.str.findall(_RE_MARCA).map(frozenset),
+        "codigos": texto.str.findall(_RE_CODIGO).map(_codigos),
+        "polegadas": pd.to_numeric(polegadas["p1"].fillna(polegadas["p2"]), errors="coerce").astype("Int64"),
+        "voltagem": texto.str.extract(_RE_VOLTAGEM)["volt"].replace({"110": "127"}),
+        "cor": texto.str.extract(_RE_COR)["cor"].map(CORES),
+        "ano": pd.to_numeric(texto.str.extract(_RE_ANO)["ano"], errors="coerce").astype("Int64"),
+        "compacto": texto.str.replace(r"[^a-z0-9]", "", regex=True),
+    })
+
+
+def extrair_atributos(titulos):
+    """
+    Marcas citadas e códigos de modelo (frozensets), polegadas, voltagem
+    (127/220/bivolt), cor e ano de cada título, mais o título compacto (só [a-z0-9]), numa linha
+    por título e com o mesmo índice. As regex rodam uma vez por título
+    distinto (pd.factorize), como em normalizacao.
+    """
+    titulos = pd.Series(titulos)
+    codigos, unicos = pd.factorize(titulos, use_na_sentinel=False)
+    attrs = _extrair(pd.Series(unicos, dtype=object)).take(codigos)
+    attrs.index = titulos.index
+    return attrs
+
+
+# === Regras por par ===
+def _difere(a, b):
+    """Os dois lados têm o atributo e os valores são diferentes."""
+    return (a.notna() & b.notna() & (a.astype(object) != b.astype(object))).to_numpy(dtype=bool)
+
+
+def _casa(codigo, codigos_concorrente, compacto):
+    return codigo in compacto or any(codigo in c or (len(c) >= 5 and c in codigo) for c in codigos_concorrente)
+
+
+def _casamento_codigos(codigos_principal, codigos_concorrente, compacto_concorrente):
+    """
+    Por par: (algum código do principal aparece no concorrente, o código mais
+    longo do principal, que costuma ser o do modelo, está entre os códigos do
+    concorrente). "Aparece" aceita parcial (um contém o outro, ou dentro do
+    título compacto) e só evita o NÃO; para o SIM o código tem de ser igual.
+    """
+    algum, exato = [], []
+    for cp, cc, compacto in zip(codigos_principal, codigos_concorrente, compacto_concorrente):
+        algum.append(any(_casa(p, cc, compacto) for p in cp))
+        exato.append(bool(cp) and max(cp, key=len) in cc)
+    return np.array(algum, dtype=bool), np.array(exato, dtype=bool)
+
+
+def _marcas_conflitam(marcas_principal, marcas_concorrente):
+    """Os dois títulos citam marca e nenhuma em comum ("Alexa Apple Airplay" numa TV LG não conta)."""
+    return np.array(
+        [bool(mp) and bool(mc) and not (mp & mc) for mp, mc in zip(marcas_principal, marcas_concorrente)],
+        dtype=bool,
+    )
+
+
+def decidir_por_regras(principais, concorrentes, verbose=True):
+    """
+    Decide sem IA os pares óbvios e devolve uma Series (índice dos
+    concorrentes) com "SIM", "NÃO" ou None (ambíguo, vai para a IA):
+    - NÃO: nenhuma marca em comum (os dois citando alguma), polegadas
+      diferentes, voltagens incompatíveis (bivolt serve para as duas), cores
+      ou anos diferentes, ou o principal tem código de modelo e o concorrente
+      não traz nenhum deles, nem parcial;
+    - SIM: código do modelo (o mais longo do principal) igual a um código do
+      concorrente, polegadas iguais (ou ausentes nos dois) e nenhum conflito
+      acima. Código só parecido ("50tu801c" x "50tu801c0sa") fica para a IA.
+    Atributos e regras rodam uma vez por título e por par distintos.
+    """
+    concorrentes = pd.Series(concorrentes)
+    cod_p, unicos_p = pd.factorize(pd.Series(list(principais), dtype=object), use_na_sentinel=False)
+    cod_c, unicos_c = pd.factorize(concorrentes, use_na_sentinel=False)
+    pares, unicos_pares = pd.factorize(cod_p.astype(np.int64) * max(len(unicos_c), 1) + cod_c)
+    ap = _extrair(pd.Series(unicos_p, dtype=object)).take(unicos_pares // max(len(unicos_c), 1)).reset_index(drop=True)
+    ac = _extrair(pd.Series(unicos_c, dtype=object)).take(unicos_pares % max(len(unicos_c), 1)).reset_index(drop=True)
+
+    volt_p, volt_c = ap["voltagem"], ac["voltagem"]
+    volt_conflito = _difere(volt_p, volt_c) & ~(volt_p.eq("bivolt") | volt_c.eq("bivolt")).to_numpy(dtype=bool)
+    conflito = (
+        _marcas_conflitam(ap["marcas"], ac["marcas"])
+        | _difere(ap["polegadas"], ac["polegadas"])
+        | volt_conflito
+        | _difere(ap["cor"], ac["cor"])
+        | _difere(ap["ano"], ac["ano"])
+    )
+    principal_tem_codigo = (ap["codigos"].map(len) > 0).to_numpy(dtype=bool)
+    algum_codigo, codigo_modelo = _casamento_codigos(ap["codigos"], ac["codigos"], ac["compacto"])
+    mesmas_polegadas = (
+        (ap["polegadas"].isna() & ac["polegadas"].isna()) | ap["polegadas"].eq(ac["polegadas"]).fillna(False)
+    ).to_numpy(dtype=bool)
+
+    nao = conflito | (principal_tem_codigo & ~algum_codigo)
+    sim = ~nao & codigo_modelo & mesmas_polegadas
+    por_par = np.select([nao, sim], ["NÃO", "SIM"], default=None).astype(object)
+    decisao = pd.Series(por_par[pares] if len(pares) else [], index=concorrentes.index, dtype=object)
+
+    if verbose and len(decisao):
+        n_sim, n_nao = int(decisao.eq("SIM").sum()), int(decisao.eq("NÃO").sum())
+        print(
+            f"🧮 Regras: {n_sim + n_nao} de {len(decisao)} pares decididos sem IA "
+            f"({n_sim} SIM, {n_nao} NÃO); {len(decisao) - n_sim - n_nao} vão para a IA"
+        )
+    return decisao
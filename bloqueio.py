@@ -0,0 +1,116 @@
+import re
+from fnmatch import translate
+from urllib.parse import urlparse
+
+# === Configurações ===
+# A extração só precisa do DOM e dos <script type="application/ld+json">,
+# que já vêm no HTML do documento. O resto é peso morto.
+TIPOS_BLOQUEADOS = {"image", "media", "font", "stylesheet", "texttrack", "eventsource", "manifest"}
+
+HOSTS_BLOQUEADOS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "nr-data.net",
+    "newrelic.com",
+    "criteo.com",
+    "criteo.net",
+]
+
+PADROES_BLOQUEADOS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.webp*", "*.gif*", "*.svg*", "*.avif*",
+    "*.woff*", "*.ttf*", "*.mp4*", "*.webm*",
+    "*/tracks*", "*/tracking/*", "*/melidata/*",
+]
+
+# Requisições abortadas não têm tamanho conhecido: usamos médias típicas
+# de uma página de produto do Mercado Livre. O total é uma estimativa
+# (stats["bytes_estimados"]), não uma medida.
+TAMANHO_ESTIMADO = {
+    "image": 35_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 25_000,
+    "xhr": 3_000,
+    "fetch": 3_000,
+}
+TAMANHO_PADRAO = 5_000
+
+
+def _host_bloqueado(host, hosts):
+    return any(host == h or host.endswith("." + h) for h in hosts)
+
+
+def novo_stats():
+    return {
+        "bloqueadas": 0,
+        "liberadas": 0,
+        "bytes_estimados": 0,
+        "por_motivo": {"tipo": 0, "host": 0, "padrao": 0},
+        "por_tipo": {},
+    }
+
+
+async def bloquear_recursos(context, tipos=TIPOS_BLOQUEADOS, hosts=HOSTS_BLOQUEADOS, padroes=PADROES_BLOQUEADOS, stats=None):
+    """
+    Instala no context um filtro de rotas que aborta requisições pelo tipo
+    de recurso, pelo host ou por padrão de URL (glob). Devolve o dicionário
+    de contadores da execução, atualizado conforme as páginas navegam.
+    Passe o mesmo `stats` para vários contexts para somar os contadores.
+    """
+    tipos = set(tipos)
+    hosts = list(hosts)
+    regex_padroes = re.compile("|".join(translate(p) for p in padroes)) if padroes else None
+
+    if stats is None:
+        stats = novo_stats()
+
+    async def filtrar(route):
+        req = route.request
+        tipo = req.resource_type
+
+        motivo = None
+        if tipo in tipos:
+            motivo = "tipo"
+        elif _host_bloqueado(urlparse(req.url).hostname or "", hosts):
+            motivo = "host"
+        elif regex_padroes and tipo != "document" and regex_padroes.match(req.url):
+            motivo = "padrao"
+
+        if motivo is None:
+            stats["liberadas"] += 1
+            try:
+                await route.continue_()
+            except:
+                # Mesma corrida do abort(): a página fechou com a rota pendente
+                pass
+            return
+
+        stats["bloqueadas"] += 1
+        stats["bytes_estimados"] += TAMANHO_ESTIMADO.get(tipo, TAMANHO_PADRAO)
+        stats["por_motivo"][motivo] += 1
+        stats["por_tipo"][tipo] = stats["por_tipo"].get(tipo, 0) + 1
+        try:
+            await route.abort("blockedbyclient")
+        except:
+            # A página pode ter sido fechada enquanto a rota estava pendente
+            pass
+
+    await context.route("**/*", filtrar)
+    return stats
+
+
+def resumo_bloqueio(stats):
+    total = stats["bloqueadas"] + stats["liberadas"]
+    if not total:
+        return
+    pct = 100 * stats["bloqueadas"] / total
+    mb = stats["bytes_estimados"] / 1_000_000
+    tipos = ", ".join(f"{t}={n}" for t, n in sorted(stats["por_tipo"].items(), key=lambda kv: -kv[1]))
+    print(f"🚫 Requisições bloqueadas: {stats['bloqueadas']}/{total} ({pct:.0f}%) | ~{mb:.1f} MB economizados (estimativa por tipo) | {tipos}")
@@ -0,0 +1,161 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+# === Configurações ===
+CACHE_IA_PATH = Path("output") / "cache_ia.sqlite"
+TTL_PADRAO = 30 * 24 * 3600   # segundos
+MAX_ENTRADAS = 200_000
+FOLGA_DESCARTE = 0.1          # ao estourar, descarta até (1 - folga) × max_entradas, não só o excesso
+
+
+def normalizar_titulo(texto):
+    """Título comparável: Unicode NFKC, minúsculas e espaços colapsados."""
+    texto = unicodedata.normalize("NFKC", "" if texto is None else str(texto))
+    return re.sub(r"\s+", " ", texto).strip().lower()
+
+
+def versao_prompt(prompt):
+    """Versão do prompt = hash do template: qualquer mudança no texto invalida o cache."""
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+class CacheIA:
+    """
+    Cache em disco (SQLite) das respostas de comparar_com_ia, com chave no
+    par (principal, concorrente) normalizado + modelo + versão do prompt,
+    validade `ttl` em segundos e descarte LRU acima de `max_entradas`.
+    Pode ser usado de várias threads (pipeline roda a IA via to_thread).
+    Como em CachePaginas, o horário de acesso dos hits fica em memória e vai
+    para o disco no próximo guardar() e em resumo()/fechar().
+    """
+
+    def __init__(self, caminho=CACHE_IA_PATH, ttl=TTL_PADRAO, max_entradas=MAX_ENTRADAS):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.hits = 0
+        self.misses = 0
+        self._acessos = {}          # chave -> horário do último hit ainda não gravado
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.caminho, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS respostas (
+                chave    TEXT PRIMARY KEY,
+                resposta TEXT NOT NULL,
+                modelo   TEXT NOT NULL,
+                criado   REAL NOT NULL,
+                acessado REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_respostas_acessado ON respostas (acessado)")
+        self.conn.commit()
+        self.entradas = self._contar()
+
+    @staticmethod
+    def chave(principal, concorrente, modelo, prompt):
+        partes = (normalizar_titulo(principal), normalizar_titulo(concorrente), modelo or "", versao_prompt(prompt))
+        return hashlib.sha1("\x1f".join(partes).encode("utf-8")).hexdigest()
+
+    def buscar(self, principal, concorrente, modelo, prompt):
+        chave = self.chave(principal, concorrente, modelo, prompt)
+        agora = time.time()
+        with self._lock:
+            linha = self.conn.execute(
+                "SELECT resposta, criado FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None or agora - linha[1] > self.ttl:
+                self.misses += 1
+                return None
+            self._acessos[chave] = agora
+            self.hits += 1
+            return linha[0]
+
+    def guardar(self, principal, concorrente, modelo, prompt, resposta):
+        if resposta is None:
+            return
+        chave = self.chave(principal, concorrente, modelo, prompt)
+        agora = time.time()
+        with self._lock:
+            self._acessos.pop(chave, None)
+            self._gravar_acessos()
+            cur = self.conn.execute(
+                "UPDATE respostas SET resposta = ?, modelo = ?, criado = ?, acessado = ? WHERE chave = ?",
+                (resposta, modelo or "", agora, agora, chave),
+            )
+            if cur.rowcount == 0:
+                self.conn.execute(
+                    "INSERT INTO respostas (chave, resposta, modelo, criado, acessado) VALUES (?, ?, ?, ?, ?)",
+                    (chave, resposta, modelo or "", agora, agora),
+                )
+                self.entradas += 1
+                if self.entradas > self.max_entradas:
+                    self._descartar(agora)
+            self.conn.commit()
+
+    def _gravar_acessos(self):
+        """Aplica os acessos pendentes (sem commit; chamar com o lock)."""
+        if self._acessos:
+            self.conn.executemany(
+                "UPDATE respostas SET acessado = ? WHERE chave = ?", [(t, c) for c, t in self._acessos.items()]
+            )
+            self._acessos.clear()
+
+    def _commit_acessos(self):
+        with self._lock:
+            if self._acessos:
+                self._gravar_acessos()
+                self.conn.commit()
+
+    def _contar(self):
+        return self.conn.execute("SELECT COUNT(*) FROM respostas").fetchone()[0]
+
+    def _descartar(self, agora):
+        # Vencidos primeiro; depois os menos usados até caber na folga
+        self.conn.execute("DELETE FROM respostas WHERE criado < ?", (agora - self.ttl,))
+        excesso = self._contar() - int(self.max_entradas * (1 - FOLGA_DESCARTE))
+        if excesso > 0:
+            self.conn.execute(
+                "DELETE FROM respostas WHERE chave IN (SELECT chave FROM respostas ORDER BY acessado LIMIT ?)",
+                (excesso,),
+            )
+        self.entradas = self._contar()
+
+    def resumo(self):
+        self._commit_acessos()
+        total = self.hits + self.misses
+        if not total:
+            return
+        print(f"🧠 Cache da IA: {self.hits} hits / {self.misses} misses ({100 * self.hits / total:.0f}% hit)")
+
+    def fechar(self):
+        with _lock_abertos:
+            if _abertos.get(self.caminho) is self:
+                del _abertos[self.caminho]
+        self._commit_acessos()
+        self.conn.close()
+
+
+_abertos = {}
+_lock_abertos = threading.Lock()
+
+
+def abrir_cache_ia(caminho=CACHE_IA_PATH):
+    """
+    CacheIA compartilhado de `caminho`, aberto no primeiro uso: importar um
+    script não cria o arquivo, e todas as chamadas usam a mesma conexão.
+    """
+    caminho = Path(caminho)
+    with _lock_abertos:
+        if caminho not in _abertos:
+            _abertos[caminho] = CacheIA(caminho)
+        return _abertos[caminho]
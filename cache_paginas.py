@@ -0,0 +1,145 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from canonico import id_item
+
+# === Configurações ===
+CACHE_PATH = Path("output") / "cache_paginas.sqlite"
+TTL_PADRAO = 6 * 3600        # segundos
+MAX_ENTRADAS = 50_000
+FOLGA_DESCARTE = 0.1          # ao estourar, descarta até (1 - folga) × max_entradas, não só o excesso
+ESPERA_BLOQUEIO = 30.0        # segundos esperando outro processo liberar a escrita (processos.py)
+
+
+class CachePaginas:
+    """
+    Cache em disco (SQLite) dos registros extraídos das páginas de detalhe,
+    com chave no ID do anúncio (canonico.id_item), validade `ttl` em segundos
+    e descarte LRU quando passa de `max_entradas`. O horário de acesso dos
+    hits fica em memória e vai para o disco junto com o próximo guardar(),
+    antes de um descarte e em resumo()/fechar(): ler não faz commit.
+    Vários processos podem dividir o arquivo: a escrita espera até
+    ESPERA_BLOQUEIO pela vez e, se ainda assim o banco estiver travado, o
+    registro só não vai para o cache (o scrape segue).
+    """
+
+    def __init__(self, caminho=CACHE_PATH, ttl=TTL_PADRAO, max_entradas=MAX_ENTRADAS):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.hits = 0
+        self.misses = 0
+        self.falhas_escrita = 0
+        self._acessos = {}          # chave -> horário do último hit ainda não gravado
+
+        self.conn = sqlite3.connect(self.caminho, timeout=ESPERA_BLOQUEIO)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS paginas (
+                chave    TEXT PRIMARY KEY,
+                registro TEXT NOT NULL,
+                criado   REAL NOT NULL,
+                acessado REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_paginas_acessado ON paginas (acessado)")
+        self.conn.commit()
+        self.entradas = self._contar()
+
+    def buscar(self, link):
+        chave = id_item(link)
+        if chave is None:
+            self.misses += 1
+            return None
+
+        agora = time.time()
+        linha = self.conn.execute(
+            "SELECT registro, criado FROM paginas WHERE chave = ?", (chave,)
+        ).fetchone()
+        if linha is None or agora - linha[1] > self.ttl:
+            self.misses += 1
+            return None
+
+        self._acessos[chave] = agora
+        self.hits += 1
+        return json.loads(linha[0])
+
+    def guardar(self, link, registro):
+        chave = id_item(link)
+        if chave is None or registro is None:
+            return
+        agora = time.time()
+        texto = json.dumps(registro, ensure_ascii=False)
+        self._acessos.pop(chave, None)
+        try:
+            self._gravar_acessos()
+            cur = self.conn.execute(
+                "UPDATE paginas SET registro = ?, criado = ?, acessado = ? WHERE chave = ?", (texto, agora, agora, chave)
+            )
+            if cur.rowcount == 0:
+                self.conn.execute(
+                    "INSERT INTO paginas (chave, registro, criado, acessado) VALUES (?, ?, ?, ?)", (chave, texto, agora, agora)
+                )
+                self.entradas += 1
+                if self.entradas > self.max_entradas:
+                    self._descartar(agora)
+            self.conn.commit()
+        except sqlite3.OperationalError:
+            # "database is locked" depois de ESPERA_BLOQUEIO: perde só esta gravação
+            self.conn.rollback()
+            self.falhas_escrita += 1
+
+    def _gravar_acessos(self):
+        """Aplica os acessos pendentes (sem commit: quem chama decide)."""
+        if self._acessos:
+            self.conn.executemany(
+                "UPDATE paginas SET acessado = ? WHERE chave = ?", [(t, c) for c, t in self._acessos.items()]
+            )
+            self._acessos.clear()
+
+    def _commit_acessos(self):
+        if not self._acessos:
+            return
+        try:
+            self._gravar_acessos()
+            self.conn.commit()
+        except sqlite3.OperationalError:
+            # Horário de acesso é só para o LRU: sob disputa, pode ficar para trás
+            self.conn.rollback()
+            self._acessos.clear()
+            self.falhas_escrita += 1
+
+    def _contar(self):
+        return self.conn.execute("SELECT COUNT(*) FROM paginas").fetchone()[0]
+
+    def _descartar(self, agora):
+        """
+        Só roda quando a contagem passa de max_entradas e abre uma folga de
+        FOLGA_DESCARTE, para não contar nem apagar a cada inserção.
+        """
+        # Vencidos primeiro; depois os menos usados até caber na folga
+        self.conn.execute("DELETE FROM paginas WHERE criado < ?", (agora - self.ttl,))
+        excesso = self._contar() - int(self.max_entradas * (1 - FOLGA_DESCARTE))
+        if excesso > 0:
+            self.conn.execute(
+                "DELETE FROM paginas WHERE chave IN (SELECT chave FROM paginas ORDER BY acessado LIMIT ?)",
+                (excesso,),
+            )
+        self.entradas = self._contar()
+
+    def resumo(self):
+        self._commit_acessos()
+        total = self.hits + self.misses
+        if not total:
+            return
+        falhas = f" | {self.falhas_escrita} gravações perdidas (banco travado)" if self.falhas_escrita else ""
+        print(f"💾 Cache de páginas: {self.hits} hits / {self.misses} misses ({100 * self.hits / total:.0f}% hit){falhas}")
+
+    def fechar(self):
+        self._commit_acessos()
+        self.conn.close()
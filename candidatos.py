@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from cache_ia import normalizar_titulo
+
+# === Configurações ===
+TAMANHO_NGRAMA = 3
+TOP_K = 10
+SIMILARIDADE_MIN = 0.2        # cosseno mínimo para um candidato valer a IA
+TAMANHO_BLOCO = 1000          # principais por multiplicação esparsa
+FRACAO_MAX_DOCS = 0.3         # n-grama sem dígito presente em mais ofertas que isso é palavra comum e sai do índice
+
+
+def ngramas(titulo, n=TAMANHO_NGRAMA):
+    """N-gramas de caracteres do título normalizado, com borda " " nas pontas de cada palavra."""
+    texto = f" {normalizar_titulo(titulo)} "
+    return [texto[i:i + n] for i in range(len(texto) - n + 1)]
+
+
+class IndiceCandidatos:
+    """
+    Índice TF-IDF de n-gramas de caracteres sobre os títulos das ofertas
+    (matriz esparsa CSR, uma linha por título distinto, normalizada em L2).
+    buscar() multiplica um bloco de principais pela matriz transposta e
+    guarda só os top-k por principal, então o custo é proporcional aos
+    n-gramas em comum, não a principais × ofertas. N-gramas sem dígito
+    presentes em mais de `fracao_max_docs` dos títulos ("smart tv", "preto",
+    a marca dominante...) saem do índice: pesam pouco no cosseno e deixariam
+    o produto quase denso. Os com dígito ficam sempre, porque o código do
+    modelo de um SKU com muitas ofertas também passa dessa fração.
+    """
+
+    def __init__(self, titulos, n=TAMANHO_NGRAMA, fracao_max_docs=FRACAO_MAX_DOCS):
+        self.n = n
+        self.vocabulario = {}
+        self.titulos = list(titulos)
+        codigos, unicos = pd.factorize(pd.Series(self.titulos, dtype=object), use_na_sentinel=False)
+        contagens, _ = self._contar(unicos, crescer=True)
+
+        # idf suavizado, como no scikit-learn: log((1 + N) / (1 + df)) + 1
+        n_docs = contagens.shape[0]
+        df = np.bincount(contagens.indices, minlength=len(self.vocabulario))
+        self.idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+        self.idf_desconhecido = np.log(1 + n_docs) + 1.0
+        if n_docs >= 10:
+            self.idf[(df > fracao_max_docs * n_docs) & ~self._com_digito()] = 0.0
+        self._transposta = self._tfidf(contagens).T.tocsr()
+
+        # Ofertas de cada título distinto, em formato CSR (ordem original dentro do título)
+        self._ofertas = np.argsort(codigos, kind="stable")
+        self._inicio = np.concatenate([[0], np.cumsum(np.bincount(codigos, minlength=len(unicos)))])
+
+    def _com_digito(self):
+        """Máscara do vocabulário: n-gramas com algum dígito (código do modelo, polegadas, 4k...)."""
+        com_digito = np.zeros(len(self.vocabulario), dtype=bool)
+        for grama, coluna in self.vocabulario.items():
+            com_digito[coluna] = any(c.isdigit() for c in grama)
+        return com_digito
+
+    def _contar(self, titulos, crescer=False):
+        """
+        Matriz esparsa (títulos × n-gramas) com as contagens. N-grama novo só
+        entra no vocabulário com `crescer`; sem isso, devolve também o peso²
+        dos n-gramas desconhecidos de cada título (entram na norma).
+        """
+        linhas, colunas = [], []
+        desconhecidos = np.zeros(len(titulos))
+        for i, titulo in enumerate(titulos):
+            fora = {}
+            for grama in ngramas(titulo, self.n):
+                coluna = self.vocabulario.get(grama)
+                if coluna is None:
+                    if not crescer:
+                        fora[grama] = fora.get(grama, 0) + 1
+                        continue
+                    coluna = self.vocabulario[grama] = len(self.vocabulario)
+                linhas.append(i)
+                colunas.append(coluna)
+            desconhecidos[i] = sum(c * c for c in fora.values())
+        contagens = sparse.csr_matrix(
+            (np.ones(len(linhas), dtype=np.float32), (linhas, colunas)),
+            shape=(len(titulos), len(self.vocabulario)),
+        )
+        contagens.sum_duplicates()
+        return contagens, desconhecidos
+
+    def _tfidf(self, contagens, desconhecidos=None):
+        pesos = contagens.multiply(self.idf.astype(np.float32)).tocsr()
+        pesos.eliminate_zeros()
+        quadrados = pesos.multiply(pesos).sum(axis=1).A1
+        if desconhecidos is not None:
+            # N-grama que nenhuma oferta tem pesa o idf máximo (df = 0) e só aumenta a norma
+            quadrados = quadrados + desconhecidos * self.idf_desconhecido ** 2
+        normas = np.sqrt(quadrados)
+        normas[normas == 0] = 1.0
+        return sparse.diags(1.0 / normas).dot(pesos).tocsr().astype(np.float32)
+
+    def __len__(self):
+        return len(self.titulos)
+
+    def _expandir(self, titulos, valores):
+        """Cada título distinto vira todas as ofertas que o têm, com a mesma similaridade."""
+        return [
+            (int(oferta), float(valor))
+            for titulo, valor in zip(titulos, valores)
+            for oferta in self._ofertas[self._inicio[titulo]:self._inicio[titulo + 1]]
+        ]
+
+    def buscar(self, principais, k=TOP_K, minimo=SIMILARIDADE_MIN, tamanho_bloco=TAMANHO_BLOCO):
+        """
+        Para cada principal, os `k` títulos distintos mais parecidos (cosseno
+        >= `minimo`) e, deles, todas as ofertas: lista de (índice da oferta,
+        similaridade), do mais parecido para o menos. Uma lista por principal.
+        """
+        codigos, unicos = pd.factorize(pd.Series(list(principais), dtype=object), use_na_sentinel=False)
+        consultas = self._tfidf(*self._contar(unicos))
+        por_unico = []
+        for inicio in range(0, consultas.shape[0], tamanho_bloco):
+            bloco = consultas[inicio:inicio + tamanho_bloco].dot(self._transposta).tocsr()
+            for i in range(bloco.shape[0]):
+                ini, fim = bloco.indptr[i], bloco.indptr[i + 1]
+                titulos, valores = bloco.indices[ini:fim], bloco.data[ini:fim]
+                manter = valores >= minimo
+                titulos, valores = titulos[manter], valores[manter]
+                if len(valores) > k:
+                    topo = np.argpartition(-valores, k - 1)[:k]
+                    titulos, valores = titulos[topo], valores[topo]
+                ordem = np.argsort(-valores, kind="stable")
+                por_unico.append(self._expandir(titulos[ordem], valores[ordem]))
+        return [por_unico[c] for c in codigos]
+
+
+def parear_candidatos(principais, ofertas, coluna_titulo="concorrente", k=TOP_K, minimo=SIMILARIDADE_MIN):
+    """
+    Cruza um catálogo de principais com um DataFrame de ofertas (ou lista de
+    registros) e devolve só os pares candidatos: uma linha por (principal,
+    oferta dos top-k títulos), com as colunas da oferta, "principal" e
+    "similaridade". É esse DataFrame que segue para aplicar_ia_df; sem
+    "compatibilidade", para não ser tratado como resultado a retomar.
+    """
+    ofertas = ofertas if isinstance(ofertas, pd.DataFrame) else pd.DataFrame(list(ofertas))
+    principais = list(dict.fromkeys(principais))
+    # Principal e veredito de uma execução anterior (contra outro principal) não valem para o novo par
+    descartar = ["principal", "similaridade", "compatibilidade"]
+    colunas = [c for c in ofertas.columns if c not in descartar] + ["principal", "similaridade"]
+    if ofertas.empty or not principais:
+        return pd.DataFrame(columns=colunas)
+
+    indice = IndiceCandidatos(ofertas[coluna_titulo])
+    achados = indice.buscar(principais, k=k, minimo=minimo)
+
+    linhas = [j for lista in achados for j, _ in lista]
+    pares = ofertas.drop(columns=descartar, errors="ignore").iloc[linhas].reset_index(drop=True)
+    pares["principal"] = [p for p, lista in zip(principais, achados) for _ in lista]
+    pares["similaridade"] = [v for lista in achados for _, v in lista]
+
+    print(
+        f"🔎 Candidatos: {len(pares)} pares para {len(principais)} principais × {len(ofertas)} ofertas "
+        f"(em vez de {len(principais) * len(ofertas)}; top-{k}, cosseno ≥ {minimo})"
+    )
+    return pares[colunas]
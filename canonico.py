@@ -0,0 +1,85 @@
+import re
+
+# === IDs do Mercado Livre ===
+_RE_CATALOGO = re.compile(r"/p/(MLB\d+)", re.IGNORECASE)
+_RE_PRODUTO_USUARIO = re.compile(r"/up/(MLBU\d+)", re.IGNORECASE)
+_RE_ITEM = re.compile(r"\b(MLB)-?(\d{6,})", re.IGNORECASE)
+
+
+def id_item(link):
+    """
+    ID normalizado do anúncio a partir do link:
+    - produto de catálogo (/p/MLB52058084)  -> "p/MLB52058084"
+    - produto do usuário (/up/MLBU123)       -> "up/MLBU123"
+    - anúncio (MLB-1234567890-..., MLB1234)  -> "MLB1234567890"
+    Devolve None quando o link não traz nenhum ID.
+    """
+    if not link:
+        return None
+    caminho = link.split("?", 1)[0].split("#", 1)[0]
+
+    m = _RE_CATALOGO.search(caminho)
+    if m:
+        return f"p/{m.group(1).upper()}"
+    m = _RE_PRODUTO_USUARIO.search(caminho)
+    if m:
+        return f"up/{m.group(1).upper()}"
+    m = _RE_ITEM.search(caminho)
+    if m:
+        return f"MLB{m.group(2)}"
+    return None
+
+
+# === URLs canônicas ===
+def url_canonica(link):
+    """
+    Link sem parâmetros de rastreamento: descarta query e fragmento
+    (#position=..., tracking_id, searchVariation, ...) e normaliza o host.
+    Links sem ID (ex.: redirecionadores de anúncio patrocinado) dependem da
+    query para funcionar, então só perdem o fragmento.
+    """
+    if not link:
+        return link
+    caminho = link.split("#", 1)[0]
+    if id_item(caminho) is not None:
+        caminho = caminho.split("?", 1)[0]
+    esquema, sep, resto = caminho.partition("://")
+    if not sep:
+        return caminho.rstrip("/")
+    host, barra, path = resto.partition("/")
+    return f"{esquema.lower()}://{host.lower()}{barra}{path}".rstrip("/")
+
+
+def chave_canonica(link):
+    """ID do anúncio quando houver; senão a URL canônica."""
+    return id_item(link) or url_canonica(link)
+
+
+# === Deduplicação da listagem ===
+def deduplicar(itens):
+    """
+    Remove itens que apontam para o mesmo anúncio/produto de catálogo,
+    mantendo a primeira ocorrência (a posição mais alta na listagem).
+    O `href` de cada item passa a ser a URL canônica e `id` traz o ID.
+    Devolve (itens únicos, estatísticas).
+    """
+    vistos = set()
+    unicos = []
+    stats = {"entrada": len(itens), "unicos": 0, "removidos": 0, "por_id": 0, "por_url": 0}
+
+    for it in itens:
+        href = it.get("href")
+        ident = id_item(href)
+        chave = ident or url_canonica(href)
+        if not chave or chave in vistos:
+            stats["removidos"] += 1
+            stats["por_id" if ident else "por_url"] += 1
+            continue
+        vistos.add(chave)
+        unicos.append({**it, "href": url_canonica(href), "id": ident})
+
+    stats["unicos"] = len(unicos)
+    if stats["removidos"]:
+        print(f"🧹 Duplicados removidos: {stats['removidos']} de {stats['entrada']} "
+              f"(por ID: {stats['por_id']}, por URL: {stats['por_url']})")
+    return unicos, stats
@@ -0,0 +1,189 @@
+import asyncio
+import re
+from collections import deque
+from urllib.parse import urlparse
+
+from canonico import id_item
+from extracao import extrair_campos_pagina
+
+# === Configurações ===
+# Chamadas XHR/fetch da página de produto que trazem item, preço e vendedor.
+# Cada endpoint só preenche os campos que de fato traz, e sempre a partir do
+# nó do próprio anúncio (ver _no_do_anuncio): a página também busca
+# recomendações, parcelas e outros vendedores, com os mesmos nomes de chave.
+# "item": nó cujo id (ou catalog_product_id) é o do link aberto.
+# "vendedor": nó cujo id é o seller_id visto no nó do anúncio.
+ENDPOINTS_JSON = [
+    (r"api\.mercadolibre\.com/(sites/MLB/)?items", "item", ("titulo", "preco")),
+    (r"api\.mercadolibre\.com/users/", "vendedor", ("loja",)),
+    (r"mercadolivre\.com\.br/(p/)?api/|/pdp/api/", "item", ("titulo", "preco", "loja", "qtd_vendida")),
+]
+
+# Para cada campo do registro, as chaves procuradas no JSON, em ordem de
+# preferência. A busca é em largura: a ocorrência mais rasa vence.
+CHAVES = {
+    "titulo": ("title", "name"),
+    "preco": ("price", "amount"),
+    "loja": ("nickname", "seller_name", "store_name", "official_store_name"),
+    "qtd_vendida": ("sold_quantity", "sold_quantity_text"),
+}
+OBRIGATORIOS = ("titulo", "preco", "loja")
+_RE_ID_ANUNCIO = re.compile(r"MLBU?\d+")
+
+
+def _e_preco(valor):
+    if isinstance(valor, bool):
+        return False
+    if isinstance(valor, (int, float)):
+        return valor > 0
+    return isinstance(valor, str) and bool(re.fullmatch(r"\s*\d+([.,]\d+)*\s*", valor))
+
+
+def _valido(campo, valor):
+    if valor is None or valor == "":
+        return False
+    if campo == "preco":
+        return _e_preco(valor)
+    if campo == "qtd_vendida":
+        return isinstance(valor, (int, str)) and not isinstance(valor, bool)
+    return isinstance(valor, str)
+
+
+def _nos(payload, pular=None):
+    """Dicionários do payload em largura; não desce nos que `pular` recusa."""
+    fila = deque([payload])
+    while fila:
+        no = fila.popleft()
+        if isinstance(no, dict):
+            if no is not payload and pular and pular(no):
+                continue
+            yield no
+            fila.extend(v for v in no.values() if isinstance(v, (dict, list)))
+        elif isinstance(no, list):
+            fila.extend(v for v in no if isinstance(v, (dict, list)))
+
+
+def _buscar(no, chave, campo, pular=None):
+    for d in _nos(no, pular):
+        if chave in d and _valido(campo, d[chave]):
+            return d[chave]
+    return None
+
+
+def _no_do_anuncio(payload, escopo, ids):
+    """Nó mais raso do payload que descreve o anúncio (ou o vendedor dele)."""
+    if escopo == "vendedor":
+        alvos, chaves_id = ids.get("vendedor") or set(), ("id", "seller_id")
+    else:
+        alvos, chaves_id = ids.get("item") or set(), ("id", "catalog_product_id")
+    for no in _nos(payload):
+        if any(str(no.get(k)) in alvos for k in chaves_id if no.get(k) is not None):
+            return no
+    return None
+
+
+def mapear_payload(payload, campos, origem, url="", escopo="item", permitidos=tuple(CHAVES), ids=None):
+    """
+    Preenche em `campos` o que ainda falta entre os `permitidos`, a partir do
+    nó do payload que é o próprio anúncio (ids["item"]) ou o vendedor dele
+    (ids["vendedor"]). Payload de outro anúncio não preenche nada.
+    Devolve True se achou o nó.
+    """
+    ids = {} if ids is None else ids
+    no = _no_do_anuncio(payload, escopo, ids)
+    if no is None:
+        return False
+    if escopo == "item" and no.get("seller_id") is not None:
+        ids.setdefault("vendedor", set()).add(str(no["seller_id"]))
+
+    # Dentro do nó, não entra em outro anúncio aninhado (ex.: recomendações)
+    alvos = ids.get("item") or set()
+    pular = lambda d: isinstance(d.get("id"), str) and _RE_ID_ANUNCIO.fullmatch(d["id"]) and d["id"] not in alvos
+
+    for campo in permitidos:
+        if campos.get(campo):
+            continue
+        for chave in CHAVES[campo]:
+            valor = _buscar(no, chave, campo, pular)
+            if valor is None:
+                continue
+            if campo == "qtd_vendida" and isinstance(valor, int):
+                valor = f"+{valor} vendidos"
+            campos[campo] = valor
+            origem[campo] = f"json:{urlparse(url).path or url}"
+            break
+    return True
+
+
+def ids_do_link(link):
+    """IDs aceitos como "o anúncio" para o link aberto (MLB123, catálogo MLB456...)."""
+    ident = id_item(link)
+    return {"item": {ident.split("/", 1)[-1]}} if ident else {"item": set()}
+
+
+def completos(campos):
+    return all(campos.get(c) for c in OBRIGATORIOS)
+
+
+async def capturar_campos(page, link, timeout=5000, endpoints=ENDPOINTS_JSON):
+    """
+    Abre `link` ouvindo as respostas JSON da página e monta titulo, preco,
+    loja e qtd_vendida direto dos payloads do próprio anúncio. Segue assim
+    que os obrigatórios chegam, sem esperar networkidle; o que faltar depois
+    de `timeout` ms é completado pela cascata do DOM (extrair_campos_pagina).
+    Devolve (campos, origem) como extrair_campos_pagina.
+    """
+    rotas = [(re.compile(padrao), escopo, permitidos) for padrao, escopo, permitidos in endpoints]
+    campos = {c: None for c in CHAVES}
+    origem = {c: None for c in CHAVES}
+    ids = ids_do_link(link)
+    # Payloads de vendedor que chegam antes do seller_id do anúncio
+    adiados = []
+    pronto = asyncio.Event()
+
+    async def ao_responder(resp):
+        if pronto.is_set() or resp.request.resource_type not in ("xhr", "fetch"):
+            return
+        rota = next((r for r in rotas if r[0].search(resp.url)), None)
+        if rota is None:
+            return
+        if "json" not in (resp.headers.get("content-type") or ""):
+            return
+        try:
+            payload = await resp.json()
+        except:
+            return
+        _, escopo, permitidos = rota
+        if escopo == "vendedor" and not ids.get("vendedor"):
+            adiados.append((payload, resp.url, permitidos))
+            return
+        mapear_payload(payload, campos, origem, resp.url, escopo, permitidos, ids)
+        if ids.get("vendedor"):
+            while adiados:
+                p, url, perm = adiados.pop()
+                mapear_payload(p, campos, origem, url, "vendedor", perm, ids)
+        if completos(campos):
+            pronto.set()
+
+    page.on("response", ao_responder)
+    try:
+        await page.goto(link, wait_until="commit", timeout=60000)
+        try:
+            await asyncio.wait_for(pronto.wait(), timeout / 1000)
+        except asyncio.TimeoutError:
+            pass
+    finally:
+        page.remove_listener("response", ao_responder)
+
+    if not completos(campos) or not campos["qtd_vendida"]:
+        try:
+            await page.wait_for_load_state("domcontentloaded", timeout=10000)
+        except:
+            pass
+        dom, origem_dom = await extrair_campos_pagina(page)
+        for campo, valor in dom.items():
+            if not campos.get(campo) and valor:
+                campos[campo] = valor
+                origem[campo] = origem_dom[campo]
+
+    return campos, origem
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from canonico import chave_canonica
+
+# === Configurações ===
+CHECKPOINT_DIR = Path("output") / "checkpoints"
+
+
+def _nome_arquivo(busca):
+    slug = re.sub(r"[^a-z0-9]+", "-", busca.lower()).strip("-")[:60]
+    resumo = hashlib.sha1(busca.encode("utf-8")).hexdigest()[:10]
+    return f"{slug}-{resumo}.jsonl"
+
+
+class Diario:
+    """
+    Diário append-only (JSONL) dos itens concluídos de uma busca. Cada linha
+    guarda o link e o registro extraído; rodar a mesma busca de novo pula os
+    itens já presentes. Uma última linha truncada (queda no meio da escrita)
+    é ignorada na leitura.
+    """
+
+    def __init__(self, busca, diretorio=CHECKPOINT_DIR, fsync=False):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.arquivo = self.diretorio / _nome_arquivo(busca)
+        self.fsync = fsync
+        self._registros = {}
+
+        if self.arquivo.exists():
+            with open(self.arquivo, encoding="utf-8") as f:
+                for linha in f:
+                    try:
+                        entrada = json.loads(linha)
+                    except json.JSONDecodeError:
+                        continue
+                    self._registros[chave_canonica(entrada["link"])] = entrada["registro"]
+            if self._registros:
+                print(f"♻️ Retomando '{busca}': {len(self._registros)} itens já concluídos ({self.arquivo})")
+
+        self._f = open(self.arquivo, "a", encoding="utf-8")
+        if self.arquivo.stat().st_size and not self._termina_com_quebra():
+            self._f.write("\n")
+
+    def _termina_com_quebra(self):
+        with open(self.arquivo, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def __len__(self):
+        return len(self._registros)
+
+    def buscar(self, link):
+        return self._registros.get(chave_canonica(link))
+
+    def registrar(self, link, registro):
+        if registro is None:
+            return registro
+        self._registros[chave_canonica(link)] = registro
+        self._f.write(json.dumps({"link": link, "registro": registro}, ensure_ascii=False) + "\n")
+        self._f.flush()
+        if self.fsync:
+            os.fsync(self._f.fileno())
+        return registro
+
+    def fechar(self, concluido=False):
+        """Com `concluido=True` o diário é apagado: a próxima execução começa do zero."""
+        self._f.close()
+        if concluido:
+            self.arquivo.unlink(missing_ok=True)
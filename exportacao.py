@@ -0,0 +1,198 @@
+import math
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+from normalizacao import centavos_de, normalizar_colunas, vendidos_min_de
+
+# === Configurações ===
+TAMANHO_GRUPO = 5000          # linhas por row group do Parquet
+
+# Texto raspado -> (coluna tipada ao lado dele, conversor), como em normalizacao.normalizar_colunas
+NORMALIZADAS = {
+    "Preço": ("preco_centavos", centavos_de),
+    "qtd_vendida": ("qtd_vendida_min", vendidos_min_de),
+}
+_DERIVADAS = {derivada: (origem, converter) for origem, (derivada, converter) in NORMALIZADAS.items()}
+
+
+def _coluna(nome, valores, tipo):
+    if pa.types.is_string(tipo):
+        return pa.array([None if v is None else str(v) for v in valores], type=tipo)
+    try:
+        return pa.array(valores, type=tipo)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(f"Coluna '{nome}' deixou de ser {tipo}: {e}") from e
+
+
+def esquema_registros(campos):
+    """
+    Esquema Arrow para registros dos scripts: cada campo como texto (o valor
+    raspado, para exibição) e, ao lado de Preço/qtd_vendida, a coluna
+    normalizada em int64 (nula quando o texto não traz número).
+    """
+    campos = list(campos)
+    colunas = []
+    for c in campos:
+        colunas.append((c, pa.int64() if c in _DERIVADAS else pa.string()))
+        derivada = NORMALIZADAS.get(c, (None,))[0]
+        if derivada and derivada not in campos:
+            colunas.append((derivada, pa.int64()))
+    return pa.schema(colunas)
+
+
+def _valor(registro, campo):
+    if campo in _DERIVADAS and campo not in registro:
+        origem, converter = _DERIVADAS[campo]
+        return converter(registro.get(origem))
+    return registro.get(campo)
+
+
+# === Parquet incremental ===
+class EscritorParquet:
+    """
+    Grava registros em Parquet um row group por vez (`tamanho_grupo` linhas),
+    sem guardar a coleta inteira na memória. Sem `esquema` (pa.schema) usa
+    esquema_registros(campos): os campos raspados como texto (um Preço que às
+    vezes vem número e às vezes "R$ ..." não derruba a coleta) mais
+    preco_centavos/qtd_vendida_min em int64, calculados de cada registro.
+    Mesma interface de pipeline.EscritorCSV (escrever/fechar).
+    """
+
+    def __init__(self, arquivo, campos, esquema=None, tamanho_grupo=TAMANHO_GRUPO):
+        self.arquivo = Path(arquivo)
+        self.esquema = esquema if esquema is not None else esquema_registros(campos)
+        self.campos = list(self.esquema.names)
+        self.tamanho_grupo = tamanho_grupo
+        self.linhas = 0
+        self._pendentes = []
+        self._writer = None
+
+    def escrever(self, registro):
+        self._pendentes.append(registro)
+        if len(self._pendentes) >= self.tamanho_grupo:
+            self._descarregar()
+
+    def _descarregar(self):
+        if not self._pendentes:
+            return
+        tabela = pa.Table.from_arrays(
+            [_coluna(c, [_valor(r, c) for r in self._pendentes], self.esquema.field(c).type) for c in self.campos],
+            schema=self.esquema,
+        )
+        self._gravar(tabela)
+        self._pendentes = []
+
+    def _gravar(self, tabela):
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.arquivo, tabela.schema)
+        self._writer.write_table(tabela)
+        self.linhas += tabela.num_rows
+
+    def fechar(self):
+        self._descarregar()
+        if self._writer is None:
+            # Nenhum registro: ainda assim deixa um arquivo válido com as colunas
+            self._gravar(self.esquema.empty_table())
+        self._writer.close()
+        print(f"✅ Parquet salvo: {self.arquivo} ({self.linhas} linhas)")
+
+
+def salvar_parquet(dados, arquivo, campos=None, tamanho_grupo=TAMANHO_GRUPO):
+    """
+    Grava uma lista de registros, um DataFrame ou uma pa.Table (ex.:
+    oferta.Ofertas.para_arrow()) em Parquet. Do DataFrame os tipos do pandas
+    (Int64, Float64, string) passam direto para o arquivo; colunas object com
+    valores misturados viram texto. Registros e DataFrames com Preço ou
+    qtd_vendida ganham as colunas tipadas de NORMALIZADAS.
+    """
+    if isinstance(dados, pa.Table):
+        pq.write_table(dados, arquivo, row_group_size=tamanho_grupo)
+        print(f"✅ Parquet salvo: {arquivo} ({dados.num_rows} linhas)")
+        return
+
+    if isinstance(dados, pd.DataFrame):
+        if any(origem in dados.columns and derivada not in dados.columns for origem, (derivada, _) in NORMALIZADAS.items()):
+            dados = normalizar_colunas(dados)
+        try:
+            tabela = pa.Table.from_pandas(dados, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            mistas = {c: dados[c].map(lambda v: v if v is None or pd.isna(v) else str(v))
+                      for c in dados.columns if dados[c].dtype == object}
+            tabela = pa.Table.from_pandas(dados.assign(**mistas), preserve_index=False)
+        pq.write_table(tabela, arquivo, row_group_size=tamanho_grupo)
+        print(f"✅ Parquet salvo: {arquivo} ({tabela.num_rows} linhas)")
+        return
+
+    escritor = EscritorParquet(arquivo, campos or (list(dados[0].keys()) if dados else []), tamanho_grupo=tamanho_grupo)
+    for registro in dados:
+        escritor.escrever(registro)
+    escritor.fechar()
+
+
+# === Excel em modo write-only ===
+def _celula(valor):
+    if valor is None or valor is pd.NA:
+        return None
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    if isinstance(valor, (str, int, float, bool)):
+        return valor
+    return str(valor)
+
+
+class EscritorXLSX:
+    """
+    XLSX em modo write-only do openpyxl: cada linha vai direto para o arquivo
+    temporário da planilha, com memória constante.
+    """
+
+    def __init__(self, arquivo, campos, aba="Produtos"):
+        self.arquivo = Path(arquivo)
+        self.campos = list(campos)
+        self.linhas = 0
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet(aba)
+        self._ws.append(self.campos)
+
+    def escrever(self, registro):
+        self._ws.append([_celula(registro.get(c)) for c in self.campos])
+        self.linhas += 1
+
+    def fechar(self):
+        self._wb.save(self.arquivo)
+        print(f"✅ Excel salvo: {self.arquivo} ({self.linhas} linhas)")
+
+
+# === Visões derivadas do Parquet ===
+def parquet_para_csv(parquet, arquivo, encoding="utf-8-sig"):
+    """CSV a partir do Parquet, um row group por vez."""
+    with open(arquivo, "w", newline="", encoding=encoding) as f:
+        cabecalho = True
+        for lote in pq.ParquetFile(parquet).iter_batches():
+            lote.to_pandas(integer_object_nulls=True).to_csv(f, header=cabecalho, index=False)
+            cabecalho = False
+        if cabecalho:
+            f.write(",".join(pq.read_schema(parquet).names) + "\n")
+    print(f"✅ CSV salvo: {arquivo}")
+
+
+def parquet_para_xlsx(parquet, arquivo, aba="Produtos"):
+    """XLSX (write-only) a partir do Parquet, um row group por vez."""
+    arquivo_pq = pq.ParquetFile(parquet)
+    escritor = EscritorXLSX(arquivo, arquivo_pq.schema_arrow.names, aba=aba)
+    for lote in arquivo_pq.iter_batches():
+        for registro in lote.to_pylist():
+            escritor.escrever(registro)
+    escritor.fechar()
+
+
+def gerar_visoes(parquet, csv=None, xlsx=None):
+    """Gera as visões pedidas (CSV e/ou XLSX) a partir do Parquet."""
+    if csv is not None:
+        parquet_para_csv(parquet, csv)
+    if xlsx is not None:
+        parquet_para_xlsx(parquet, xlsx)
@@ -0,0 +1,145 @@
+from collections import Counter, defaultdict
+
+# === Cascata de seletores ===
+# Para cada campo, os seletores na ordem em que eram tentados com
+# pegar_text_or_none. "primeiro_no" lê só o primeiro nó de texto do elemento
+# (ignora ícones e filhos), como no rótulo do vendedor.
+CASCATA = {
+    "titulo": [
+        ["h1.ui-pdp-title", "texto"],
+        ["h1#productTitle", "texto"],
+        ["h1", "texto"],
+    ],
+    "preco": [
+        ["span.price-tag-fraction", "texto"],
+        ["span.andes-money-amount__fraction", "texto"],
+    ],
+    "centavos": [
+        ["span.price-tag-cents", "texto"],
+        ["span.andes-money-amount__decimals", "texto"],
+        ["span.andes-money-amount__cents", "texto"],
+    ],
+    "loja": [
+        ["a.ui-pdp-seller__link", "texto"],
+        ["p.ui-pdp-seller__title, span.ui-pdp-seller__title", "texto"],
+        ["p.ui-pdp-seller_title, span.ui-pdp-seller_title", "texto"],
+        ["p.ui-pdp-seller__status, span.ui-pdp-seller__status", "texto"],
+        ["p.ui-pdp-seller_status, span.ui-pdp-seller_status", "texto"],
+        ["span.ui-pdp-seller__label-text-with-icon", "primeiro_no"],
+    ],
+    "qtd_vendida": [
+        ["div.ui-pdp-seller_headerinfo-containersubtitle-one-line p.ui-pdp-sellerheader_subtitle", "texto"],
+        ["p.ui-pdp-seller__header__subtitle", "texto"],
+        [".ui-pdp-subtitle", "texto"],
+    ],
+}
+
+# Uma única ida ao navegador: lê os JSON-LD e roda a cascata inteira na página.
+SCRIPT_EXTRACAO = """
+(cascata) => {
+    const ler = (el, modo) => {
+        if (modo === "primeiro_no") {
+            const no = el.childNodes[0];
+            return no ? (no.textContent || "").trim() : "";
+        }
+        return (el.innerText || el.textContent || "").trim();
+    };
+
+    let jsonld = null;
+    for (const s of document.querySelectorAll("script[type='application/ld+json']")) {
+        let data;
+        try { data = JSON.parse(s.textContent); } catch (e) { continue; }
+        for (const obj of (Array.isArray(data) ? data : [data])) {
+            if (!obj || typeof obj !== "object") continue;
+            const typ = String(obj["@type"] || obj["type"] || "");
+            if (typ.includes("Product") || "offers" in obj || "price" in obj) { jsonld = obj; break; }
+        }
+        if (jsonld) break;
+    }
+
+    const dom = {};
+    const origem = {};
+    for (const [campo, seletores] of Object.entries(cascata)) {
+        dom[campo] = null;
+        origem[campo] = null;
+        for (const [seletor, modo] of seletores) {
+            const el = document.querySelector(seletor);
+            const valor = el ? ler(el, modo) : "";
+            if (valor) { dom[campo] = valor; origem[campo] = seletor; break; }
+        }
+    }
+    return {jsonld, dom, origem};
+}
+"""
+
+
+def campos_de_jsonld(jsonld):
+    """titulo, preco e loja do objeto Product do JSON-LD (None quando ausentes)."""
+    titulo = None
+    preco = None
+    loja = None
+    if not jsonld:
+        return titulo, preco, loja
+
+    titulo = jsonld.get("name") or jsonld.get("headline")
+    offers = jsonld.get("offers") or {}
+    if isinstance(offers, list) and offers:
+        offers = offers[0]
+    if isinstance(offers, dict):
+        preco = offers.get("price") or (offers.get("priceSpecification") or {}).get("price")
+        seller = offers.get("seller") or {}
+        if isinstance(seller, dict):
+            loja = seller.get("name") or seller.get("nickname")
+        else:
+            loja = seller or None
+    return titulo, preco, loja
+
+
+async def extrair_campos_pagina(page):
+    """
+    Resolve titulo, preco, loja e qtd_vendida com um único `evaluate`.
+    Devolve (campos, origem), onde origem diz de onde veio cada campo:
+    "jsonld", o seletor CSS que casou, ou None.
+    """
+    bruto = await page.evaluate(SCRIPT_EXTRACAO, CASCATA)
+    dom = bruto["dom"]
+    origem_dom = bruto["origem"]
+
+    titulo, preco, loja = campos_de_jsonld(bruto["jsonld"])
+    origem = {
+        "titulo": "jsonld" if titulo else origem_dom["titulo"],
+        "preco": "jsonld" if preco else origem_dom["preco"],
+        "loja": "jsonld" if loja else origem_dom["loja"],
+        "qtd_vendida": origem_dom["qtd_vendida"],
+    }
+
+    titulo = titulo or dom["titulo"]
+    if not preco and dom["preco"]:
+        if dom["centavos"]:
+            preco = f"R$ {dom['preco']},{dom['centavos']}"
+        else:
+            preco = f"R$ {dom['preco']}"
+    loja = loja or dom["loja"]
+
+    campos = {
+        "titulo": titulo,
+        "preco": preco,
+        "loja": loja,
+        "qtd_vendida": dom["qtd_vendida"],
+    }
+    return campos, origem
+
+
+def novo_contador_origens():
+    return defaultdict(Counter)
+
+
+def registrar_origem(contador, origem):
+    for campo, seletor in origem.items():
+        contador[campo][seletor or "—"] += 1
+
+
+def resumo_origens(contador):
+    for campo, c in contador.items():
+        partes = ", ".join(f"{s}={n}" for s, n in c.most_common())
+        print(f"🔎 {campo}: {partes}")
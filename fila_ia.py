@@ -0,0 +1,137 @@
+import hashlib
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from cache_ia import normalizar_titulo
+
+# === Configurações ===
+FILA_IA_PATH = Path("output") / "fila_ia.sqlite"
+PENDENTE = "PENDENTE"         # veredito de par cuja chamada à IA falhou
+VEREDITOS = ("SIM", "NÃO")    # o que conta como linha já resolvida
+BACKOFF_BASE = 60.0           # segundos antes da 1ª nova tentativa
+BACKOFF_MAX = 6 * 3600.0
+
+
+class FilaIA:
+    """
+    Fila persistente (SQLite) dos pares (principal, concorrente) cuja chamada
+    à IA falhou. Cada falha dobra a espera até a próxima tentativa
+    (BACKOFF_BASE * 2^(tentativas-1), com jitter, até BACKOFF_MAX). Na
+    reexecução, a_reprocessar() diz quais linhas ainda não têm veredito e
+    já passaram da espera; concluir() tira da fila os pares resolvidos.
+    """
+
+    def __init__(self, caminho=FILA_IA_PATH, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.falhas = 0
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.caminho, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pendentes (
+                chave       TEXT PRIMARY KEY,
+                principal   TEXT,
+                concorrente TEXT,
+                tentativas  INTEGER NOT NULL,
+                proxima     REAL NOT NULL,
+                erro        TEXT,
+                criado      REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def chave(principal, concorrente):
+        par = f"{normalizar_titulo(principal)}\x1f{normalizar_titulo(concorrente)}"
+        return hashlib.sha1(par.encode("utf-8")).hexdigest()
+
+    def adicionar(self, principal, concorrente, erro=None):
+        """Registra mais uma falha do par e agenda a próxima tentativa. Devolve PENDENTE."""
+        chave = self.chave(principal, concorrente)
+        agora = time.time()
+        with self._lock:
+            linha = self.conn.execute("SELECT tentativas FROM pendentes WHERE chave = ?", (chave,)).fetchone()
+            tentativas = (linha[0] if linha else 0) + 1
+            espera = min(self.backoff_max, self.backoff_base * 2 ** (tentativas - 1)) * random.uniform(0.75, 1.0)
+            self.conn.execute(
+                """
+                INSERT INTO pendentes (chave, principal, concorrente, tentativas, proxima, erro, criado)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(chave) DO UPDATE SET
+                    tentativas = excluded.tentativas, proxima = excluded.proxima, erro = excluded.erro
+                """,
+                (chave, principal, concorrente, tentativas, agora + espera, None if erro is None else str(erro)[:500], agora),
+            )
+            self.conn.commit()
+            self.falhas += 1
+        return PENDENTE
+
+    def _em_espera(self):
+        with self._lock:
+            return {c for (c,) in self.conn.execute("SELECT chave FROM pendentes WHERE proxima > ?", (time.time(),))}
+
+    def a_reprocessar(self, principais, concorrentes, vereditos):
+        """
+        Máscara (Series booleana, índice de `vereditos`) das linhas a mandar de
+        novo: sem SIM/NÃO (PENDENTE, vazio, falha) e fora da espera da fila.
+        """
+        vereditos = pd.Series(vereditos)
+        sem_veredito = ~vereditos.isin(VEREDITOS)
+        em_espera = self._em_espera()
+        if not em_espera:
+            return sem_veredito
+        esperando = [
+            self.chave(p, c) in em_espera if pendente else False
+            for p, c, pendente in zip(principais, concorrentes, sem_veredito)
+        ]
+        return sem_veredito & ~pd.Series(esperando, index=vereditos.index, dtype=bool)
+
+    def concluir(self, principais, concorrentes):
+        """Tira da fila os pares que agora têm veredito."""
+        chaves = [(self.chave(p, c),) for p, c in zip(principais, concorrentes)]
+        if not chaves:
+            return
+        with self._lock:
+            self.conn.executemany("DELETE FROM pendentes WHERE chave = ?", chaves)
+            self.conn.commit()
+
+    def resumo(self):
+        with self._lock:
+            total, esperando = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(proxima > ?), 0) FROM pendentes", (time.time(),)
+            ).fetchone()
+        if self.falhas or total:
+            print(
+                f"📬 Fila da IA: {self.falhas} falhas nesta execução; {total} pares pendentes "
+                f"({esperando} aguardando backoff) em {self.caminho}"
+            )
+
+    def fechar(self):
+        with _lock_abertas:
+            if _abertas.get(self.caminho) is self:
+                del _abertas[self.caminho]
+        self.conn.close()
+
+
+_abertas = {}
+_lock_abertas = threading.Lock()
+
+
+def abrir_fila_ia(caminho=FILA_IA_PATH):
+    """FilaIA compartilhada de `caminho`, aberta no primeiro uso (como cache_ia.abrir_cache_ia)."""
+    caminho = Path(caminho)
+    with _lock_abertas:
+        if caminho not in _abertas:
+            _abertas[caminho] = FilaIA(caminho)
+        return _abertas[caminho]
@@ -0,0 +1,197 @@
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from canonico import chave_canonica
+from normalizacao import preco_centavos
+from oferta import Ofertas
+
+# === Configurações ===
+HISTORICO_PATH = Path("output") / "historico_precos.sqlite"
+
+# campo do histórico -> coluna do DataFrame (o padrão segue teste.py/teste02.py)
+COLUNAS_PADRAO = {
+    "produto": "principal",
+    "titulo": "concorrente",
+    "preco": "Preço",
+    "loja": "Loja",
+    "link": "link",
+    "compatibilidade": "compatibilidade",
+}
+
+
+class HistoricoPrecos:
+    """
+    Histórico append-only (SQLite) dos preços de cada coleta, com índices por
+    produto, item (canonico.chave_canonica) e data, para consultas de último
+    preço, mínimo/máximo e tendência sem abrir os resultado_final_* antigos.
+    """
+
+    def __init__(self, caminho=HISTORICO_PATH):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.caminho)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS precos (
+                id             INTEGER PRIMARY KEY,
+                coletado       REAL NOT NULL,
+                produto        TEXT NOT NULL,
+                item           TEXT,
+                titulo         TEXT,
+                loja           TEXT,
+                preco_centavos INTEGER,
+                compativel     INTEGER,
+                link           TEXT
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_precos_produto ON precos (produto, coletado, preco_centavos)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_precos_item ON precos (item, coletado)")
+        self.conn.commit()
+
+    # === Gravação ===
+    def registrar(self, dados, colunas=None, produto=None, coletado=None):
+        """
+        Acrescenta uma coleta (lista de registros, DataFrame ou oferta.Ofertas)
+        ao histórico, toda com o mesmo `coletado` (epoch). `colunas` troca os
+        nomes padrão de COLUNAS_PADRAO; `produto` fixa o produto quando a
+        coluna não existe. Devolve quantas linhas foram gravadas.
+        """
+        if isinstance(dados, Ofertas):
+            # Já tipado: preço em centavos e nomes de campo do próprio histórico
+            df = dados.para_pandas()
+            colunas = {"produto": "produto", "titulo": "titulo", "preco": "preco_centavos", "loja": "loja", **(colunas or {})}
+        else:
+            df = dados if isinstance(dados, pd.DataFrame) else pd.DataFrame(list(dados))
+        if df.empty:
+            return 0
+        nomes = {**COLUNAS_PADRAO, **(colunas or {})}
+        coletado = coletado or time.time()
+
+        def coluna(campo):
+            nome = nomes[campo]
+            return df[nome] if nome in df.columns else pd.Series([None] * len(df), index=df.index)
+
+        produtos = coluna("produto") if produto is None else pd.Series([produto] * len(df), index=df.index)
+        compat = coluna("compatibilidade").map({"SIM": 1, "NÃO": 0})
+        if isinstance(dados, Ofertas):
+            centavos = df["preco_centavos"]
+        else:
+            centavos = preco_centavos(coluna("preco"))
+        links = coluna("link")
+
+        linhas = [
+            (coletado, prod, chave_canonica(link) if isinstance(link, str) else None, titulo, loja,
+             None if pd.isna(preco) else int(preco), None if pd.isna(c) else int(c), link)
+            for prod, link, titulo, loja, preco, c in zip(
+                produtos, links, coluna("titulo"), coluna("loja"), centavos, compat
+            )
+            if isinstance(prod, str) and prod
+        ]
+        self.conn.executemany(
+            "INSERT INTO precos (coletado, produto, item, titulo, loja, preco_centavos, compativel, link) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            linhas,
+        )
+        self.conn.commit()
+        print(f"🗂️ Histórico: {len(linhas)} preços registrados ({self.caminho})")
+        return len(linhas)
+
+    # === Consultas ===
+    def _filtro(self, produto=None, item=None, dias=None, apenas_compativeis=False):
+        if (produto is None) == (item is None):
+            raise ValueError("Informe exatamente um de `produto` ou `item`")
+        condicoes = ["produto = ?" if produto is not None else "item = ?"]
+        params = [produto if produto is not None else chave_canonica(item)]
+        if dias is not None:
+            condicoes.append("coletado >= ?")
+            params.append(time.time() - dias * 86400)
+        if apenas_compativeis:
+            condicoes.append("compativel = 1")
+        condicoes.append("preco_centavos IS NOT NULL")
+        return " AND ".join(condicoes), params
+
+    def ultimo_preco(self, produto=None, item=None, apenas_compativeis=False):
+        """
+        Preço mais recente: do item, ou o mais barato da última coleta do
+        produto. Devolve um dict (None quando não há registro).
+        """
+        where, params = self._filtro(produto, item, apenas_compativeis=apenas_compativeis)
+        linha = self.conn.execute(
+            f"""
+            SELECT * FROM precos
+            WHERE {where} AND coletado = (SELECT MAX(coletado) FROM precos WHERE {where})
+            ORDER BY preco_centavos LIMIT 1
+            """,
+            params + params,
+        ).fetchone()
+        return dict(linha) if linha else None
+
+    def mais_barato(self, produto=None, item=None, dias=30, apenas_compativeis=True):
+        """Observação mais barata dos últimos `dias` (dict ou None)."""
+        where, params = self._filtro(produto, item, dias, apenas_compativeis)
+        linha = self.conn.execute(
+            f"SELECT * FROM precos WHERE {where} ORDER BY preco_centavos, coletado DESC LIMIT 1", params
+        ).fetchone()
+        return dict(linha) if linha else None
+
+    def faixa(self, produto=None, item=None, dias=30, apenas_compativeis=False):
+        """Mínimo, máximo e média (centavos) e nº de observações nos últimos `dias`."""
+        where, params = self._filtro(produto, item, dias, apenas_compativeis)
+        linha = self.conn.execute(
+            f"""
+            SELECT MIN(preco_centavos) AS minimo, MAX(preco_centavos) AS maximo,
+                   AVG(preco_centavos) AS media, COUNT(*) AS observacoes
+            FROM precos WHERE {where}
+            """,
+            params,
+        ).fetchone()
+        return dict(linha)
+
+    def tendencia(self, produto=None, item=None, dias=30, apenas_compativeis=False):
+        """
+        Menor preço de cada dia nos últimos `dias` e a inclinação da reta
+        (centavos por dia, mínimos quadrados): negativa = preço caindo.
+        """
+        where, params = self._filtro(produto, item, dias, apenas_compativeis)
+        serie = [
+            (dia, minimo)
+            for dia, minimo in self.conn.execute(
+                f"""
+                SELECT date(coletado, 'unixepoch', 'localtime') AS dia, MIN(preco_centavos)
+                FROM precos WHERE {where} GROUP BY dia ORDER BY dia
+                """,
+                params,
+            )
+        ]
+        return {"serie": serie, "centavos_por_dia": _inclinacao(serie)}
+
+    def fechar(self):
+        self.conn.close()
+
+
+def registrar_coleta(dados, caminho=HISTORICO_PATH, **kwargs):
+    """Abre o histórico, grava a coleta (ver HistoricoPrecos.registrar) e fecha."""
+    historico = HistoricoPrecos(caminho)
+    try:
+        return historico.registrar(dados, **kwargs)
+    finally:
+        historico.fechar()
+
+
+def _inclinacao(serie):
+    if len(serie) < 2:
+        return None
+    xs = [datetime.fromisoformat(dia).toordinal() for dia, _ in serie]
+    ys = [valor for _, valor in serie]
+    mx = sum(xs) / len(xs)
+    my = sum(ys) / len(ys)
+    variancia = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / variancia
@@ -0,0 +1,299 @@
+import asyncio
+import json
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+import httpx
+
+from extracao import CASCATA, campos_de_jsonld
+from limitador import limitar
+
+# === Configurações ===
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+}
+
+_RE_COMPOSTO = re.compile(r"^(?P<tag>[a-z][a-z0-9]*)?(?P<resto>(?:[.#][\w-]+)*)$")
+
+
+def _composto(texto):
+    """"p.ui-pdp-title#x" -> (tag, id, classes); None se usar algo além de tag, #id e .classe."""
+    m = _RE_COMPOSTO.match(texto)
+    if not m or not texto:
+        return None
+    partes = re.findall(r"([.#])([\w-]+)", m.group("resto"))
+    ident = next((nome for sinal, nome in partes if sinal == "#"), None)
+    return m.group("tag"), ident, frozenset(nome for sinal, nome in partes if sinal == ".")
+
+
+def _alvos(cascata):
+    """
+    Converte extracao.CASCATA em [(campo, modo, alternativas)], na mesma
+    ordem. Cada alternativa (um seletor da lista separada por vírgula) é a
+    cadeia de descendentes [(tag, id, classes), ...], a última sendo o alvo.
+    """
+    alvos = []
+    for campo, seletores in cascata.items():
+        for seletor, modo in seletores:
+            alternativas = []
+            for opcao in seletor.split(","):
+                cadeia = [_composto(parte) for parte in opcao.split()]
+                if cadeia and None not in cadeia:
+                    alternativas.append(cadeia)
+            if alternativas:
+                alvos.append((campo, modo, alternativas))
+    return alvos
+
+
+# A mesma cascata do caminho com navegador (extracao.CASCATA), avaliada pelo HTMLParser
+ALVOS = _alvos(CASCATA)
+
+_RE_JSON_LD = re.compile(
+    r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE,
+)
+_VOID = {"meta", "link", "img", "br", "hr", "input", "source", "wbr", "area", "base", "col", "embed", "track"}
+
+
+def limpar(texto):
+    if not texto:
+        return ""
+    return re.sub(r"\s+", " ", texto).strip()
+
+
+# === JSON-LD ===
+def extrair_json_ld(html):
+    """Mesmo critério do JSON-LD em extracao.SCRIPT_EXTRACAO, direto sobre o HTML cru."""
+    for bruto in _RE_JSON_LD.findall(html):
+        try:
+            data = json.loads(unescape(bruto.strip()))
+        except:
+            continue
+
+        candidates = data if isinstance(data, list) else [data]
+        for obj in candidates:
+            if not isinstance(obj, dict):
+                continue
+            typ = obj.get("@type") or obj.get("type") or ""
+            if ("Product" in str(typ)) or ("offers" in obj) or ("price" in obj):
+                return obj
+    return None
+
+
+# === Seletores sem navegador ===
+def _casa(composto, elemento):
+    tag, ident, classes = composto
+    return (tag is None or tag == elemento[0]) and (ident is None or ident == elemento[1]) and classes <= elemento[2]
+
+
+def _casa_cadeia(cadeia, elemento, ancestrais):
+    if not _casa(cadeia[-1], elemento):
+        return False
+    pos = len(ancestrais)
+    for composto in reversed(cadeia[:-1]):
+        while pos and not _casa(composto, ancestrais[pos - 1]):
+            pos -= 1
+        if not pos:
+            return False
+        pos -= 1
+    return True
+
+
+class _ColetorHTML(HTMLParser):
+    """
+    Texto do primeiro elemento de cada alvo de ALVOS (como querySelector),
+    lido como no SCRIPT_EXTRACAO: "texto" junta todo o texto interno,
+    "primeiro_no" só o do primeiro nó filho.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.achados = [None] * len(ALVOS)
+        self.meta_preco = None
+        self._pilha = []   # (tag, id, classes) dos elementos abertos
+        self._ativos = []  # [idx, modo, nível, partes, visto, fechado]
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "meta":
+            if attrs.get("itemprop") == "price" and self.meta_preco is None:
+                self.meta_preco = attrs.get("content")
+            return
+        if tag in _VOID:
+            return
+
+        for cap in self._ativos:
+            if cap[1] == "primeiro_no" and len(self._pilha) == cap[2]:
+                if cap[4]:
+                    cap[5] = True
+                cap[4] = True
+
+        elemento = (tag, attrs.get("id"), frozenset((attrs.get("class") or "").split()))
+        ativos = {cap[0] for cap in self._ativos}
+        for idx, (_, modo, alternativas) in enumerate(ALVOS):
+            if self.achados[idx] is not None or idx in ativos:
+                continue
+            if any(_casa_cadeia(cadeia, elemento, self._pilha) for cadeia in alternativas):
+                self._ativos.append([idx, modo, len(self._pilha) + 1, [], False, False])
+        self._pilha.append(elemento)
+
+    def handle_data(self, data):
+        for cap in self._ativos:
+            if cap[5]:
+                continue
+            if cap[1] == "primeiro_no" and len(self._pilha) == cap[2]:
+                cap[4] = True
+            cap[3].append(data)
+
+    def handle_endtag(self, tag):
+        abertos = [i for i, elemento in enumerate(self._pilha) if elemento[0] == tag]
+        if not abertos:
+            return
+        del self._pilha[abertos[-1]:]
+
+        restantes = []
+        for cap in self._ativos:
+            if len(self._pilha) < cap[2]:
+                self.achados[cap[0]] = limpar("".join(cap[3]))
+                continue
+            if cap[1] == "primeiro_no" and len(self._pilha) == cap[2] and cap[4]:
+                cap[5] = True
+            restantes.append(cap)
+        self._ativos = restantes
+
+    def campo(self, nome):
+        for idx, (campo, _, _) in enumerate(ALVOS):
+            if campo == nome and self.achados[idx]:
+                return self.achados[idx]
+        return None
+
+
+def extrair_campos_html(html):
+    """
+    Extrai titulo, preco, loja e qtd_vendida do HTML estático, com a mesma
+    precedência do caminho com navegador: JSON-LD primeiro, depois seletores.
+    Campos não encontrados ficam como None.
+    """
+    titulo, preco, loja = campos_de_jsonld(extrair_json_ld(html))
+
+    coletor = _ColetorHTML()
+    try:
+        coletor.feed(html)
+        coletor.close()
+    except:
+        pass
+
+    if not titulo:
+        titulo = coletor.campo("titulo")
+
+    if not preco and coletor.meta_preco:
+        preco = f"R$ {coletor.meta_preco}"
+    if not preco:
+        fracao = coletor.campo("preco")
+        centavos = coletor.campo("centavos")
+        if fracao and centavos:
+            preco = f"R$ {fracao},{centavos}"
+        elif fracao:
+            preco = f"R$ {fracao}"
+
+    if not loja:
+        loja = coletor.campo("loja")
+
+    return {
+        "titulo": titulo,
+        "preco": preco,
+        "loja": loja,
+        "qtd_vendida": coletor.campo("qtd_vendida"),
+    }
+
+
+# === Cliente HTTP ===
+def criar_cliente(max_conexoes=16, timeout=20):
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        follow_redirects=True,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=max_conexoes, max_keepalive_connections=max_conexoes),
+    )
+
+
+async def buscar_campos_http(client, link, limitador=None):
+    async with limitar(limitador, link) as req:
+        resp = await client.get(link)
+        req.resposta(resp.status_code, str(resp.url))
+    resp.raise_for_status()
+    return extrair_campos_html(resp.text)
+
+
+def precisa_navegador(campos):
+    return campos is None or not campos.get("preco") or not campos.get("loja")
+
+
+async def coletar_detalhes(itens, montar, fallback, client=None, max_concurrency=16, limitador=None):
+    """
+    Caminho rápido: baixa as páginas de detalhe por HTTP (conexões reaproveitadas)
+    e monta o registro com `montar(item, campos)`. Itens cujo parse estático
+    deixa preço ou loja vazios vão para `fallback(itens)`, que deve devolver
+    os registros na mesma ordem (ex.: executar_em_abas com Playwright).
+    Com `limitador` (limitador.LimitadorPorHost) cada GET espera a vez do host.
+    Devolve (registros na ordem dos itens, estatísticas por caminho).
+    """
+    proprio = client is None
+    if proprio:
+        client = criar_cliente(max_conexoes=max_concurrency)
+
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def um(it):
+        async with sem:
+            try:
+                return await buscar_campos_http(client, it.get("href"), limitador)
+            except Exception as e:
+                motivo = str(e).splitlines()[0] if str(e) else type(e).__name__
+                print(f"HTTP falhou para {it.get('href')}: {motivo}")
+                return None
+
+    try:
+        campos = await asyncio.gather(*(um(it) for it in itens))
+    finally:
+        if proprio:
+            await client.aclose()
+
+    resultados = [None] * len(itens)
+    faltantes = []
+    for idx, (it, c) in enumerate(zip(itens, campos)):
+        if precisa_navegador(c):
+            faltantes.append(idx)
+        else:
+            resultados[idx] = montar(it, c)
+
+    if faltantes:
+        via_navegador = await fallback([itens[i] for i in faltantes])
+        for idx, registro in zip(faltantes, via_navegador):
+            resultados[idx] = registro
+
+    stats = {
+        "total": len(itens),
+        "http": len(itens) - len(faltantes),
+        "navegador": sum(1 for i in faltantes if resultados[i] is not None),
+        "falhas": sum(1 for r in resultados if r is None),
+    }
+    resumo_caminhos(stats)
+    return resultados, stats
+
+
+def resumo_caminhos(stats):
+    total = stats["total"]
+    if not total:
+        return
+    print(
+        f"⚡ Caminho HTTP: {stats['http']}/{total} ({100 * stats['http'] / total:.0f}%) | "
+        f"navegador: {stats['navegador']}/{total} ({100 * stats['navegador'] / total:.0f}%) | "
+        f"falhas: {stats['falhas']}"
+    )
@@ -0,0 +1,268 @@
+import asyncio
+import json
+
+from cache_ia import normalizar_titulo
+
+# === Configurações ===
+TAMANHO_LOTE = 20             # candidatos por requisição
+MAX_TOKENS_LOTE = 4000        # orçamento (prompt + resposta) por requisição
+TOKENS_POR_VEREDITO = 16      # ~ {"id": 12, "compativel": "NÃO"},
+TOKENS_RACIOCINIO = 512       # modelos de raciocínio (gpt-oss) gastam tokens antes do JSON
+CARACTERES_POR_TOKEN = 4      # estimativa sem tokenizer
+# Modo JSON da API: a resposta é sempre um objeto JSON válido (por isso
+# {"vereditos": [...]} e não um array solto). Sem max_tokens: um teto justo
+# corta a resposta de modelos de raciocínio antes de o JSON começar.
+FORMATO_RESPOSTA = {"type": "json_object"}
+
+PROMPT_LOTE = """
+Compare o produto principal com cada produto candidato numerado abaixo.
+{criterio}
+
+Produto principal: {principal}
+
+Candidatos:
+{candidatos}
+
+Responda somente com um objeto JSON com a lista "vereditos", um item por
+candidato, usando o número de cada candidato como id:
+{{"vereditos": [{{"id": 1, "compativel": "SIM"}}, {{"id": 2, "compativel": "NÃO"}}]}}
+"""
+
+
+def estimar_tokens(texto):
+    return len(texto) // CARACTERES_POR_TOKEN + 1
+
+
+def montar_prompt(principal, candidatos, criterio):
+    linhas = "\n".join(f"{i}. {c}" for i, c in enumerate(candidatos, 1))
+    return PROMPT_LOTE.format(criterio=criterio, principal=principal, candidatos=linhas)
+
+
+def dividir_lotes(principal, candidatos, criterio, tamanho_lote=TAMANHO_LOTE, max_tokens=MAX_TOKENS_LOTE):
+    """
+    Fatia os candidatos em lotes de até `tamanho_lote`, fechando o lote antes
+    se o prompt + a resposta esperada passarem de `max_tokens`. Um candidato
+    sozinho sempre forma um lote, mesmo que estoure o orçamento.
+    """
+    base = estimar_tokens(montar_prompt(principal, [], criterio))
+    lotes, atual, tokens = [], [], base
+    for candidato in candidatos:
+        custo = estimar_tokens(f"{len(atual) + 1}. {candidato}\n") + TOKENS_POR_VEREDITO
+        if atual and (len(atual) >= tamanho_lote or tokens + custo > max_tokens):
+            lotes.append(atual)
+            atual, tokens = [], base
+        atual.append(candidato)
+        tokens += custo
+    if atual:
+        lotes.append(atual)
+    return lotes
+
+
+def _veredito(valor):
+    if isinstance(valor, bool):
+        return "SIM" if valor else "NÃO"
+    texto = str(valor).strip().upper()
+    if texto in ("SIM", "S", "YES"):
+        return "SIM"
+    if texto in ("NÃO", "NAO", "N", "NO"):
+        return "NÃO"
+    return None
+
+
+def _carregar_json(conteudo):
+    """Objeto ou array JSON da resposta, aceitando cercas ```json e texto em volta."""
+    for abre, fecha in (("{", "}"), ("[", "]")):
+        inicio, fim = conteudo.find(abre), conteudo.rfind(fecha)
+        if 0 <= inicio < fim:
+            try:
+                return json.loads(conteudo[inicio:fim + 1])
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+def interpretar_resposta(conteudo, n):
+    """
+    Lê os vereditos da resposta ({"vereditos": [...]} ou um array solto) e
+    devolve `n` vereditos na ordem dos candidatos; None onde o valor veio
+    ilegível. O lote só é aceito se os ids cobrirem exatamente 1..n (ou,
+    sem ids, se vierem exatamente n itens): id repetido, faltando ou fora
+    da faixa descarta o lote inteiro ([None] * n).
+    """
+    dados = _carregar_json(conteudo)
+    itens = dados.get("vereditos") if isinstance(dados, dict) else dados
+    if not isinstance(itens, list) or len(itens) != n:
+        return [None] * n
+
+    com_id = [isinstance(item, dict) and "id" in item for item in itens]
+    if any(com_id):
+        if not all(com_id):
+            return [None] * n
+        try:
+            indices = [int(item["id"]) - 1 for item in itens]
+        except (TypeError, ValueError):
+            return [None] * n
+        if sorted(indices) != list(range(n)):
+            return [None] * n
+    else:
+        indices = range(n)
+
+    vereditos = [None] * n
+    for indice, item in zip(indices, itens):
+        valor = item.get("compativel", item.get("compatibilidade")) if isinstance(item, dict) else item
+        if valor is not None:
+            vereditos[indice] = _veredito(valor)
+    return vereditos
+
+
+def _separar_cache(principal, concorrentes, modelo, versao, cache):
+    """Respostas já em cache (por título normalizado) e os concorrentes únicos que faltam."""
+    respostas = {}
+    pendentes = []
+    for concorrente in concorrentes:
+        chave = normalizar_titulo(concorrente)
+        if chave in respostas:
+            continue
+        em_cache = cache.buscar(principal, concorrente, modelo, versao) if cache is not None else None
+        respostas[chave] = em_cache
+        if em_cache is None:
+            pendentes.append(concorrente)
+    return respostas, pendentes
+
+
+def _tokens_resposta(lote):
+    """Estimativa da resposta para o orçamento TPM (não vai como max_tokens)."""
+    return len(lote) * TOKENS_POR_VEREDITO + TOKENS_RACIOCINIO
+
+
+def _falhar_lote(principal, lote, erro, falha, fila):
+    """
+    Erro da requisição (rede, 429, 5xx): o lote inteiro vai para a `fila` e
+    vira `falha`, sem abrir uma chamada por par. Sem `falha`, o erro sobe.
+    """
+    print(f"⚠️ Erro IA (lote): {erro}")
+    if fila is not None:
+        for concorrente in lote:
+            fila.adicionar(principal, concorrente, erro)
+    if falha is None:
+        raise erro
+    return [falha] * len(lote)
+
+
+def comparar_em_lote(client, modelo, principal, concorrentes, criterio, individual, cache=None, prompt_cache=None,
+                     falha=None, fila=None, tamanho_lote=TAMANHO_LOTE, max_tokens=MAX_TOKENS_LOTE):
+    """
+    Compara um principal com vários concorrentes em poucas requisições (um
+    objeto JSON de vereditos por lote) e devolve "SIM"/"NÃO" na ordem de
+    `concorrentes`. Títulos repetidos vão uma vez só; o que já estiver no
+    `cache` (cache_ia.CacheIA) não é enviado. A chave do cache é a mesma do
+    comparar_com_ia do script: `prompt_cache` é o PROMPT por par (sem ele, o
+    `criterio`). Item faltando ou ilegível na resposta cai em
+    `individual(principal, concorrente)`, uma chamada por par; erro da
+    requisição não (ver _falhar_lote, com `falha`/`fila` como em
+    motor_ia.comparar_par).
+    """
+    versao = prompt_cache or criterio
+    respostas, pendentes = _separar_cache(principal, concorrentes, modelo, versao, cache)
+
+    requisicoes = individuais = 0
+    for lote in dividir_lotes(principal, pendentes, criterio, tamanho_lote, max_tokens):
+        prompt = montar_prompt(principal, lote, criterio)
+        requisicoes += 1
+        try:
+            resp = client.chat.completions.create(
+                model=modelo,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0,
+                response_format=FORMATO_RESPOSTA,
+            )
+        except Exception as e:
+            for concorrente, veredito in zip(lote, _falhar_lote(principal, lote, e, falha, fila)):
+                respostas[normalizar_titulo(concorrente)] = veredito
+            continue
+        vereditos = interpretar_resposta(resp.choices[0].message.content or "", len(lote))
+
+        for concorrente, veredito in zip(lote, vereditos):
+            if veredito is None:
+                veredito = individual(principal, concorrente)
+                individuais += 1
+            elif cache is not None:
+                cache.guardar(principal, concorrente, modelo, versao, veredito)
+            respostas[normalizar_titulo(concorrente)] = veredito
+
+    if pendentes:
+        print(f"📦 IA em lote: {len(pendentes)} candidatos em {requisicoes} requisições ({individuais} por par)")
+    return [respostas[normalizar_titulo(c)] for c in concorrentes]
+
+
+async def comparar_em_lote_async(motor, principal, concorrentes, criterio, individual, cache=None, prompt_cache=None,
+                                 falha=None, fila=None, tamanho_lote=TAMANHO_LOTE, max_tokens=MAX_TOKENS_LOTE):
+    """
+    Igual a comparar_em_lote, com os lotes saindo juntos pelo
+    motor_ia.MotorIA e `individual` assíncrono (motor_ia.comparar_par). O
+    motor já repete 429/5xx; o erro que sobra dele segue _falhar_lote.
+    """
+    versao = prompt_cache or criterio
+    respostas, pendentes = _separar_cache(principal, concorrentes, motor.modelo, versao, cache)
+
+    async def rodar(lote):
+        try:
+            conteudo = await motor.completar(
+                montar_prompt(principal, lote, criterio), tokens_resposta=_tokens_resposta(lote), response_format=FORMATO_RESPOSTA
+            )
+        except Exception as e:
+            for concorrente, veredito in zip(lote, _falhar_lote(principal, lote, e, falha, fila)):
+                respostas[normalizar_titulo(concorrente)] = veredito
+            return 0
+        vereditos = interpretar_resposta(conteudo, len(lote))
+
+        faltando = [c for c, v in zip(lote, vereditos) if v is None]
+        avulsos = iter(await asyncio.gather(*(individual(principal, c) for c in faltando)))
+        for concorrente, veredito in zip(lote, vereditos):
+            if veredito is None:
+                veredito = next(avulsos)
+            elif cache is not None:
+                cache.guardar(principal, concorrente, motor.modelo, versao, veredito)
+            respostas[normalizar_titulo(concorrente)] = veredito
+        return len(faltando)
+
+    lotes = dividir_lotes(principal, pendentes, criterio, tamanho_lote, max_tokens)
+    individuais = sum(await asyncio.gather(*(rodar(lote) for lote in lotes)))
+    if pendentes:
+        print(f"📦 IA em lote: {len(pendentes)} candidatos em {len(lotes)} requisições ({individuais} por par)")
+    return [respostas[normalizar_titulo(c)] for c in concorrentes]
+
+
+def _agrupar(principais):
+    grupos = {}
+    for i, principal in enumerate(principais):
+        grupos.setdefault(principal, []).append(i)
+    return grupos
+
+
+def classificar_por_principal(principais, concorrentes, comparar_lote):
+    """
+    Agrupa as linhas por principal, chama `comparar_lote(principal, lista)`
+    uma vez por grupo e devolve os vereditos na ordem original das linhas.
+    """
+    concorrentes = list(concorrentes)
+    resultado = [None] * len(concorrentes)
+    for principal, linhas in _agrupar(principais).items():
+        vereditos = comparar_lote(principal, [concorrentes[i] for i in linhas])
+        for i, veredito in zip(linhas, vereditos):
+            resultado[i] = veredito
+    return resultado
+
+
+async def classificar_por_principal_async(principais, concorrentes, comparar_lote):
+    """classificar_por_principal com os grupos rodando ao mesmo tempo (`comparar_lote` assíncrono)."""
+    concorrentes = list(concorrentes)
+    grupos = _agrupar(principais)
+    por_grupo = await asyncio.gather(
+        *(comparar_lote(principal, [concorrentes[i] for i in linhas]) for principal, linhas in grupos.items())
+    )
+    resultado = [None] * len(concorrentes)
+    for linhas, vereditos in zip(grupos.values(), por_grupo):
+        for i, veredito in zip(linhas, vereditos):
+            resultado[i] = veredito
+    return resultado
@@ -1,14 +1,24 @@
 import asyncio
 import csv
-import json
 from pathlib import Path
-from playwright.async_api import async_playwright
-from openpyxl import Workbook
 import pandas as pd
 from groq import Groq
 import re
 from datetime import datetime
 
+from atributos import decidir_por_regras
+from cache_ia import abrir_cache_ia
+from canonico import deduplicar
+from exportacao import EscritorParquet, EscritorXLSX, gerar_visoes, salvar_parquet
+from extracao import extrair_campos_pagina
+from historico import registrar_coleta
+from ia_lote import classificar_por_principal, comparar_em_lote
+from motor_ia import classificar_em_paralelo
+from navegador import garantir_pool
+from oferta import Ofertas
+from pipeline import executar_pipeline
+from raspagem import executar_em_abas
+
 # === CONFIGURAÇÕES ===
 OUTPUT_DIR = Path("output")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -17,6 +27,7 @@ OUTPUT_CSV = OUTPUT_DIR / "dados.csv"
 OUTPUT_XLSX = OUTPUT_DIR / "dados.xlsx"
 RESULTADO_CSV = OUTPUT_DIR / f"resultado_final_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
 RESULTADO_XLSX = OUTPUT_DIR / f"resultado_final_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+RESULTADO_PARQUET = OUTPUT_DIR / f"resultado_final_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
 
 API_KEY = ""
 MODELO = ""
@@ -24,44 +35,9 @@ MODELO = ""
 client = Groq(api_key=API_KEY)
 
 # === FUNÇÕES AUXILIARES ===
-async def extrair_jsonld(detail_page):
-    try:
-        scripts = await detail_page.locator("script[type='application/ld+json']").evaluate_all(
-            "nodes => nodes.map(n => n.textContent)"
-        )
-    except:
-        return None
-
-    for s in scripts:
-        if not s:
-            continue
-        try:
-            data = json.loads(s)
-        except:
-            continue
-
-        candidates = data if isinstance(data, list) else [data]
-        for obj in candidates:
-            if not isinstance(obj, dict):
-                continue
-            typ = obj.get("@type") or obj.get("type") or ""
-            if ("Product" in str(typ)) or ("offers" in obj) or ("price" in obj):
-                return obj
-    return None
-
-
-async def pegar_text_or_none(locator, timeout=1500):
+async def coletar_itens(context, produto, max_itens):
+    page = await context.new_page()
     try:
-        return (await locator.inner_text(timeout=timeout)).strip()
-    except:
-        return None
-
-
-async def scrape_mercado_livre(produto, max_itens=10):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
-        page = await context.new_page()
         url = f"https://lista.mercadolivre.com.br/{produto.replace(' ', '-')}"
         await page.goto(url, timeout=60000)
 
@@ -69,69 +45,42 @@ async def scrape_mercado_livre(produto, max_itens=10):
         itens = await page.locator("a.poly-component__title").evaluate_all(
             "nodes => nodes.map(n => ({title: n.innerText.trim(), href: n.href}))"
         )
+    finally:
+        await page.close()
+
+    itens, _ = deduplicar(itens)
+    return itens[:max_itens]
+
+
+async def extrair_item(detail, it, produto):
+    titulo_lista = it.get("title") or ""
+    link = it.get("href")
+    await detail.goto(link, timeout=60000)
+
+    # JSON-LD + cascata de seletores numa única ida ao navegador
+    campos, _ = await extrair_campos_pagina(detail)
+
+    return {
+        "concorrente": campos["titulo"] or titulo_lista,
+        "Preço": campos["preco"],
+        "Loja": campos["loja"],
+        "qtd_vendida": campos["qtd_vendida"] or "Não informado",
+        "principal": produto,
+        "link": link
+    }
+
+
+async def scrape_mercado_livre(produto, max_itens=10, max_concurrency=8, bloquear=True, pool=None):
+    async with garantir_pool(pool, bloquear=bloquear) as pool:
+        context = pool.contexto()
+        itens = await coletar_itens(context, produto, max_itens)
+
+        async def processar(detail, it):
+            return await extrair_item(detail, it, produto)
+
+        resultados = await executar_em_abas(context, itens, processar, max_concurrency=max_concurrency)
 
-        itens = itens[:max_itens]
-        resultados = []
-        for it in itens:
-            titulo_lista = it.get("title") or ""
-            link = it.get("href")
-            detail = await context.new_page()
-            try:
-                await detail.goto(link, timeout=60000)
-                jsonld = await extrair_jsonld(detail)
-
-                titulo = jsonld.get("name") if jsonld else titulo_lista
-                preco = None
-                loja = None
-                qtd_vendida = None
-
-                if jsonld:
-                    offers = jsonld.get("offers") or {}
-                    if isinstance(offers, dict):
-                        preco = offers.get("price")
-                        seller = offers.get("seller") or {}
-                        loja = seller.get("name") if isinstance(seller, dict) else None
-
-                if not preco:
-                    preco = await pegar_text_or_none(detail.locator("span.price-tag-fraction"))
-                    if preco:
-                        preco = f"R$ {preco}"
-
-                # === Trecho solicitado (detecção de loja e quantidade vendida) ===
-                if not loja:
-                    loja = await pegar_text_or_none(detail.locator("a.ui-pdp-seller__link"))
-                if not loja:
-                    loja = await pegar_text_or_none(detail.locator("p.ui-pdp-seller_title, span.ui-pdp-seller_title"))
-                if not loja:
-                    loja = await pegar_text_or_none(detail.locator("p.ui-pdp-seller_status, span.ui-pdp-seller_status"))
-                if not loja:
-                    loja_element = detail.locator("span.ui-pdp-seller__label-text-with-icon")
-                    if await loja_element.count() > 0:
-                        loja = await loja_element.first.evaluate(
-                            "element => element.childNodes[0].textContent.trim()"
-                        )
-
-                qtd_vendida = await pegar_text_or_none(detail.locator(
-                    "div.ui-pdp-seller_headerinfo-containersubtitle-one-line p.ui-pdp-sellerheader_subtitle"
-                ))
-                if not qtd_vendida:
-                    qtd_vendida = await pegar_text_or_none(detail.locator(".ui-pdp-subtitle"))
-                qtd_vendida = qtd_vendida or "Não informado"
-                # =============================================================
-
-                resultados.append({
-                    "concorrente": titulo,
-                    "Preço": preco,
-                    "Loja": loja,
-                    "qtd_vendida": qtd_vendida,
-                    "principal": produto,
-                    "link": link
-                })
-            finally:
-                await detail.close()
-
-        await browser.close()
-        return resultados
+        return [r for r in resultados if r is not None]
 
 
 def salvar_csv(produtos, arquivo):
@@ -144,15 +93,11 @@ def salvar_csv(produtos, arquivo):
 
 
 def salvar_excel(produtos, arquivo):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Produtos"
     campos = ["concorrente", "Preço", "Loja", "qtd_vendida", "link", "principal"]
-    ws.append(campos)
+    escritor = EscritorXLSX(arquivo, campos)
     for p in produtos:
-        ws.append([p[c] for c in campos])
-    wb.save(arquivo)
-    print(f"✅ Excel salvo: {arquivo}")
+        escritor.escrever(p)
+    escritor.fechar()
 
 
 # === FUNÇÕES DE COMPARAÇÃO COM IA ===
@@ -164,8 +109,7 @@ def extrair_compatibilidade(conteudo):
         return "NÃO"
 
 
-def comparar_com_ia(principal, concorrente):
-    prompt = f"""
+PROMPT = """
 Compare os dois produtos abaixo e diga se são compatíveis ou não.
 Leve em consideração nome, marca, cor, unidade, voltagem (se houver) e ano do produto. 
 Só aceite caso os parâmetros indicados combinem e tenham uma compatibilidade de no mínimo 97%.
@@ -177,6 +121,19 @@ Formato da resposta:
 Compatibilidade: SIM ou NÃO
 Justificativa: texto explicativo breve.
 """
+CRITERIO_LOTE = (
+    "Leve em consideração nome, marca, cor, unidade, voltagem (se houver) e ano do produto. "
+    "Só aceite caso os parâmetros indicados combinem e tenham uma compatibilidade de no mínimo 97%."
+)
+
+
+def comparar_com_ia(principal, concorrente):
+    # Mesmo par (normalizado) + modelo + prompt já respondido: não chama a API
+    em_cache = abrir_cache_ia().buscar(principal, concorrente, MODELO, PROMPT)
+    if em_cache is not None:
+        return em_cache
+
+    prompt = PROMPT.format(principal=principal, concorrente=concorrente)
     response = client.chat.completions.create(
         model=MODELO,
         messages=[{"role": "user", "content": prompt}],
@@ -188,26 +145,117 @@ Justificativa: texto explicativo breve.
 
     print(f"\n🧠 Comparação:\nPrincipal: {principal}\nConcorrente: {concorrente}\n👉 {conteudo}\n")
 
+    abrir_cache_ia().guardar(principal, concorrente, MODELO, PROMPT, compatibilidade)
     return compatibilidade
 
 
-def aplicar_ia_csv(arquivo_csv):
-    df = pd.read_csv(arquivo_csv)
-    df["compatibilidade"] = df.apply(
-        lambda row: comparar_com_ia(row["principal"], row["concorrente"]), axis=1
+def comparar_lote_com_ia(principal, concorrentes):
+    """Vários concorrentes do mesmo principal por requisição (ver ia_lote)."""
+    return comparar_em_lote(
+        client, MODELO, principal, concorrentes, CRITERIO_LOTE, comparar_com_ia,
+        cache=abrir_cache_ia(), prompt_cache=PROMPT,
     )
 
-    df.to_csv(RESULTADO_CSV, index=False, encoding="utf-8-sig")
-    df.to_excel(RESULTADO_XLSX, index=False)
-    print(f"\n✅ Resultados salvos:\n- {RESULTADO_CSV}\n- {RESULTADO_XLSX}")
+
+def classificar_com_ia(principais, concorrentes, em_lote=True, paralelo=True):
+    """Vereditos da IA na ordem dos pares: em lote e/ou em paralelo (motor_ia), ou um por um."""
+    if paralelo:
+        return classificar_em_paralelo(
+            principais, concorrentes, API_KEY, MODELO, PROMPT, extrair_compatibilidade,
+            criterio_lote=CRITERIO_LOTE if em_lote else None, cache=abrir_cache_ia(),
+        )
+    if em_lote:
+        # Um prompt por lote de concorrentes do mesmo principal (ver ia_lote)
+        return classificar_por_principal(principais, concorrentes, comparar_lote_com_ia)
+    return [comparar_com_ia(principal, concorrente) for principal, concorrente in zip(principais, concorrentes)]
+
+
+def aplicar_ia_df(dados, salvar=True, visoes=("csv", "xlsx"), em_lote=True, paralelo=True, usar_regras=True):
+    """
+    Classifica com a IA os registros vindos direto do scrape (lista de dicts)
+    ou um DataFrame, sem passar por arquivo, e devolve o DataFrame com a coluna compatibilidade.
+    Gravar é um efeito opcional: com `salvar=True` vai para Parquet e para
+    as `visoes` pedidas (CSV/XLSX). `em_lote=False` volta a uma chamada por linha;
+    `paralelo=True` manda as requisições juntas pelo motor_ia (rpm/tpm);
+    `usar_regras=False` manda todos os pares para a IA (sem atributos.decidir_por_regras).
+    """
+    if isinstance(dados, pd.DataFrame):
+        df = dados.copy()
+    else:
+        df = pd.DataFrame(list(dados), columns=None if dados else ["concorrente", "Preço", "Loja", "qtd_vendida", "link", "principal"])
+    # Pares óbvios (marca, polegadas, código do modelo...) saem das regras; só os ambíguos vão para a IA
+    df["compatibilidade"] = decidir_por_regras(df["principal"], df["concorrente"]) if usar_regras else None
+    ambiguos = df["compatibilidade"].isna()
+    if ambiguos.any():
+        df.loc[ambiguos, "compatibilidade"] = classificar_com_ia(
+            df.loc[ambiguos, "principal"], df.loc[ambiguos, "concorrente"], em_lote=em_lote, paralelo=paralelo
+        )
+    abrir_cache_ia().resumo()
+
+    if salvar:
+        # Parquet é o resultado; CSV/XLSX são visões opcionais geradas a partir dele
+        salvar_parquet(df, RESULTADO_PARQUET)
+        gerar_visoes(
+            RESULTADO_PARQUET,
+            csv=RESULTADO_CSV if "csv" in visoes else None,
+            xlsx=RESULTADO_XLSX if "xlsx" in visoes else None,
+        )
+        # Toda coleta entra no histórico de preços (consultas por produto/item/data)
+        registrar_coleta(df)
+    return df
+
+
+def aplicar_ia_csv(arquivo_csv, visoes=("csv", "xlsx")):
+    return aplicar_ia_df(pd.read_csv(arquivo_csv), visoes=visoes)
+
+
+# === PIPELINE (scrape → IA → arquivo) ===
+async def scrape_e_comparar(produto, max_itens=10, max_concurrency=8, max_ia=4, bloquear=True, pool=None, visoes=("csv", "xlsx")):
+    """
+    Mesmo resultado de scrape_mercado_livre + aplicar_ia_csv, mas em fluxo:
+    cada item vai para a IA assim que é extraído e para o RESULTADO_PARQUET
+    (em row groups) assim que é classificado. CSV/XLSX saem do Parquet no fim.
+    """
+    campos = ["concorrente", "Preço", "Loja", "qtd_vendida", "link", "principal", "compatibilidade"]
+    decididos = []   # itens resolvidos pelas regras de atributos, sem chamar a IA
+
+    def classificar(r):
+        decisao = decidir_por_regras([r["principal"]], [r["concorrente"]], verbose=False).iat[0]
+        if decisao is not None:
+            decididos.append(decisao)
+            return decisao
+        return comparar_com_ia(r["principal"], r["concorrente"])
+
+    async with garantir_pool(pool, bloquear=bloquear) as pool:
+        context = pool.contexto()
+        itens = await coletar_itens(context, produto, max_itens)
+
+        resultados = await executar_pipeline(
+            context,
+            itens,
+            extrair=lambda aba, it: extrair_item(aba, it, produto),
+            classificar=classificar,
+            escritores=[EscritorParquet(RESULTADO_PARQUET, campos, tamanho_grupo=500)],
+            max_abas=max_concurrency,
+            max_ia=max_ia,
+        )
+
+    if resultados:
+        print(f"🧮 Regras: {len(decididos)} de {len(resultados)} itens decididos sem IA")
+    abrir_cache_ia().resumo()
+
+    gerar_visoes(
+        RESULTADO_PARQUET,
+        csv=RESULTADO_CSV if "csv" in visoes else None,
+        xlsx=RESULTADO_XLSX if "xlsx" in visoes else None,
+    )
+    registrar_coleta(Ofertas.de_registros(resultados))
+    return resultados
 
 
 # === EXECUÇÃO PRINCIPAL ===
 if __name__ == "__main__":
     termo = "Smart Tv LG 50 4k Uhd Hdr Thinq Ai Pro Wi-fi Bluetooth Alexa Apple Airplay - 50tu801c0sa"
-    produtos = asyncio.run(scrape_mercado_livre(termo, max_itens=5))
-    salvar_csv(produtos, OUTPUT_CSV)
-    salvar_excel(produtos, OUTPUT_XLSX)
 
-    print("\n🚀 Iniciando comparações com IA...")
-    aplicar_ia_csv(OUTPUT_CSV)
\ No newline at end of file
+    print("\n🚀 Coletando e comparando com IA em paralelo...")
+    asyncio.run(scrape_e_comparar(termo, max_itens=5))
\ No newline at end of file
@@ -4,6 +4,11 @@ import re
 from django.conf import settings
 from datetime import datetime
 
+from atributos import decidir_por_regras
+from cache_ia import abrir_cache_ia
+from ia_lote import classificar_por_principal, comparar_em_lote
+from motor_ia import classificar_em_paralelo
+
 API_KEY = ""
 MODELO = "openai/gpt-oss-20b"
 
@@ -20,8 +25,7 @@ def extrair_compatibilidade(conteudo):
     else:
         return "NÃO"
 
-def comparar_com_ia(principal, concorrente):
-    prompt = f"""
+PROMPT = """
 Compare os dois produtos abaixo e diga se são compatíveis ou não.
 Leve em consideração nome, marca, cor, unidade, voltagem (se houver) e ano do produto. Só aceite caso os parâmetros indicados combinem e tenham uma compatibilidade de no mínimo 97%.
 
@@ -32,6 +36,18 @@ Formato da resposta:
 Compatibilidade: SIM ou NÃO
 Justificativa: texto explicativo breve.
 """
+CRITERIO_LOTE = (
+    "Leve em consideração nome, marca, cor, unidade, voltagem (se houver) e ano do produto. "
+    "Só aceite caso os parâmetros indicados combinem e tenham uma compatibilidade de no mínimo 97%."
+)
+
+def comparar_com_ia(principal, concorrente):
+    # Mesmo par (normalizado) + modelo + prompt já respondido: não chama a API
+    em_cache = abrir_cache_ia().buscar(principal, concorrente, MODELO, PROMPT)
+    if em_cache is not None:
+        return em_cache
+
+    prompt = PROMPT.format(principal=principal, concorrente=concorrente)
     response = client.chat.completions.create(
         model=MODELO,
         messages=[{"role": "user", "content": prompt}],
@@ -48,15 +64,35 @@ Justificativa: texto explicativo breve.
     print("👉 Resposta IA:", conteudo)
     print("Compatibilidade extraída:", compatibilidade, "\n")
 
+    abrir_cache_ia().guardar(principal, concorrente, MODELO, PROMPT, compatibilidade)
     return compatibilidade
 
-def processar_parquet(origem_path, destino_path):
+def comparar_lote_com_ia(principal, concorrentes):
+    """Vários concorrentes do mesmo principal por requisição (ver ia_lote)."""
+    return comparar_em_lote(
+        client, MODELO, principal, concorrentes, CRITERIO_LOTE, comparar_com_ia,
+        cache=abrir_cache_ia(), prompt_cache=PROMPT,
+    )
+
+def processar_parquet(origem_path, destino_path, paralelo=True, usar_regras=True):
     df = pd.read_parquet(origem_path)
 
-    # Aplica a comparação
-    df["compatibilidade"] = df.apply(
-        lambda row: comparar_com_ia(row["principal"], row["concorrente"]), axis=1
-    )
+    # Pares óbvios saem das regras (atributos); só os ambíguos vão para a IA
+    df["compatibilidade"] = decidir_por_regras(df["principal"], df["concorrente"]) if usar_regras else None
+    ambiguos = df["compatibilidade"].isna()
+
+    # Aplica a comparação: um prompt por lote de concorrentes do mesmo principal
+    if ambiguos.any():
+        principais, concorrentes = df.loc[ambiguos, "principal"], df.loc[ambiguos, "concorrente"]
+        if paralelo:
+            # Lotes saem juntos, no ritmo da cota do modelo (motor_ia)
+            df.loc[ambiguos, "compatibilidade"] = classificar_em_paralelo(
+                principais, concorrentes, API_KEY, MODELO, PROMPT, extrair_compatibilidade,
+                criterio_lote=CRITERIO_LOTE, cache=abrir_cache_ia(),
+            )
+        else:
+            df.loc[ambiguos, "compatibilidade"] = classificar_por_principal(principais, concorrentes, comparar_lote_com_ia)
+    abrir_cache_ia().resumo()
 
     # Salva o novo parquet
     df.to_parquet(destino_path, index=False)
@@ -0,0 +1,161 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+# === Configurações ===
+STATUS_LIMITE = {429, 503}
+MARCAS_CAPTCHA = ("captcha", "account-verification", "/gz/", "/jms/lgz/")
+TAXA_INICIAL = 4.0      # req/s por host
+TAXA_MIN = 0.25
+TAXA_MAX = 20.0
+RAJADA = 4
+
+
+class LimitadorHost:
+    """
+    Token bucket de um host com taxa adaptativa (AIMD):
+    - resposta boa e rápida: taxa += aumento / taxa (cresce devagar);
+    - resposta lenta (acima de `alvo_latencia`): taxa *= 0.9;
+    - 429/503, erro ou captcha: taxa *= fator_reducao e pausa o host por um
+      backoff exponencial com jitter (cresce a cada falha seguida).
+    """
+
+    def __init__(self, taxa_inicial=TAXA_INICIAL, taxa_min=TAXA_MIN, taxa_max=TAXA_MAX, rajada=RAJADA,
+                 alvo_latencia=3.0, aumento=0.5, fator_reducao=0.5, backoff_base=1.0, backoff_max=60.0):
+        self.taxa = taxa_inicial
+        self.taxa_min = taxa_min
+        self.taxa_max = taxa_max
+        self.rajada = rajada
+        self.alvo_latencia = alvo_latencia
+        self.aumento = aumento
+        self.fator_reducao = fator_reducao
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.tokens = float(rajada)
+        self.esperando = 0
+        self.reducoes = 0
+        self.falhas_seguidas = 0
+        self.pausado_ate = 0.0
+        self._ultimo = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _repor(self, agora):
+        self.tokens = min(self.rajada, self.tokens + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    async def adquirir(self):
+        self.esperando += 1
+        try:
+            async with self._lock:
+                while True:
+                    agora = time.monotonic()
+                    if agora < self.pausado_ate:
+                        await asyncio.sleep(self.pausado_ate - agora)
+                        continue
+                    self._repor(agora)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    await asyncio.sleep((1 - self.tokens) / self.taxa)
+        finally:
+            self.esperando -= 1
+
+    def registrar(self, latencia=None, status=None, erro=False, captcha=False):
+        if erro or captcha or status in STATUS_LIMITE:
+            self.taxa = max(self.taxa_min, self.taxa * self.fator_reducao)
+            self.reducoes += 1
+            self.falhas_seguidas += 1
+            teto = min(self.backoff_max, self.backoff_base * 2 ** (self.falhas_seguidas - 1))
+            self.pausado_ate = max(self.pausado_ate, time.monotonic() + random.uniform(teto / 2, teto))
+            self.tokens = 0.0
+            return
+
+        self.falhas_seguidas = 0
+        if latencia is not None and latencia > self.alvo_latencia:
+            self.taxa = max(self.taxa_min, self.taxa * 0.9)
+        else:
+            self.taxa = min(self.taxa_max, self.taxa + self.aumento / max(self.taxa, 1.0))
+
+    def estado(self):
+        return {
+            "taxa": round(self.taxa, 2),
+            "fila": self.esperando,
+            "reducoes": self.reducoes,
+            "pausado": max(0.0, round(self.pausado_ate - time.monotonic(), 1)),
+        }
+
+
+class _Requisicao:
+    def __init__(self):
+        self.status = None
+        self.captcha = False
+
+    def resposta(self, status=None, url=None):
+        self.status = status
+        if url and any(m in url for m in MARCAS_CAPTCHA):
+            self.captcha = True
+
+
+class LimitadorPorHost:
+    """Um LimitadorHost por host, criado na primeira requisição a ele."""
+
+    def __init__(self, **config):
+        self.config = config
+        self.hosts = {}
+
+    def para(self, url):
+        host = (urlparse(url).hostname or "").lower()
+        if host not in self.hosts:
+            self.hosts[host] = LimitadorHost(**self.config)
+        return self.hosts[host]
+
+    @asynccontextmanager
+    async def requisicao(self, url):
+        """
+        Aguarda a vez no host de `url` e, na saída, alimenta o controle de taxa
+        com a latência, o status (`req.resposta(status, url_final)`) e erros.
+        """
+        limitador = self.para(url)
+        await limitador.adquirir()
+        req = _Requisicao()
+        inicio = time.monotonic()
+        try:
+            yield req
+        except Exception:
+            limitador.registrar(erro=True)
+            raise
+        limitador.registrar(time.monotonic() - inicio, req.status, captcha=req.captcha)
+
+    def estado(self):
+        return {host: lim.estado() for host, lim in self.hosts.items()}
+
+    def resumo(self):
+        for host, e in self.estado().items():
+            print(f"🚦 {host}: {e['taxa']} req/s | fila {e['fila']} | {e['reducoes']} reduções")
+
+
+def config_por_processo(n_processos, **config):
+    """
+    Config de LimitadorPorHost para `n_processos` que batem nos mesmos hosts
+    sem se coordenar: cada um fica com 1/n das taxas e da rajada, e a soma
+    continua no orçamento de um processo só.
+    """
+    n = max(1, n_processos)
+    config = {"taxa_inicial": TAXA_INICIAL, "taxa_min": TAXA_MIN, "taxa_max": TAXA_MAX, "rajada": RAJADA, **config}
+    for chave in ("taxa_inicial", "taxa_min", "taxa_max"):
+        config[chave] = config[chave] / n
+    config["rajada"] = max(1, config["rajada"] // n)
+    return config
+
+
+@asynccontextmanager
+async def limitar(limitador, url):
+    """`limitador.requisicao(url)` quando houver limitador; senão não faz nada."""
+    if limitador is None:
+        yield _Requisicao()
+        return
+    async with limitador.requisicao(url) as req:
+        yield req
@@ -0,0 +1,269 @@
+import asyncio
+import random
+import re
+import time
+from collections import deque
+
+import groq
+from groq import AsyncGroq
+
+from cache_ia import normalizar_titulo
+from ia_lote import classificar_por_principal_async, comparar_em_lote_async, estimar_tokens
+
+# === Configurações ===
+RPM_PADRAO = 30               # requisições por minuto do modelo
+TPM_PADRAO = 6000             # tokens por minuto do modelo
+MAX_CONCORRENCIA = 8          # requisições em voo ao mesmo tempo
+MAX_TENTATIVAS = 5
+TOKENS_RESPOSTA = 256         # reserva para a resposta quando nem tokens_resposta nem max_tokens são informados
+JANELA = 60.0                 # segundos
+
+
+def _segundos(valor):
+    """Converte '7.66s', '2m59.56s', '120ms', '1h2m' ou '30' em segundos (None se ilegível)."""
+    if valor is None:
+        return None
+    texto = str(valor).strip()
+    try:
+        return float(texto)
+    except ValueError:
+        pass
+    partes = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", texto)
+    if not partes:
+        return None
+    escala = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    return sum(float(n) * escala[u] for n, u in partes)
+
+
+def _inteiro(valor):
+    try:
+        return int(float(valor))
+    except (TypeError, ValueError):
+        return None
+
+
+class OrcamentoIA:
+    """
+    Janela deslizante de 60s com os dois limites do modelo: requisições
+    (`rpm`) e tokens (`tpm`). Cada requisição reserva sua estimativa de
+    tokens antes de sair e corrige com o uso real depois. Os cabeçalhos
+    x-ratelimit-* da resposta ajustam o tpm à cota da conta e pausam tudo
+    até o reset quando a cota acaba; retry-after pausa pelo tempo pedido.
+    """
+
+    def __init__(self, rpm=RPM_PADRAO, tpm=TPM_PADRAO):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.pausado_ate = 0.0
+        self._eventos = deque()   # [instante, tokens]
+        self._tokens = 0
+        self._lock = asyncio.Lock()
+
+    def _limpar(self, agora):
+        while self._eventos and agora - self._eventos[0][0] >= JANELA:
+            self._tokens -= self._eventos.popleft()[1]
+
+    def _espera(self, agora, tokens):
+        if agora < self.pausado_ate:
+            return self.pausado_ate - agora
+        if len(self._eventos) >= self.rpm:
+            return self._eventos[0][0] + JANELA - agora
+        excesso = self._tokens + tokens - self.tpm
+        if excesso <= 0:
+            return 0
+        # Espera sair da janela o suficiente para caber esta reserva
+        liberado = 0
+        for instante, usados in self._eventos:
+            liberado += usados
+            if liberado >= excesso:
+                return instante + JANELA - agora
+        return JANELA
+
+    async def reservar(self, tokens):
+        """Espera caber na janela e devolve a reserva (para corrigir()). Fila FIFO."""
+        tokens = min(tokens, self.tpm)
+        async with self._lock:
+            while True:
+                agora = time.monotonic()
+                self._limpar(agora)
+                espera = self._espera(agora, tokens)
+                if espera <= 0:
+                    reserva = [agora, tokens]
+                    self._eventos.append(reserva)
+                    self._tokens += tokens
+                    return reserva
+                await asyncio.sleep(max(espera, 0.01))
+
+    def corrigir(self, reserva, tokens_usados):
+        if tokens_usados is None:
+            return
+        if any(evento is reserva for evento in self._eventos):
+            self._tokens += tokens_usados - reserva[1]
+        reserva[1] = tokens_usados
+
+    def pausar(self, segundos):
+        self.pausado_ate = max(self.pausado_ate, time.monotonic() + segundos)
+
+    def aplicar_cabecalhos(self, headers):
+        if not headers:
+            return
+        limite = _inteiro(headers.get("x-ratelimit-limit-tokens"))
+        if limite:
+            self.tpm = limite
+        if _inteiro(headers.get("x-ratelimit-remaining-requests")) == 0:
+            self.pausar(_segundos(headers.get("x-ratelimit-reset-requests")) or JANELA)
+        if _inteiro(headers.get("x-ratelimit-remaining-tokens")) == 0:
+            self.pausar(_segundos(headers.get("x-ratelimit-reset-tokens")) or JANELA)
+
+
+def _retry_after(headers):
+    if not headers:
+        return None
+    ms = _inteiro(headers.get("retry-after-ms"))
+    if ms is not None:
+        return ms / 1000
+    return _segundos(headers.get("retry-after"))
+
+
+class MotorIA:
+    """
+    Chamadas assíncronas ao modelo com no máximo `max_concorrencia` em voo,
+    agendadas pelo OrcamentoIA (rpm/tpm). 429, 5xx e falhas de conexão são
+    repetidas até `max_tentativas`, respeitando retry-after (senão backoff
+    exponencial com jitter). O cliente deve ter max_retries=0 para o motor
+    ver os 429.
+    """
+
+    def __init__(self, client, modelo, rpm=RPM_PADRAO, tpm=TPM_PADRAO, max_concorrencia=MAX_CONCORRENCIA, max_tentativas=MAX_TENTATIVAS):
+        self.client = client
+        self.modelo = modelo
+        self.orcamento = OrcamentoIA(rpm, tpm)
+        self.max_tentativas = max_tentativas
+        self.requisicoes = 0
+        self.repeticoes = 0
+        self.tokens = 0
+        self._semaforo = asyncio.Semaphore(max_concorrencia)
+        self._inicio = time.perf_counter()
+
+    async def completar(self, prompt, tokens_resposta=None, **opcoes):
+        """
+        Texto da resposta do modelo para `prompt` (levanta após esgotar as
+        tentativas). `tokens_resposta` só entra na reserva do orçamento TPM;
+        `opcoes` vão direto para a API (max_tokens, response_format...).
+        """
+        estimativa = estimar_tokens(prompt) + (tokens_resposta or opcoes.get("max_tokens") or TOKENS_RESPOSTA)
+
+        for tentativa in range(1, self.max_tentativas + 1):
+            async with self._semaforo:
+                reserva = await self.orcamento.reservar(estimativa)
+                try:
+                    bruto = await self.client.chat.completions.with_raw_response.create(
+                        model=self.modelo,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0,
+                        **opcoes,
+                    )
+                except (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError) as e:
+                    if tentativa == self.max_tentativas:
+                        raise
+                    headers = getattr(getattr(e, "response", None), "headers", None)
+                    self.orcamento.aplicar_cabecalhos(headers)
+                    espera = _retry_after(headers) or min(JANELA, 2 ** tentativa) * random.uniform(0.5, 1.0)
+                    if isinstance(e, groq.RateLimitError):
+                        # Cota estourada vale para todas as requisições, não só esta
+                        self.orcamento.pausar(espera)
+                    self.repeticoes += 1
+                    erro = e
+                else:
+                    self.requisicoes += 1
+                    self.orcamento.aplicar_cabecalhos(bruto.headers)
+                    resp = await bruto.parse()
+                    usados = getattr(resp.usage, "total_tokens", None) if resp.usage else None
+                    self.orcamento.corrigir(reserva, usados)
+                    self.tokens += usados or 0
+                    return resp.choices[0].message.content or ""
+            print(f"⏳ IA: {type(erro).__name__}, tentativa {tentativa}/{self.max_tentativas}, nova em {espera:.1f}s")
+            await asyncio.sleep(espera)
+
+    def resumo(self):
+        duracao = time.perf_counter() - self._inicio
+        por_minuto = 60 * self.requisicoes / duracao if duracao else 0.0
+        print(
+            f"⚡ IA assíncrona: {self.requisicoes} requisições ({self.repeticoes} repetidas), "
+            f"{self.tokens} tokens em {duracao:.1f}s ({por_minuto:.0f} req/min)"
+        )
+
+
+async def comparar_par(motor, principal, concorrente, prompt, interpretar, cache=None, falha=None, fila=None):
+    """
+    Versão assíncrona do comparar_com_ia dos scripts: `prompt` é o template
+    com {principal}/{concorrente}, `interpretar(conteudo)` devolve SIM/NÃO.
+    Usa o mesmo cache (chave do template). Erro entra na `fila`
+    (fila_ia.FilaIA) se houver; com `falha` definido, vira esse valor (sem ir
+    para o cache), senão a exceção sobe.
+    """
+    if cache is not None:
+        em_cache = cache.buscar(principal, concorrente, motor.modelo, prompt)
+        if em_cache is not None:
+            return em_cache
+    try:
+        conteudo = await motor.completar(prompt.format(principal=principal, concorrente=concorrente))
+    except Exception as e:
+        if fila is not None:
+            fila.adicionar(principal, concorrente, e)
+        if falha is None:
+            raise
+        print(f"⚠️ Erro IA: {e}")
+        return falha
+    resultado = interpretar(conteudo.strip())
+    if cache is not None:
+        cache.guardar(principal, concorrente, motor.modelo, prompt, resultado)
+    return resultado
+
+
+async def classificar_pares_async(pares, comparar):
+    """Roda `comparar(principal, concorrente)` para todos os pares ao mesmo tempo; pares repetidos uma vez só."""
+    pares = list(pares)
+    tarefas = {}
+    for principal, concorrente in pares:
+        chave = (normalizar_titulo(principal), normalizar_titulo(concorrente))
+        if chave not in tarefas:
+            tarefas[chave] = asyncio.ensure_future(comparar(principal, concorrente))
+    await asyncio.gather(*tarefas.values())
+    return [tarefas[(normalizar_titulo(p), normalizar_titulo(c))].result() for p, c in pares]
+
+
+def classificar_em_paralelo(principais, concorrentes, api_key, modelo, prompt, interpretar, criterio_lote=None,
+                            cache=None, falha=None, fila=None, rpm=RPM_PADRAO, tpm=TPM_PADRAO, max_concorrencia=MAX_CONCORRENCIA,
+                            http_client=None):
+    """
+    Ponto de entrada síncrono para aplicar_ia_df/processar_parquet: classifica
+    todas as linhas com o MotorIA e devolve os vereditos na ordem das linhas.
+    Com `criterio_lote` usa os lotes por principal do ia_lote (cada lote é uma
+    requisição concorrente, no cache com a mesma chave de `prompt`); sem
+    ele, uma requisição por par. `http_client` (httpx.AsyncClient) troca o
+    transporte do AsyncGroq, para proxy ou testes.
+    """
+    principais, concorrentes = list(principais), list(concorrentes)
+
+    async def rodar():
+        async with AsyncGroq(api_key=api_key, max_retries=0, http_client=http_client) as client:
+            motor = MotorIA(client, modelo, rpm=rpm, tpm=tpm, max_concorrencia=max_concorrencia)
+
+            def par(principal, concorrente):
+                return comparar_par(motor, principal, concorrente, prompt, interpretar, cache=cache, falha=falha, fila=fila)
+
+            if criterio_lote is None:
+                vereditos = await classificar_pares_async(zip(principais, concorrentes), par)
+            else:
+                vereditos = await classificar_por_principal_async(
+                    principais,
+                    concorrentes,
+                    lambda principal, lista: comparar_em_lote_async(
+                        motor, principal, lista, criterio_lote, par, cache=cache, prompt_cache=prompt, falha=falha, fila=fila
+                    ),
+                )
+            motor.resumo()
+            return vereditos
+
+    return asyncio.run(rodar())
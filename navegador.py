@@ -0,0 +1,88 @@
+import asyncio
+from contextlib import asynccontextmanager
+from itertools import cycle
+
+from playwright.async_api import async_playwright
+
+from bloqueio import bloquear_recursos, novo_stats, resumo_bloqueio
+
+
+# === Pool de navegador ===
+class PoolNavegador:
+    """
+    Um único Chromium de vida longa com `n_contextos` BrowserContexts,
+    entregues em rodízio. Use com `async with` e repasse o pool para as
+    funções de scraping (`pool=...`) para não relançar o navegador a cada termo.
+    """
+
+    def __init__(self, headless=False, n_contextos=1, bloquear=True):
+        self.headless = headless
+        self.n_contextos = max(1, n_contextos)
+        self.bloquear = bloquear
+        self.bloqueio = novo_stats() if bloquear else None
+        self.browser = None
+        self.contextos = []
+        self._playwright = None
+        self._rodizio = None
+
+    async def iniciar(self):
+        self._playwright = await async_playwright().start()
+        self.browser = await self._playwright.chromium.launch(headless=self.headless)
+        for _ in range(self.n_contextos):
+            context = await self.browser.new_context()
+            if self.bloquear:
+                await bloquear_recursos(context, stats=self.bloqueio)
+            self.contextos.append(context)
+        self._rodizio = cycle(self.contextos)
+        return self
+
+    async def fechar(self):
+        if self.bloqueio:
+            resumo_bloqueio(self.bloqueio)
+        try:
+            if self.browser:
+                await self.browser.close()
+        finally:
+            if self._playwright:
+                await self._playwright.stop()
+        self.browser = None
+        self.contextos = []
+
+    def contexto(self):
+        return next(self._rodizio)
+
+    async def __aenter__(self):
+        return await self.iniciar()
+
+    async def __aexit__(self, *exc):
+        await self.fechar()
+
+
+@asynccontextmanager
+async def garantir_pool(pool=None, **kwargs):
+    """Usa o pool recebido ou abre um temporário só para esta chamada."""
+    if pool is not None:
+        yield pool
+        return
+    async with PoolNavegador(**kwargs) as temporario:
+        yield temporario
+
+
+# === Execução em lote ===
+async def executar_lote(entradas, scrape, simultaneos=2):
+    """
+    Roda `scrape(entrada)` para cada entrada com no máximo `simultaneos`
+    em paralelo. Devolve os resultados na ordem das entradas; uma entrada
+    que falha vira lista vazia.
+    """
+    sem = asyncio.Semaphore(max(1, simultaneos))
+
+    async def uma(entrada):
+        async with sem:
+            try:
+                return await scrape(entrada)
+            except Exception as e:
+                print(f"⚠️ Erro no lote ({entrada}): {e}")
+                return []
+
+    return await asyncio.gather(*(uma(e) for e in entradas))
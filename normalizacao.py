@@ -0,0 +1,136 @@
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+# === Padrões ===
+# Preço já reduzido a dígitos, "," e "." (sem "R$", espaços, NBSP...)
+_RE_DECIMAL_PONTO = r"^\d+\.\d{1,2}$"          # 2199.00 / 2199.5 (JSON-LD, float)
+_RE_NUMERO = r"^(?P<inteiro>\d+)(?:\.(?P<fracao>\d+))?$"
+
+# "+1000 vendidos", "+10mil vendidos", "+2,5 mil", "+1 mi vendidos", "Mais de 50 vendidos"
+_RE_VENDIDOS = r"(?P<numero>\d+(?:[.,]\d+)*)\s*(?P<mult>milh(?:ão|ões|ao|oes)|mil|mi\b)?"
+_MULTIPLICADORES = {"mil": 1_000, "mi": 1_000_000}
+
+
+def _por_valor_unico(converter, serie):
+    """Aplica `converter` só aos valores distintos e espalha o resultado pela coluna."""
+    codigos, unicos = pd.factorize(serie)
+    convertidos = pd.array(converter(pd.Series(unicos, dtype=object)), dtype="Int64")
+    return pd.Series(convertidos.take(codigos, allow_fill=True), index=serie.index, name=serie.name)
+
+
+# === Preço ===
+def preco_centavos(serie):
+    """
+    Converte uma coluna de preços em centavos exatos (Int64, <NA> quando não
+    há número), sem passar por float nos textos:
+    - "R$ 2.199,90" / "2.199" / "89,90"  -> formato BRL (ponto = milhar);
+    - "2199.00" / "R$ 2199.0" / 2199.0   -> ponto decimal (JSON-LD, float).
+    Um ponto só é decimal quando é o único e tem 1 ou 2 dígitos depois.
+    """
+    serie = pd.Series(serie)
+    if pd.api.types.is_numeric_dtype(serie):
+        return pd.Series(np.round(serie.astype("float64") * 100), index=serie.index).astype("Int64")
+    return _por_valor_unico(_centavos_texto, serie)
+
+
+def _centavos_texto(serie):
+    texto = serie.astype("string").str.replace(r"[^\d,.]", "", regex=True)
+    tem_virgula = texto.str.contains(",", regex=False, na=False)
+    decimal_ponto = ~tem_virgula & texto.str.match(_RE_DECIMAL_PONTO, na=False)
+
+    # BRL: "." é milhar e "," é decimal; caso contrário "." é milhar se não for decimal
+    brl = texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    texto = texto.where(decimal_ponto, brl)
+
+    partes = texto.str.extract(_RE_NUMERO)
+    fracao = partes["fracao"].fillna("").str.slice(0, 2).str.pad(2, side="right", fillchar="0")
+    inteiro = pd.to_numeric(partes["inteiro"], errors="coerce").astype("Int64")
+    centavos = pd.to_numeric(fracao, errors="coerce").astype("Int64")
+    return inteiro * 100 + centavos
+
+
+def centavos_para_reais(centavos):
+    """Centavos (Int64) de volta a reais, só para exibição/ordenação em float."""
+    return pd.Series(centavos).astype("Float64") / 100
+
+
+# === Quantidade vendida ===
+def qtd_vendida_min(serie):
+    """
+    Limite inferior inteiro da quantidade vendida (Int64, <NA> quando o texto
+    não traz número, ex.: "Não informado"). "+10mil" -> 10000, "+2,5 mil" -> 2500,
+    "+1 mi" -> 1000000, "+1.000" -> 1000.
+    """
+    serie = pd.Series(serie)
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype("Float64").floordiv(1).astype("Int64")
+    return _por_valor_unico(_vendidos_texto, serie)
+
+
+def _vendidos_texto(serie):
+    partes = serie.astype("string").str.lower().str.extract(_RE_VENDIDOS)
+    mult = partes["mult"]
+    fator = np.select(
+        [mult.str.startswith("milh", na=False) | mult.eq("mi").fillna(False), mult.eq("mil").fillna(False)],
+        [_MULTIPLICADORES["mi"], _MULTIPLICADORES["mil"]],
+        default=1,
+    )
+
+    # Com multiplicador a vírgula é decimal ("2,5 mil"); sem ele, "." e "," são milhar
+    numero = partes["numero"]
+    decimal = numero.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    inteiro = numero.str.replace(r"[.,]", "", regex=True)
+    numero = decimal.where(mult.notna(), inteiro)
+
+    valor = pd.to_numeric(numero, errors="coerce").astype("float64") * fator
+    return pd.Series(np.floor(valor), index=serie.index).astype("Int64")
+
+
+# === Valores soltos (mesmas regras, sem pandas) ===
+def centavos_de(valor):
+    """Versão escalar de preco_centavos: um preço -> centavos (int) ou None."""
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float)):
+        return None if math.isnan(valor) else int(round(valor * 100))
+    texto = re.sub(r"[^\d,.]", "", str(valor))
+    if "," in texto or not re.match(_RE_DECIMAL_PONTO, texto):
+        texto = texto.replace(".", "").replace(",", ".")
+    m = re.match(_RE_NUMERO, texto)
+    if not m:
+        return None
+    fracao = (m.group("fracao") or "")[:2].ljust(2, "0")
+    return int(m.group("inteiro")) * 100 + int(fracao)
+
+
+def vendidos_min_de(valor):
+    """Versão escalar de qtd_vendida_min: texto -> limite inferior (int) ou None."""
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float)):
+        return None if math.isnan(valor) else int(valor // 1)
+    m = re.search(_RE_VENDIDOS, str(valor).lower())
+    if not m:
+        return None
+    mult = m.group("mult")
+    if mult is None:
+        return int(re.sub(r"[.,]", "", m.group("numero")))
+    fator = _MULTIPLICADORES["mi"] if mult == "mi" or mult.startswith("milh") else _MULTIPLICADORES["mil"]
+    return int(math.floor(float(m.group("numero").replace(".", "").replace(",", ".")) * fator))
+
+
+# === DataFrame ===
+def normalizar_colunas(df, coluna_preco="Preço", coluna_vendidos="qtd_vendida"):
+    """
+    Acrescenta `preco_centavos` e `qtd_vendida_min` ao DataFrame (coluna inteira
+    de uma vez), mantendo os textos originais para exibição.
+    """
+    df = df.copy()
+    if coluna_preco in df.columns:
+        df["preco_centavos"] = preco_centavos(df[coluna_preco])
+    if coluna_vendidos in df.columns:
+        df["qtd_vendida_min"] = qtd_vendida_min(df[coluna_vendidos])
+    return df
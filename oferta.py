@@ -0,0 +1,238 @@
+import sys
+from array import array
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from canonico import id_item
+from normalizacao import centavos_de, vendidos_min_de
+
+# === Esquemas de origem ===
+# campo da Oferta -> chave do dict em cada família de scripts
+ESQUEMA_COMPARACAO = {   # teste.py, teste02.py, inteligencia.py
+    "produto": "principal",
+    "titulo": "concorrente",
+    "preco": "Preço",
+    "loja": "Loja",
+    "qtd_vendida": "qtd_vendida",
+    "link": "link",
+    "compatibilidade": "compatibilidade",
+}
+ESQUEMA_RASPAGEM = {     # raspagem.py: o produto buscado fica em "concorrente"
+    **ESQUEMA_COMPARACAO,
+    "produto": "concorrente",
+    "titulo": "principal",
+}
+ESQUEMA_CRAWL = {        # teste12.py
+    "titulo": "titulo",
+    "preco": "preco",
+    "loja": "loja",
+    "link": "link",
+}
+
+# Esquema único para as etapas seguintes (Parquet, histórico, ranking)
+ESQUEMA_ARROW = pa.schema([
+    ("produto", pa.dictionary(pa.int32(), pa.string())),
+    ("titulo", pa.string()),
+    ("preco_centavos", pa.int64()),
+    ("loja", pa.dictionary(pa.int32(), pa.string())),
+    ("qtd_vendida_min", pa.int64()),
+    ("link", pa.string()),
+    ("item", pa.string()),
+    ("compatibilidade", pa.dictionary(pa.int32(), pa.string())),
+])
+
+
+def _texto(valor):
+    if valor is None or (isinstance(valor, float) and valor != valor):
+        return None
+    return str(valor)
+
+
+def _internar(valor):
+    texto = _texto(valor)
+    return sys.intern(texto) if texto else None
+
+
+class Oferta:
+    """Um anúncio raspado, com tipos fixos: preço em centavos e vendidos como inteiro."""
+
+    __slots__ = ("produto", "titulo", "preco_centavos", "loja", "qtd_vendida_min", "link", "item", "compatibilidade")
+
+    def __init__(self, produto, titulo=None, preco_centavos=None, loja=None, qtd_vendida_min=None, link=None, compatibilidade=None):
+        self.produto = _internar(produto)
+        self.titulo = _texto(titulo)
+        self.preco_centavos = preco_centavos
+        self.loja = _internar(loja)
+        self.qtd_vendida_min = qtd_vendida_min
+        self.link = _texto(link)
+        self.item = id_item(self.link)
+        self.compatibilidade = _internar(compatibilidade)
+
+    @classmethod
+    def de_registro(cls, registro, esquema=ESQUEMA_COMPARACAO, produto=None):
+        """Converte um dict de qualquer script (ver ESQUEMA_*) numa Oferta."""
+        def campo(nome):
+            chave = esquema.get(nome)
+            return registro.get(chave) if chave else None
+
+        return cls(
+            produto=produto if produto is not None else campo("produto"),
+            titulo=campo("titulo"),
+            preco_centavos=centavos_de(campo("preco")),
+            loja=campo("loja"),
+            qtd_vendida_min=vendidos_min_de(campo("qtd_vendida")),
+            link=campo("link"),
+            compatibilidade=campo("compatibilidade"),
+        )
+
+    def __repr__(self):
+        return f"Oferta({self.item or self.link!r}, {self.preco_centavos}, {self.loja!r})"
+
+
+# === Coleção colunar ===
+class _Dicionario:
+    """Coluna codificada: um código int32 por linha e cada texto guardado uma vez."""
+
+    def __init__(self):
+        self.codigos = array("i")
+        self.valores = []
+        self._indice = {}
+
+    def adicionar(self, valor):
+        if valor is None:
+            self.codigos.append(-1)
+            return
+        codigo = self._indice.get(valor)
+        if codigo is None:
+            codigo = self._indice[valor] = len(self.valores)
+            self.valores.append(sys.intern(valor))
+        self.codigos.append(codigo)
+
+    def valor(self, i):
+        codigo = self.codigos[i]
+        return None if codigo < 0 else self.valores[codigo]
+
+    def _numpy(self):
+        # Cópia: a coleção continua aceitando linhas depois de exportar
+        return np.frombuffer(self.codigos, dtype=np.int32).copy()
+
+    def para_arrow(self):
+        codigos = self._numpy()
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codigos, mask=codigos < 0), pa.array(self.valores, type=pa.string())
+        )
+
+    def para_pandas(self):
+        # from_codes usa os códigos como estão (-1 = ausente), sem copiar texto
+        return pd.Categorical.from_codes(self._numpy(), categories=self.valores)
+
+
+class _Inteiros:
+    """Coluna int64 com ausentes (máscara de 1 byte por linha)."""
+
+    def __init__(self):
+        self.valores = array("q")
+        self.presentes = bytearray()
+
+    def adicionar(self, valor):
+        self.valores.append(0 if valor is None else valor)
+        self.presentes.append(valor is not None)
+
+    def valor(self, i):
+        return self.valores[i] if self.presentes[i] else None
+
+    def _numpy(self):
+        # Cópia, como em _Dicionario: o array('q') segue crescendo sem BufferError
+        return np.frombuffer(self.valores, dtype=np.int64).copy(), np.frombuffer(self.presentes, dtype=bool).copy()
+
+    def para_arrow(self):
+        valores, presentes = self._numpy()
+        return pa.array(valores, mask=~presentes)
+
+    def para_pandas(self):
+        valores, presentes = self._numpy()
+        return pd.arrays.IntegerArray(valores, ~presentes)
+
+
+class Ofertas:
+    """
+    Coleção colunar de ofertas: produto, loja e compatibilidade codificados em
+    dicionário (cada texto guardado uma vez), números em array('q'). Vira
+    Arrow (colunas dictionary) ou pandas (categorias e Int64) sem passar por
+    DataFrame de objetos. Os arrays numéricos são copiados uma vez na
+    exportação (um memcpy por coluna), então a coleção pode continuar
+    recebendo ofertas depois de para_arrow()/para_pandas().
+    """
+
+    def __init__(self):
+        self.produto = _Dicionario()
+        self.loja = _Dicionario()
+        self.compatibilidade = _Dicionario()
+        self.preco_centavos = _Inteiros()
+        self.qtd_vendida_min = _Inteiros()
+        self.titulo = []
+        self.link = []
+        self.item = []
+
+    @classmethod
+    def de_registros(cls, registros, esquema=ESQUEMA_COMPARACAO, produto=None):
+        ofertas = cls()
+        for registro in registros:
+            ofertas.adicionar(Oferta.de_registro(registro, esquema, produto=produto))
+        return ofertas
+
+    def adicionar(self, oferta):
+        self.produto.adicionar(oferta.produto)
+        self.loja.adicionar(oferta.loja)
+        self.compatibilidade.adicionar(oferta.compatibilidade)
+        self.preco_centavos.adicionar(oferta.preco_centavos)
+        self.qtd_vendida_min.adicionar(oferta.qtd_vendida_min)
+        self.titulo.append(oferta.titulo)
+        self.link.append(oferta.link)
+        self.item.append(oferta.item)
+
+    def __len__(self):
+        return len(self.titulo)
+
+    def __getitem__(self, i):
+        return Oferta(
+            self.produto.valor(i),
+            titulo=self.titulo[i],
+            preco_centavos=self.preco_centavos.valor(i),
+            loja=self.loja.valor(i),
+            qtd_vendida_min=self.qtd_vendida_min.valor(i),
+            link=self.link[i],
+            compatibilidade=self.compatibilidade.valor(i),
+        )
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def para_arrow(self):
+        return pa.Table.from_arrays(
+            [
+                self.produto.para_arrow(),
+                pa.array(self.titulo, type=pa.string()),
+                self.preco_centavos.para_arrow(),
+                self.loja.para_arrow(),
+                self.qtd_vendida_min.para_arrow(),
+                pa.array(self.link, type=pa.string()),
+                pa.array(self.item, type=pa.string()),
+                self.compatibilidade.para_arrow(),
+            ],
+            schema=ESQUEMA_ARROW,
+        )
+
+    def para_pandas(self):
+        return pd.DataFrame({
+            "produto": self.produto.para_pandas(),
+            "titulo": self.titulo,
+            "preco_centavos": self.preco_centavos.para_pandas(),
+            "loja": self.loja.para_pandas(),
+            "qtd_vendida_min": self.qtd_vendida_min.para_pandas(),
+            "link": self.link,
+            "item": self.item,
+            "compatibilidade": self.compatibilidade.para_pandas(),
+        })
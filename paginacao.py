@@ -0,0 +1,174 @@
+import asyncio
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from canonico import chave_canonica
+from http_rapido import criar_cliente, limpar
+
+# === Configurações ===
+# A listagem do Mercado Livre pagina por offset na própria URL:
+# .../smart-tv-lg_Desde_49_NoIndex_True  (página 2 com 48 itens por página)
+ITENS_POR_PAGINA = 48
+_RE_DESDE = re.compile(r"_Desde_(\d+)")
+
+
+# === Parse da listagem ===
+class _ColetorListagem(HTMLParser):
+    """Coleta {title, href} dos a.poly-component__title e os offsets da paginação."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.itens = []
+        self.offsets = set()
+        self._atual = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        attrs = dict(attrs)
+        href = attrs.get("href") or ""
+        m = _RE_DESDE.search(href)
+        if m:
+            self.offsets.add(int(m.group(1)))
+        if "poly-component__title" in (attrs.get("class") or "").split() and href:
+            self._atual = {"title": [], "href": href}
+
+    def handle_data(self, data):
+        if self._atual is not None:
+            self._atual["title"].append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._atual is not None:
+            self._atual["title"] = limpar("".join(self._atual["title"]))
+            self.itens.append(self._atual)
+            self._atual = None
+
+
+def extrair_listagem(html, base=None):
+    coletor = _ColetorListagem()
+    try:
+        coletor.feed(html)
+        coletor.close()
+    except:
+        pass
+    if base:
+        for it in coletor.itens:
+            it["href"] = urljoin(base, it["href"])
+    return coletor.itens, sorted(coletor.offsets)
+
+
+def tamanho_pagina(offsets, n_itens):
+    """Passo entre offsets da paginação; sem paginação visível, o tamanho da 1ª página."""
+    offsets = sorted({1, *offsets})
+    passos = [b - a for a, b in zip(offsets, offsets[1:])]
+    if passos:
+        return min(passos)
+    return n_itens or ITENS_POR_PAGINA
+
+
+def url_pagina(url, desde):
+    """URL da listagem começando no item `desde` (1 = primeira página)."""
+    base, sep, query = url.partition("?")
+    base = base.rstrip("/")
+    if _RE_DESDE.search(base):
+        base = _RE_DESDE.sub(f"_Desde_{desde}", base)
+    elif "_NoIndex_True" in base:
+        base = base.replace("_NoIndex_True", f"_Desde_{desde}_NoIndex_True", 1)
+    else:
+        base = f"{base}_Desde_{desde}_NoIndex_True"
+    return base + sep + query
+
+
+# === Buscadores de página ===
+def buscador_http(client):
+    async def buscar(url):
+        resp = await client.get(url)
+        resp.raise_for_status()
+        return resp.text
+    return buscar
+
+
+def buscador_navegador(context):
+    async def buscar(url):
+        page = await context.new_page()
+        try:
+            await page.goto(url, timeout=60000)
+            try:
+                await page.wait_for_selector("a.poly-component__title", timeout=15000)
+            except:
+                pass
+            return await page.content()
+        finally:
+            await page.close()
+    return buscar
+
+
+# === Crawler ===
+async def crawl_listagem(url, buscar, alvo=200, max_concurrency=4):
+    """
+    Busca a primeira página, descobre o passo da paginação e baixa as
+    páginas seguintes em paralelo (ondas de `max_concurrency`) até juntar
+    `alvo` itens. Para cedo quando uma onda inteira não traz nenhum item novo.
+    """
+    primeira, offsets = extrair_listagem(await buscar(url), base=url)
+    if not primeira:
+        return []
+
+    passo = tamanho_pagina(offsets, len(primeira))
+    itens = []
+    vistos = set()
+
+    def acrescentar(novos):
+        antes = len(itens)
+        for it in novos:
+            chave = chave_canonica(it["href"])
+            if chave not in vistos:
+                vistos.add(chave)
+                itens.append(it)
+        return len(itens) - antes
+
+    acrescentar(primeira)
+    paginas = 1
+    desde = 1 + passo
+
+    while len(itens) < alvo:
+        faltam = -(-(alvo - len(itens)) // passo)
+        onda = [desde + k * passo for k in range(min(max_concurrency, faltam))]
+        desde = onda[-1] + passo
+
+        async def uma(d):
+            try:
+                pagina = url_pagina(url, d)
+                return extrair_listagem(await buscar(pagina), base=pagina)[0]
+            except Exception as e:
+                print(f"Erro na página _Desde_{d}: {e}")
+                return []
+
+        resultados = await asyncio.gather(*(uma(d) for d in onda))
+
+        # A onda inteira conta: uma página vazia no meio (erro, repetida) não
+        # descarta as seguintes; só para se nenhuma página trouxe item novo
+        paginas += len(resultados)
+        if sum(acrescentar(novos) for novos in resultados) == 0:
+            break
+
+    print(f"📄 Listagem: {len(itens)} itens em {paginas} páginas (alvo {alvo})")
+    return itens[:alvo]
+
+
+async def coletar_listagem(url, alvo=200, context=None, max_concurrency=4):
+    """
+    Crawler da listagem por HTTP; se a primeira página não vier pelo HTTP
+    (bloqueio, captcha) e houver um context, repete pelo navegador.
+    """
+    async with criar_cliente(max_conexoes=max_concurrency) as client:
+        try:
+            itens = await crawl_listagem(url, buscador_http(client), alvo, max_concurrency)
+        except Exception as e:
+            print(f"Listagem por HTTP falhou: {e}")
+            itens = []
+
+    if not itens and context is not None:
+        itens = await crawl_listagem(url, buscador_navegador(context), alvo, max_concurrency)
+    return itens
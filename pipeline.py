@@ -0,0 +1,143 @@
+import asyncio
+import csv
+import inspect
+import time
+from pathlib import Path
+
+_FIM = object()
+
+
+# === Escritores incrementais ===
+class EscritorCSV:
+    """Grava uma linha por registro assim que ele chega (sem guardar tudo na memória)."""
+
+    def __init__(self, arquivo, campos):
+        self.arquivo = Path(arquivo)
+        self.campos = campos
+        self.linhas = 0
+        self._f = open(self.arquivo, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.DictWriter(self._f, fieldnames=campos, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def escrever(self, registro):
+        self._writer.writerow(registro)
+        self.linhas += 1
+        self._f.flush()
+
+    def fechar(self):
+        self._f.close()
+        print(f"✅ CSV salvo: {self.arquivo} ({self.linhas} linhas)")
+
+
+# === Pipeline ===
+async def executar_pipeline(context, itens, extrair, classificar, escritores=(), max_abas=8, max_ia=4, tamanho_fila=32):
+    """
+    Scrape → IA → gravação em estágios ligados por filas limitadas:
+    - `max_abas` workers, cada um com sua aba, rodam `extrair(aba, item)`;
+    - `max_ia` workers rodam `classificar(registro)` (função comum roda em
+      thread, coroutine é aguardada) e guardam o resultado em
+      registro["compatibilidade"];
+    - um único gravador repassa os registros, na ordem da listagem, para
+      cada escritor (`escrever(registro)` / `fechar()`).
+    As comparações da IA começam assim que o primeiro item é extraído.
+    Devolve a lista de registros classificados, na ordem da listagem.
+    """
+    fila_itens = asyncio.Queue(maxsize=tamanho_fila)
+    fila_ia = asyncio.Queue(maxsize=tamanho_fila)
+    fila_saida = asyncio.Queue(maxsize=tamanho_fila)
+    stats = {"extraidos": 0, "classificados": 0, "falhas_scrape": 0, "falhas_ia": 0}
+    inicio = time.perf_counter()
+    assincrono = inspect.iscoroutinefunction(classificar)
+
+    async def produtor():
+        for idx, it in enumerate(itens):
+            await fila_itens.put((idx, it))
+        for _ in range(max_abas):
+            await fila_itens.put(_FIM)
+
+    async def worker_scrape():
+        aba = await context.new_page()
+        try:
+            while (tarefa := await fila_itens.get()) is not _FIM:
+                idx, it = tarefa
+                try:
+                    registro = await extrair(aba, it)
+                    stats["extraidos"] += 1
+                except Exception as e:
+                    print(f"Erro ao processar {it.get('href')}: {e}")
+                    stats["falhas_scrape"] += 1
+                    registro = None
+                    if aba.is_closed():
+                        aba = await context.new_page()
+                await fila_ia.put((idx, registro))
+        finally:
+            try:
+                await aba.close()
+            except:
+                pass
+
+    async def worker_ia():
+        while (tarefa := await fila_ia.get()) is not _FIM:
+            idx, registro = tarefa
+            if registro is not None:
+                try:
+                    if assincrono:
+                        registro["compatibilidade"] = await classificar(registro)
+                    else:
+                        registro["compatibilidade"] = await asyncio.to_thread(classificar, registro)
+                    stats["classificados"] += 1
+                except Exception as e:
+                    print(f"⚠️ Erro IA: {e}")
+                    stats["falhas_ia"] += 1
+                    registro["compatibilidade"] = None
+            await fila_saida.put((idx, registro))
+
+    resultados = []
+
+    async def gravador():
+        # Reordena: só grava o item i depois que 0..i-1 já passaram
+        pendentes = {}
+        proximo = 0
+        while (tarefa := await fila_saida.get()) is not _FIM:
+            idx, registro = tarefa
+            pendentes[idx] = registro
+            while proximo in pendentes:
+                registro = pendentes.pop(proximo)
+                proximo += 1
+                if registro is None:
+                    continue
+                for escritor in escritores:
+                    escritor.escrever(registro)
+                resultados.append(registro)
+
+    async def encerrar(workers, fila, n_seguintes):
+        await asyncio.gather(*workers)
+        for _ in range(n_seguintes):
+            await fila.put(_FIM)
+
+    scrapers = [asyncio.create_task(worker_scrape()) for _ in range(max_abas)]
+    ias = [asyncio.create_task(worker_ia()) for _ in range(max_ia)]
+    etapas = [
+        asyncio.create_task(produtor()),
+        asyncio.create_task(encerrar(scrapers, fila_ia, max_ia)),
+        asyncio.create_task(encerrar(ias, fila_saida, 1)),
+        asyncio.create_task(gravador()),
+    ]
+    try:
+        await asyncio.gather(*etapas)
+    finally:
+        # Um erro fora do try por item (new_page, escritor...) derruba uma
+        # etapa; as outras ficariam presas numa fila que ninguém consome
+        tarefas = scrapers + ias + etapas
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        for escritor in escritores:
+            escritor.fechar()
+
+    duracao = time.perf_counter() - inicio
+    print(
+        f"🚀 Pipeline: {stats['extraidos']} extraídos, {stats['classificados']} classificados "
+        f"em {duracao:.1f}s | falhas scrape={stats['falhas_scrape']} ia={stats['falhas_ia']}"
+    )
+    return resultados
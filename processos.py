@@ -0,0 +1,130 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cache_paginas import CachePaginas
+from limitador import LimitadorPorHost, config_por_processo
+from navegador import PoolNavegador
+from raspagem import salvar_resultado, scrape_lote_mercado_livre
+
+
+# === Divisão dos termos ===
+def dividir(termos, n_shards):
+    """Reparte os termos em até `n_shards` fatias intercaladas (0, n, 2n, ...)."""
+    n = max(1, min(n_shards, len(termos)))
+    return [termos[i::n] for i in range(n)]
+
+
+def _rodar_shard(indice, termos, opcoes):
+    """
+    Executa num processo filho: um Chromium próprio (headless) para todos os
+    termos do shard. O limitador do shard usa a fatia `limite` da taxa por
+    host (config_por_processo), já que os shards não se coordenam. Devolve os
+    resultados por termo e as métricas do shard.
+    """
+    opcoes = dict(opcoes)
+    bloquear = opcoes.pop("bloquear", True)
+    limitador = LimitadorPorHost(**opcoes.pop("limite", {}))
+    cache = CachePaginas() if opcoes.pop("usar_cache", False) else None
+
+    async def rodar():
+        async with PoolNavegador(headless=True, bloquear=bloquear) as pool:
+            return await scrape_lote_mercado_livre(termos, pool=pool, cache=cache, limitador=limitador, **opcoes)
+
+    inicio = time.perf_counter()
+    try:
+        por_termo = asyncio.run(rodar())
+    finally:
+        if cache is not None:
+            cache.fechar()
+
+    return {
+        "shard": indice,
+        "pid": os.getpid(),
+        "termos": len(termos),
+        "itens": sum(len(regs) for regs in por_termo.values()),
+        "segundos": time.perf_counter() - inicio,
+        "resultados": por_termo,
+    }
+
+
+def resumo_shard(rel):
+    vazao = rel["itens"] / rel["segundos"] if rel["segundos"] else 0.0
+    print(
+        f"🧩 Shard {rel['shard']} (pid {rel['pid']}): {rel['termos']} termos, "
+        f"{rel['itens']} itens em {rel['segundos']:.1f}s ({vazao:.2f} itens/s)"
+    )
+
+
+# === Execução em processos ===
+def scrape_em_processos(termos, n_processos=None, max_itens=20, max_concurrency=8, termos_simultaneos=2, bloquear=True, modo_http=False, capturar_json=False, paginar=False, usar_cache=False, retomar=False):
+    """
+    Espalha os termos por um pool de processos (padrão: um por núcleo), cada
+    um com seu navegador e seu loop asyncio, para o parse e o tráfego CDP não
+    ficarem presos num só núcleo. A taxa por host é repartida entre os
+    shards, e o cache de páginas é o mesmo arquivo para todos (gravações
+    esperam a vez; ver CachePaginas). Devolve (termo -> registros, na ordem dos
+    termos; métricas de cada shard). Um shard que cai deixa seus termos vazios.
+    Chame de dentro de `if __name__ == "__main__":` (os filhos usam spawn).
+    """
+    if not termos:
+        return {}, []
+
+    shards = dividir(list(termos), n_processos or os.cpu_count() or 1)
+    opcoes = {
+        "max_itens": max_itens,
+        "max_concurrency": max_concurrency,
+        "termos_simultaneos": termos_simultaneos,
+        "bloquear": bloquear,
+        "modo_http": modo_http,
+        "capturar_json": capturar_json,
+        "paginar": paginar,
+        "usar_cache": usar_cache,
+        "retomar": retomar,
+        "limite": config_por_processo(len(shards)),
+    }
+
+    por_termo = {}
+    relatorios = []
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=multiprocessing.get_context("spawn")) as executor:
+        futuros = {executor.submit(_rodar_shard, i, shard, opcoes): i for i, shard in enumerate(shards)}
+        for futuro in as_completed(futuros):
+            try:
+                rel = futuro.result()
+            except Exception as e:
+                print(f"⚠️ Shard {futuros[futuro]} falhou: {e}")
+                continue
+            por_termo.update(rel.pop("resultados"))
+            relatorios.append(rel)
+            resumo_shard(rel)
+
+    duracao = time.perf_counter() - inicio
+    total = sum(rel["itens"] for rel in relatorios)
+    print(
+        f"🏁 {len(termos)} termos em {len(shards)} processos: {total} itens em {duracao:.1f}s "
+        f"({total / duracao if duracao else 0.0:.2f} itens/s)"
+    )
+    relatorios.sort(key=lambda rel: rel["shard"])
+    return {termo: por_termo.get(termo, []) for termo in termos}, relatorios
+
+
+def juntar(por_termo):
+    """Registros de todos os termos numa lista só, no esquema de salvar_csv/salvar_resultado."""
+    return [registro for registros in por_termo.values() for registro in registros]
+
+
+# === Execução principal ===
+if __name__ == "__main__":
+    termos = [
+        "Smart Tv De 43 LG Tu801c 43tu801c0sa Com Tela Led 4k - Preto",
+        "Smart Tv 50 Samsung Crystal UHD 4K",
+        "Smart Tv 32 TCL S5400A Android",
+        "Smart Tv 55 Philco 4K QLED",
+    ]
+    por_termo, _ = scrape_em_processos(termos, max_itens=10, usar_cache=True)
+    produtos = juntar(por_termo)
+
+    salvar_resultado(produtos)
@@ -0,0 +1,49 @@
+import numpy as np
+
+from normalizacao import normalizar_colunas, preco_centavos
+
+# === Configurações ===
+LOJA_OFICIAL = "Comprebel (Oficial)"
+POSICAO_INDICADA = 3          # preço indicado = 3º mais barato entre os compatíveis
+_SEM_PRECO = np.iinfo("int64").max
+
+
+def ranking_por_principal(df, loja_oficial=LOJA_OFICIAL, posicao=POSICAO_INDICADA):
+    """
+    Ranking de preço por `principal`, numa passada só sobre o DataFrame inteiro.
+    Acrescenta colunas numéricas (Int64/Float64, <NA> quando não se aplica):
+    - ranking: posição do item compatível (compatibilidade == "SIM") dentro do
+      seu principal, do mais barato ao mais caro; sem preço fica no fim e
+      empates seguem a ordem da listagem;
+    - preco_indicado_centavos: `posicao`-ésimo preço compatível do principal
+      (ou o mais caro, se houver menos que `posicao` com preço);
+    - preco_oficial_centavos: preço da linha da loja oficial do principal
+      (ou da coluna preço_oficial, quando não há essa linha);
+    - preço_indicado: preco_indicado_centavos em reais.
+    """
+    df = normalizar_colunas(df)
+    grupo = df["principal"]
+    compativel = df["compatibilidade"].eq("SIM").fillna(False).to_numpy(dtype=bool)
+    centavos = df["preco_centavos"]
+
+    # Rank dentro do grupo; incompatíveis ficam fora (NaN → <NA>)
+    chave = centavos.fillna(_SEM_PRECO).astype("float64").where(compativel)
+    df["ranking"] = chave.groupby(grupo, sort=False).rank(method="first").astype("Int64")
+
+    # posicao-ésimo preço compatível (ou o último disponível) de cada principal
+    com_preco = df.loc[compativel & centavos.notna().to_numpy(), ["principal", "preco_centavos"]]
+    com_preco = com_preco.sort_values("preco_centavos", kind="mergesort")
+    por_grupo = com_preco.groupby("principal", sort=False)["preco_centavos"]
+    ordem = por_grupo.cumcount()
+    alvo = np.minimum(por_grupo.transform("size"), posicao) - 1
+    indicado = com_preco.loc[ordem == alvo].set_index("principal")["preco_centavos"]
+    df["preco_indicado_centavos"] = grupo.map(indicado).astype("Int64")
+
+    # Preço oficial: linha da loja oficial primeiro, coluna preço_oficial como reserva
+    oficial = centavos.where(df["Loja"].eq(loja_oficial).fillna(False))
+    if "preço_oficial" in df.columns:
+        oficial = oficial.fillna(preco_centavos(df["preço_oficial"]))
+    df["preco_oficial_centavos"] = oficial.groupby(grupo, sort=False).transform("first").astype("Int64")
+
+    df["preço_indicado"] = df["preco_indicado_centavos"].astype("Float64") / 100
+    return df
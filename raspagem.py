@@ -1,164 +1,210 @@
 import asyncio
 import csv
-import json
 from pathlib import Path
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
-from openpyxl import Workbook
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 import pandas as pd
 
+from cache_paginas import CachePaginas
+from canonico import deduplicar
+from captura_json import capturar_campos
+from checkpoint import Diario
+from exportacao import EscritorXLSX, gerar_visoes, salvar_parquet
+from extracao import extrair_campos_pagina, novo_contador_origens, registrar_origem, resumo_origens
+from historico import registrar_coleta
+from http_rapido import coletar_detalhes
+from limitador import LimitadorPorHost, limitar
+from navegador import executar_lote, garantir_pool
+from oferta import ESQUEMA_RASPAGEM, Ofertas
+from paginacao import coletar_listagem
+
 # === Configurações ===
 OUTPUT_DIR = Path("output")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 OUTPUT_CSV = OUTPUT_DIR / "dados.csv"
 OUTPUT_XLSX = OUTPUT_DIR / "dados.xlsx"
+OUTPUT_PARQUET = OUTPUT_DIR / "dados.parquet"
+
+CONCORRENTE = "Smart Tv De 43 LG Tu801c 43tu801c0sa Com Tela Led 4k - Preto"
+
+# === Pool de abas ===
+async def executar_em_abas(context, itens, processar, max_concurrency=8):
+    """
+    Processa os itens com no máximo `max_concurrency` abas do mesmo context,
+    reaproveitando cada aba entre itens. `processar(aba, item)` devolve o
+    registro do item; se falhar, a posição fica como None e os demais seguem.
+    A lista devolvida mantém a ordem de `itens`.
+    """
+    resultados = [None] * len(itens)
+    if not itens:
+        return resultados
 
-# === Funções existentes ===
-async def extrair_jsonld(detail_page):
-    try:
-        scripts = await detail_page.locator("script[type='application/ld+json']").evaluate_all(
-            "nodes => nodes.map(n => n.textContent)"
-        )
-    except:
-        return None
-
-    for s in scripts:
-        if not s:
-            continue
+    fila = asyncio.Queue()
+    for idx, it in enumerate(itens):
+        fila.put_nowait((idx, it))
+
+    async def worker():
+        aba = await context.new_page()
+        try:
+            while True:
+                try:
+                    idx, it = fila.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    resultados[idx] = await processar(aba, it)
+                except Exception as e:
+                    link = it.get("href") if isinstance(it, dict) else it
+                    print(f"Erro ao processar {link}: {e}")
+                    # Uma aba que travou/fechou não serve para o próximo item
+                    if aba.is_closed():
+                        aba = await context.new_page()
+        finally:
+            try:
+                await aba.close()
+            except:
+                pass
+
+    n_workers = max(1, min(max_concurrency, len(itens)))
+    await asyncio.gather(*(worker() for _ in range(n_workers)))
+    return resultados
+
+def montar_registro(it, campos):
+    return {
+        "principal": campos["titulo"] or it.get("title") or "",
+        "Preço": campos["preco"],
+        "Loja": campos["loja"],
+        "qtd_vendida": campos["qtd_vendida"] or "Não informado",
+        "concorrente": CONCORRENTE,
+        "link": it.get("href")
+    }
+
+async def extrair_detalhe(detail, it, origens=None, capturar_json=False, limitador=None):
+    if capturar_json:
+        # Dados das respostas XHR/fetch da própria página, sem esperar o render
+        async with limitar(limitador, it.get("href")) as req:
+            campos, origem = await capturar_campos(detail, it.get("href"))
+            req.resposta(url=detail.url)
+    else:
+        async with limitar(limitador, it.get("href")) as req:
+            resp = await detail.goto(it.get("href"), timeout=60000)
+            req.resposta(resp.status if resp else None, detail.url)
         try:
-            data = json.loads(s)
+            await detail.wait_for_load_state("networkidle", timeout=10000)
         except:
-            continue
-
-        candidates = data if isinstance(data, list) else [data]
-        for obj in candidates:
-            if not isinstance(obj, dict):
-                continue
-            typ = obj.get("@type") or obj.get("type") or ""
-            if ("Product" in str(typ)) or ("offers" in obj) or ("price" in obj):
-                return obj
-    return None
-
-async def pegar_text_or_none(locator, timeout=1500):
-    try:
-        return (await locator.inner_text(timeout=timeout)).strip()
-    except:
-        return None
-
-async def scrape_mercado_livre(produto, max_itens=20):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
-        page = await context.new_page()
+            pass
+
+        # JSON-LD + cascata de seletores numa única ida ao navegador
+        campos, origem = await extrair_campos_pagina(detail)
+    if origens is not None:
+        registrar_origem(origens, origem)
+    return montar_registro(it, campos)
+
+async def scrape_mercado_livre(produto, max_itens=20, max_concurrency=8, bloquear=True, pool=None, modo_http=False, capturar_json=False, paginar=False, cache=None, diario=None, limitador=None):
+    async with garantir_pool(pool, bloquear=bloquear) as pool:
+        context = pool.contexto()
         url = f"https://lista.mercadolivre.com.br/{produto.replace(' ', '-')}"
-        await page.goto(url, timeout=60000)
 
-        try:
-            await page.wait_for_selector("a.poly-component__title", timeout=30000)
-        except TimeoutError:
-            print("Não encontrou elementos na página de listagem.")
-            await browser.close()
-            return []
+        if paginar:
+            # Várias páginas da listagem em paralelo até juntar max_itens
+            itens = await coletar_listagem(url, alvo=max_itens, context=context)
+        else:
+            page = await context.new_page()
+            try:
+                await page.goto(url, timeout=60000)
 
-        itens = await page.locator("a.poly-component__title").evaluate_all(
-            "nodes => nodes.map(n => ({title: n.innerText.trim(), href: n.href}))"
-        )
+                try:
+                    await page.wait_for_selector("a.poly-component__title", timeout=30000)
+                except PlaywrightTimeoutError:
+                    print("Não encontrou elementos na página de listagem.")
+                    return []
+
+                itens = await page.locator("a.poly-component__title").evaluate_all(
+                    "nodes => nodes.map(n => ({title: n.innerText.trim(), href: n.href}))"
+                )
+            finally:
+                await page.close()
 
         if not itens:
             print("Nenhum item coletado na listagem.")
-            await browser.close()
             return []
 
+        # Sem duplicatas (tracking, patrocinados, mesmo /p/MLB...) antes do corte
+        itens, _ = deduplicar(itens)
         itens = itens[:max_itens]
-        resultados = []
-        print(f"Itens para processar: {len(itens)} (limite {max_itens})")
-
-        for idx, it in enumerate(itens, start=1):
-            titulo_lista = it.get("title") or ""
-            link = it.get("href")
-            print(f"[{idx}/{len(itens)}] Acessando: {titulo_lista}")
-
-            detail = await context.new_page()
-            try:
-                await detail.goto(link, timeout=60000)
-                try:
-                    await detail.wait_for_load_state("networkidle", timeout=10000)
-                except:
-                    pass
-
-                jsonld = await extrair_jsonld(detail)
-                titulo = None
-                preco = None
-                loja = None
-                vendedor = None
-                qtd_vendida = None
-
-                if jsonld:
-                    titulo = jsonld.get("name") or jsonld.get("headline") or titulo_lista
-                    offers = jsonld.get("offers") or {}
-                    if isinstance(offers, list) and offers:
-                        offers = offers[0]
-                    if isinstance(offers, dict):
-                        preco = offers.get("price") or offers.get("priceSpecification", {}).get("price")
-                        seller = offers.get("seller") or {}
-                        if isinstance(seller, dict):
-                            loja = seller.get("name") or seller.get("nickname")
-                        else:
-                            loja = seller or None
-
-                if not titulo:
-                    titulo = await pegar_text_or_none(detail.locator("h1, h1.ui-pdp-title, h1#productTitle")) or titulo_lista
-
-                if not preco:
-                    preco = await pegar_text_or_none(detail.locator("span.price-tag-fraction"))
-                    if not preco:
-                        preco = await pegar_text_or_none(detail.locator("span.andes-money-amount__fraction"))
-                    cents = await pegar_text_or_none(detail.locator("span.price-tag-cents")) or await pegar_text_or_none(detail.locator("span.andes-money-amount__decimals"))
-                    if preco and cents:
-                        preco = f"R$ {preco},{cents}"
-                    elif preco:
-                        preco = f"R$ {preco}"
-
-                if not loja:
-                    loja = await pegar_text_or_none(detail.locator("a.ui-pdp-seller__link"))
-                if not loja:
-                    loja = await pegar_text_or_none(detail.locator("p.ui-pdp-seller_title, span.ui-pdp-seller_title"))
-                if not loja:
-                    loja = await pegar_text_or_none(detail.locator("p.ui-pdp-seller_status, span.ui-pdp-seller_status"))
-                if not loja:
-                # Para o span com a classe específica
-                    loja_element = detail.locator("span.ui-pdp-seller__label-text-with-icon")
-                if await loja_element.count() > 0:
-                    # Pega apenas o texto, ignorando elementos filhos como imagens
-                    loja = await loja_element.first.evaluate("element => element.childNodes[0].textContent.trim()")
-
-
-                qtd_vendida = await pegar_text_or_none(detail.locator(
-                    "div.ui-pdp-seller_headerinfo-containersubtitle-one-line p.ui-pdp-sellerheader_subtitle"
-                ))
-                if not qtd_vendida:
-                    qtd_vendida = await pegar_text_or_none(detail.locator(".ui-pdp-subtitle"))
-                qtd_vendida = qtd_vendida or "Não informado"
-
-                resultados.append({
-                    "principal": titulo,
-                    "Preço": preco,
-                    "Loja": loja,
-                    "qtd_vendida": qtd_vendida,
-                    "concorrente": "Smart Tv De 43 LG Tu801c 43tu801c0sa Com Tela Led 4k - Preto",
-                    "link": link
-                })
-
-            except Exception as e:
-                print(f"Erro ao processar {link}: {e}")
-            finally:
-                try:
-                    await detail.close()
-                except:
-                    pass
 
-        await browser.close()
-        return resultados
+        # Itens já concluídos nesta busca (diário) ou extraídos dentro do TTL
+        # (cache) voltam prontos, sem abrir aba
+        todos = itens
+        prontos = [None] * len(todos)
+        if diario is not None:
+            prontos = [diario.buscar(it.get("href")) for it in todos]
+        if cache is not None:
+            prontos = [reg if reg is not None else cache.buscar(it.get("href")) for it, reg in zip(todos, prontos)]
+        itens = [it for it, reg in zip(todos, prontos) if reg is None]
+
+        def concluir(it, registro):
+            if diario is not None:
+                diario.registrar(it.get("href"), registro)
+            return registro
+
+        print(f"Itens para processar: {len(itens)} (limite {max_itens}, {max_concurrency} abas)")
+
+        origens = novo_contador_origens()
+
+        async def processar(detail, it):
+            print(f"Acessando: {it.get('title') or ''}")
+            return concluir(it, await extrair_detalhe(detail, it, origens, capturar_json=capturar_json, limitador=limitador))
+
+        if modo_http:
+            # Páginas por HTTP; o navegador só entra quando faltar preço ou loja
+            async def fallback(faltantes):
+                return await executar_em_abas(context, faltantes, processar, max_concurrency=max_concurrency)
+
+            def montar(it, campos):
+                return concluir(it, montar_registro(it, campos))
+
+            resultados, _ = await coletar_detalhes(itens, montar, fallback, max_concurrency=2 * max_concurrency, limitador=limitador)
+        else:
+            resultados = await executar_em_abas(context, itens, processar, max_concurrency=max_concurrency)
+        resumo_origens(origens)
+        if limitador is not None:
+            limitador.resumo()
+
+        if cache is not None:
+            for it, reg in zip(itens, resultados):
+                cache.guardar(it.get("href"), reg)
+            cache.resumo()
+
+        novos = iter(resultados)
+        resultados = [
+            {**reg, "link": it.get("href")} if reg is not None else next(novos)
+            for it, reg in zip(todos, prontos)
+        ]
+
+        return [r for r in resultados if r is not None]
+
+async def scrape_lote_mercado_livre(termos, max_itens=20, max_concurrency=8, termos_simultaneos=2, bloquear=True, pool=None, modo_http=False, capturar_json=False, paginar=False, cache=None, retomar=False, limitador=None):
+    """
+    Coleta vários termos de busca no mesmo navegador. Devolve um dicionário
+    termo -> lista de produtos, na ordem dos termos recebidos.
+    Com `retomar=True` cada termo tem seu diário (checkpoint.Diario): um lote
+    interrompido continua de onde parou, e o diário some quando o termo termina.
+    Sem `limitador`, os termos dividem um LimitadorPorHost novo: as abas de
+    todos os termos disputam a mesma taxa por host.
+    """
+    if limitador is None:
+        limitador = LimitadorPorHost()
+    async with garantir_pool(pool, bloquear=bloquear) as pool:
+        async def um_termo(termo):
+            diario = Diario(termo) if retomar else None
+            resultados = await scrape_mercado_livre(termo, max_itens=max_itens, max_concurrency=max_concurrency, pool=pool, modo_http=modo_http, capturar_json=capturar_json, paginar=paginar, cache=cache, diario=diario, limitador=limitador)
+            if diario is not None:
+                diario.fechar(concluido=True)
+            return resultados
+
+        resultados = await executar_lote(termos, um_termo, simultaneos=termos_simultaneos)
+        return dict(zip(termos, resultados))
 
 def salvar_csv(produtos, arquivo=OUTPUT_CSV):
     campos = ["principal", "Preço", "Loja", "qtd_vendida", "link","concorrente"]
@@ -169,27 +215,30 @@ def salvar_csv(produtos, arquivo=OUTPUT_CSV):
     print(f"✅ Salvou {len(produtos)} produtos em '{arquivo}'")
 
 def salvar_excel(produtos, arquivo=OUTPUT_XLSX):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Produtos"
-
     campos = ["principal", "Preço", "Loja", "qtd_vendida", "link","concorrente"]
-    ws.append(campos)
-
+    escritor = EscritorXLSX(arquivo, campos)
     for p in produtos:
-        ws.append([p[c] for c in campos])
+        escritor.escrever(p)
+    escritor.fechar()
 
-    wb.save(arquivo)
-    print(f"✅ Salvou {len(produtos)} produtos em '{arquivo}'")
+def salvar_resultado(produtos, arquivo=OUTPUT_PARQUET, csv=OUTPUT_CSV, xlsx=OUTPUT_XLSX):
+    """Parquet como arquivo principal; CSV/XLSX (quando pedidos) são visões dele."""
+    campos = ["principal", "Preço", "Loja", "qtd_vendida", "link","concorrente"]
+    salvar_parquet(produtos, arquivo, campos=campos)
+    gerar_visoes(arquivo, csv=csv, xlsx=xlsx)
+    # Aqui o produto buscado é o "concorrente" e o título do anúncio é o "principal"
+    # (ESQUEMA_RASPAGEM); o histórico recebe as ofertas já tipadas
+    registrar_coleta(Ofertas.de_registros(produtos, ESQUEMA_RASPAGEM))
 
 # === Execução principal ===
 if __name__ == "__main__":
     termo = "Smart Tv De 43 LG Tu801c 43tu801c0sa Com Tela Led 4k - Preto"
-    produtos = asyncio.run(scrape_mercado_livre(termo, max_itens=10))
+    cache = CachePaginas()
+    produtos = asyncio.run(scrape_mercado_livre(termo, max_itens=10, cache=cache, limitador=LimitadorPorHost()))
+    cache.fechar()
 
     print("\n📋 Produtos coletados:")
     for i, p in enumerate(produtos, start=1):
         print(f"{i}. {p['principal']} | Preço: {p['Preço']} | Loja: {p['Loja']} | Vendidos: {p['qtd_vendida']}")
 
-    salvar_csv(produtos)
-    salvar_excel(produtos)
\ No newline at end of file
+    salvar_resultado(produtos)
\ No newline at end of file
@@ -2,13 +2,23 @@ import asyncio
 import csv
 import json
 from pathlib import Path
-from playwright.async_api import async_playwright
-from openpyxl import Workbook
 import pandas as pd
 from groq import Groq
 import re
 from datetime import datetime
 
+from atributos import decidir_por_regras
+from cache_ia import abrir_cache_ia
+from canonico import deduplicar
+from exportacao import EscritorXLSX, gerar_visoes, salvar_parquet
+from extracao import extrair_campos_pagina
+from fila_ia import PENDENTE, VEREDITOS, abrir_fila_ia
+from historico import registrar_coleta
+from ia_lote import classificar_por_principal, comparar_em_lote
+from motor_ia import classificar_em_paralelo
+from navegador import executar_lote, garantir_pool
+from raspagem import executar_em_abas
+
 # === CONFIGURAÇÕES ===
 OUTPUT_DIR = Path("output")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -17,6 +27,7 @@ OUTPUT_CSV = OUTPUT_DIR / "dados.csv"
 OUTPUT_XLSX = OUTPUT_DIR / "dados.xlsx"
 RESULTADO_CSV = OUTPUT_DIR / f"resultado_final_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
 RESULTADO_XLSX = OUTPUT_DIR / f"resultado_final_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+RESULTADO_PARQUET = OUTPUT_DIR / f"resultado_final_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
 
 API_KEY = ""
 MODELO = ""
@@ -60,24 +71,22 @@ async def extrair_jsonld(detail_page):
 
 
 # ✅ Função para capturar o produto oficial (Comprebel)
-async def scrape_oficial_comprebel(url, produto):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
-        page = await context.new_page()
-
-        await page.goto(url, timeout=60000)
-
-        titulo = await pegar_text_or_none(page.locator("h1.ui-pdp-title"))
+async def scrape_oficial_comprebel(url, produto, bloquear=True, pool=None):
+    async with garantir_pool(pool, bloquear=bloquear) as pool:
+        page = await pool.contexto().new_page()
+        try:
+            await page.goto(url, timeout=60000)
 
-        preco_meta = await page.locator('meta[itemprop="price"]').get_attribute("content")
-        if preco_meta:
-            preco = f"R$ {preco_meta}"
-        else:
-            preco = await pegar_text_or_none(page.locator("span.andes-money-amount__fraction"))
-            preco = f"R$ {preco}" if preco else "Não encontrado"
+            titulo = await pegar_text_or_none(page.locator("h1.ui-pdp-title"))
 
-        await browser.close()
+            preco_meta = await page.locator('meta[itemprop="price"]').get_attribute("content")
+            if preco_meta:
+                preco = f"R$ {preco_meta}"
+            else:
+                preco = await pegar_text_or_none(page.locator("span.andes-money-amount__fraction"))
+                preco = f"R$ {preco}" if preco else "Não encontrado"
+        finally:
+            await page.close()
 
         return {
             "concorrente": titulo,
@@ -90,68 +99,61 @@ async def scrape_oficial_comprebel(url, produto):
 
 
 # ✅ Função para Capturar concorrentes
-async def scrape_mercado_livre(produto, max_itens=10):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
+async def scrape_mercado_livre(produto, max_itens=10, max_concurrency=8, bloquear=True, pool=None):
+    async with garantir_pool(pool, bloquear=bloquear) as pool:
+        context = pool.contexto()
         page = await context.new_page()
-        url = f"https://lista.mercadolivre.com.br/{produto.replace(' ', '-')}"
+        try:
+            url = f"https://lista.mercadolivre.com.br/{produto.replace(' ', '-')}"
 
-        await page.goto(url, timeout=60000)
-        await page.wait_for_selector("a.poly-component__title", timeout=30000)
+            await page.goto(url, timeout=60000)
+            await page.wait_for_selector("a.poly-component__title", timeout=30000)
 
-        itens = await page.locator("a.poly-component__title").evaluate_all(
-            "nodes => nodes.map(n => ({title: n.innerText.trim(), href: n.href}))"
-        )
+            itens = await page.locator("a.poly-component__title").evaluate_all(
+                "nodes => nodes.map(n => ({title: n.innerText.trim(), href: n.href}))"
+            )
+        finally:
+            await page.close()
 
+        itens, _ = deduplicar(itens)
         itens = itens[:max_itens]
-        resultados = []
 
-        for it in itens:
+        async def processar(detail, it):
             titulo_lista = it.get("title") or ""
             link = it.get("href")
-            detail = await context.new_page()
-
-            try:
-                await detail.goto(link, timeout=60000)
-                jsonld = await extrair_jsonld(detail)
-
-                titulo = jsonld.get("name") if jsonld else titulo_lista
-                preco = None
-                loja = None
-                qtd_vendida = None
-
-                if jsonld:
-                    offers = jsonld.get("offers") or {}
-                    if isinstance(offers, dict):
-                        preco = offers.get("price")
-                        seller = offers.get("seller") or {}
-                        loja = seller.get("name") if isinstance(seller, dict) else None
-
-                if not preco:
-                    preco = await pegar_text_or_none(detail.locator("span.price-tag-fraction"))
-                    preco = f"R$ {preco}" if preco else None
-
-                if not loja:
-                    loja = await pegar_text_or_none(detail.locator("a.ui-pdp-seller__link," "span.ui-pdp-seller__label-text-with-icon," "span.andes-money-amount__fraction"))
-
-                qtd_vendida = await pegar_text_or_none(
-                    detail.locator(".ui-pdp-subtitle")
-                ) or "Não informado"
-
-                resultados.append({
-                    "concorrente": titulo,
-                    "Preço": preco,
-                    "Loja": loja,
-                    "qtd_vendida": qtd_vendida,
-                    "principal": produto,
-                    "link": link
-                })
-            finally:
-                await detail.close()
-
-        await browser.close()
-        return resultados
+            await detail.goto(link, timeout=60000)
+
+            # JSON-LD + cascata de seletores numa única ida ao navegador
+            campos, _ = await extrair_campos_pagina(detail)
+
+            return {
+                "concorrente": campos["titulo"] or titulo_lista,
+                "Preço": campos["preco"],
+                "Loja": campos["loja"],
+                "qtd_vendida": campos["qtd_vendida"] or "Não informado",
+                "principal": produto,
+                "link": link
+            }
+
+        resultados = await executar_em_abas(context, itens, processar, max_concurrency=max_concurrency)
+
+        return [r for r in resultados if r is not None]
+
+
+# ✅ Lote: vários produtos (oficial + concorrentes) no mesmo navegador
+async def scrape_lote(produtos, max_itens=20, max_concurrency=8, produtos_simultaneos=2, bloquear=True, pool=None):
+    """
+    `produtos` é uma lista de pares (produto, link_oficial). Devolve, para
+    cada par e na mesma ordem, a lista [oficial] + concorrentes.
+    """
+    async with garantir_pool(pool, bloquear=bloquear) as pool:
+        async def um_produto(entrada):
+            produto, link_oficial = entrada
+            oficial = await scrape_oficial_comprebel(link_oficial, produto, pool=pool)
+            concorrentes = await scrape_mercado_livre(produto, max_itens=max_itens, max_concurrency=max_concurrency, pool=pool)
+            return [oficial] + concorrentes
+
+        return await executar_lote(produtos, um_produto, simultaneos=produtos_simultaneos)
 
 
 # ✅ Salvamento CSV/Excel
@@ -164,14 +166,11 @@ def salvar_csv(produtos, arquivo):
 
 
 def salvar_excel(produtos, arquivo):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Produtos"
     campos = ["concorrente", "Preço", "Loja", "qtd_vendida", "link", "principal"]
-    ws.append(campos)
+    escritor = EscritorXLSX(arquivo, campos)
     for p in produtos:
-        ws.append([p[c] for c in campos])
-    wb.save(arquivo)
+        escritor.escrever(p)
+    escritor.fechar()
 
 
 # ✅ IA
@@ -179,14 +178,25 @@ def extrair_compatibilidade(conteudo):
     return "SIM" if re.search(r'\bSIM\b', conteudo.upper()) else "NÃO"
 
 
-def comparar_com_ia(principal, concorrente):
-    prompt = f"""
+PROMPT = """
 Compare os dois produtos abaixo e diga somente SIM ou NÃO.
 Exija pelo menos 97% de similaridade.
 
 Produto principal: {principal}
 Produto concorrente: {concorrente}
 """
+CRITERIO_LOTE = (
+    "Exija pelo menos 97% de similaridade."
+)
+
+
+def comparar_com_ia(principal, concorrente):
+    # Mesmo par (normalizado) + modelo + prompt já respondido: não chama a API
+    em_cache = abrir_cache_ia().buscar(principal, concorrente, MODELO, PROMPT)
+    if em_cache is not None:
+        return em_cache
+
+    prompt = PROMPT.format(principal=principal, concorrente=concorrente)
 
     try:
         resp = client.chat.completions.create(
@@ -196,19 +206,101 @@ Produto concorrente: {concorrente}
         )
 
         conteudo = resp.choices[0].message.content.strip()
-        return "SIM" if "SIM" in conteudo.upper() else "NÃO"
+        resultado = extrair_compatibilidade(conteudo)
     except Exception as e:
+        # Falha não vira NÃO nem vai para o cache: fica PENDENTE na fila para a próxima execução
         print(f"⚠️ Erro IA: {e}")
-        return "NÃO"
+        return abrir_fila_ia().adicionar(principal, concorrente, e)
+
+    abrir_cache_ia().guardar(principal, concorrente, MODELO, PROMPT, resultado)
+    return resultado
 
-def aplicar_ia_csv(arquivo_csv):
-    df = pd.read_csv(arquivo_csv)
-    df["compatibilidade"] = df.apply(
-        lambda row: comparar_com_ia(row["principal"], row["concorrente"]), axis=1
+
+def comparar_lote_com_ia(principal, concorrentes):
+    """Vários concorrentes do mesmo principal por requisição (ver ia_lote)."""
+    return comparar_em_lote(
+        client, MODELO, principal, concorrentes, CRITERIO_LOTE, comparar_com_ia,
+        cache=abrir_cache_ia(), prompt_cache=PROMPT, falha=PENDENTE, fila=abrir_fila_ia(),
     )
 
-    df.to_csv(RESULTADO_CSV, index=False, encoding="utf-8-sig")
-    df.to_excel(RESULTADO_XLSX, index=False)
+def classificar_com_ia(principais, concorrentes, em_lote=True, paralelo=True):
+    """Vereditos da IA na ordem dos pares: em lote e/ou em paralelo (motor_ia), ou um por um."""
+    if paralelo:
+        return classificar_em_paralelo(
+            principais, concorrentes, API_KEY, MODELO, PROMPT, extrair_compatibilidade,
+            criterio_lote=CRITERIO_LOTE if em_lote else None, cache=abrir_cache_ia(), falha=PENDENTE, fila=abrir_fila_ia(),
+        )
+    if em_lote:
+        # Um prompt por lote de concorrentes do mesmo principal (ver ia_lote)
+        return classificar_por_principal(principais, concorrentes, comparar_lote_com_ia)
+    return [comparar_com_ia(principal, concorrente) for principal, concorrente in zip(principais, concorrentes)]
+
+
+def aplicar_ia_df(dados, salvar=True, visoes=("csv", "xlsx"), em_lote=True, paralelo=True, usar_regras=True):
+    """
+    Classifica com a IA os registros vindos direto do scrape (lista de dicts)
+    ou um DataFrame, sem passar por arquivo, e devolve o DataFrame com a coluna compatibilidade.
+    Gravar é um efeito opcional: com `salvar=True` vai para Parquet e para
+    as `visoes` pedidas (CSV/XLSX). `em_lote=False` volta a uma chamada por linha;
+    `paralelo=True` manda as requisições juntas pelo motor_ia (rpm/tpm);
+    `usar_regras=False` manda todos os pares para a IA (sem atributos.decidir_por_regras).
+    Falha da IA vira PENDENTE (fila_ia), nunca NÃO; um DataFrame que já tem
+    compatibilidade (resultado anterior) só reprocessa as linhas sem SIM/NÃO.
+    """
+    if isinstance(dados, pd.DataFrame):
+        df = dados.copy()
+    else:
+        df = pd.DataFrame(list(dados), columns=None if dados else ["concorrente", "Preço", "Loja", "qtd_vendida", "link", "principal"])
+    # Reexecução (já tem compatibilidade): só linhas PENDENTE/sem veredito cuja espera na fila venceu
+    retomando = "compatibilidade" in df.columns
+    if retomando:
+        a_fazer = abrir_fila_ia().a_reprocessar(df["principal"], df["concorrente"], df["compatibilidade"])
+        print(f"🔁 Retomando: {int(a_fazer.sum())} de {len(df)} linhas sem veredito vão ser processadas")
+    else:
+        df["compatibilidade"] = None
+        a_fazer = pd.Series(True, index=df.index)
+
+    # Pares óbvios (marca, polegadas, código do modelo...) saem das regras; só os ambíguos vão para a IA
+    if usar_regras and a_fazer.any():
+        df.loc[a_fazer, "compatibilidade"] = decidir_por_regras(df.loc[a_fazer, "principal"], df.loc[a_fazer, "concorrente"])
+    ambiguos = a_fazer & ~df["compatibilidade"].isin(VEREDITOS)
+    if ambiguos.any():
+        df.loc[ambiguos, "compatibilidade"] = classificar_com_ia(
+            df.loc[ambiguos, "principal"], df.loc[ambiguos, "concorrente"], em_lote=em_lote, paralelo=paralelo
+        )
+    resolvidos = a_fazer & df["compatibilidade"].isin(VEREDITOS)
+    abrir_fila_ia().concluir(df.loc[resolvidos, "principal"], df.loc[resolvidos, "concorrente"])
+    abrir_cache_ia().resumo()
+    abrir_fila_ia().resumo()
+
+    if salvar:
+        # Parquet é o resultado; CSV/XLSX são visões opcionais geradas a partir dele
+        salvar_parquet(df, RESULTADO_PARQUET)
+        gerar_visoes(
+            RESULTADO_PARQUET,
+            csv=RESULTADO_CSV if "csv" in visoes else None,
+            xlsx=RESULTADO_XLSX if "xlsx" in visoes else None,
+        )
+        # Toda coleta entra no histórico de preços (consultas por produto/item/data);
+        # a reexecução de um resultado já registrado não grava os preços de novo
+        if not retomando:
+            registrar_coleta(df)
+        pendentes = int((~df["compatibilidade"].isin(VEREDITOS)).sum())
+        if pendentes:
+            # A reexecução parte deste resultado, não do CSV do scrape
+            retomar = f"aplicar_ia_csv('{RESULTADO_CSV}')" if "csv" in visoes else f"aplicar_ia_df(pd.read_parquet('{RESULTADO_PARQUET}'))"
+            print(f"🔁 {pendentes} linhas PENDENTE: depois do backoff, {retomar} processa só elas")
+    return df
+
+
+def aplicar_ia_csv(arquivo_csv, visoes=("csv", "xlsx")):
+    """
+    Classifica um CSV do scrape ou retoma um resultado anterior: se o arquivo
+    já tem compatibilidade, só as linhas PENDENTE/sem veredito vão para a IA.
+    O __main__ não grava mais o CSV do scrape; a reexecução usa o
+    RESULTADO_CSV da execução anterior (o aviso 🔁 traz o caminho).
+    """
+    return aplicar_ia_df(pd.read_csv(arquivo_csv), visoes=visoes)
 
 
 # ================= EXECUÇÃO =====================
@@ -216,14 +308,11 @@ if __name__ == "__main__":
     produto = "Smart Tv LG 50 4k Uhd Hdr Thinq Ai Pro Wi-fi Bluetooth Alexa Apple Airplay - 50tu801c0sa"
     link_oficial = "https://www.mercadolivre.com.br/smart-tv-lg-50-4k-uhd-hdr-thinq-ai-pro-wi-fi-bluetooth-alexa-apple-airplay-50tu801c0sa/p/MLB52058084?pdp_filters=official_store%3A1614"
 
-    oficial = asyncio.run(scrape_oficial_comprebel(link_oficial, produto))
-    concorrentes = asyncio.run(scrape_mercado_livre(produto, max_itens=20))
-
-    produtos = [oficial] + concorrentes
-
-    salvar_csv(produtos, OUTPUT_CSV)
-    salvar_excel(produtos, OUTPUT_XLSX)
+    # Um único navegador para o oficial e os concorrentes
+    produtos = asyncio.run(scrape_lote([(produto, link_oficial)], max_itens=20))[0]
 
+    # Os registros vão direto para a IA; só o resultado é gravado. Linhas que
+    # ficarem PENDENTE são retomadas com aplicar_ia_csv(<RESULTADO_CSV anterior>)
     print("\n🚀 Rodando IA para comparação...")
-    aplicar_ia_csv(OUTPUT_CSV)
+    aplicar_ia_df(produtos)
     print("✅ Finalizado!")
@@ -3,18 +3,28 @@ import csv
 import json
 from pathlib import Path
 from playwright.async_api import async_playwright
-from openpyxl import Workbook
 import pandas as pd
 from groq import Groq
 import re
 from datetime import datetime
 
+from bloqueio import bloquear_recursos, resumo_bloqueio
+from canonico import deduplicar
+from checkpoint import Diario
+from exportacao import gerar_visoes, salvar_parquet
+from historico import registrar_coleta
+from limitador import LimitadorPorHost
+from oferta import ESQUEMA_CRAWL, Ofertas
+from paginacao import coletar_listagem
+from raspagem import executar_em_abas
+
 # === CONFIGURAÇÕES ===
 OUTPUT_DIR = Path("output")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 OUTPUT_CSV = OUTPUT_DIR / "dados.csv"
 OUTPUT_XLSX = OUTPUT_DIR / "dados.xlsx"
+OUTPUT_PARQUET = OUTPUT_DIR / "dados.parquet"
 RESULTADO_CSV = OUTPUT_DIR / f"resultado_final_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
 RESULTADO_XLSX = OUTPUT_DIR / f"resultado_final_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
 
@@ -42,81 +52,83 @@ def extrair_json_ld(html):
 
 
 # === SCRAPER PRINCIPAL ===
-async def scrape_mercado_livre(url, playwright):
+async def scrape_mercado_livre(url, playwright, max_itens=500, max_concurrency=8, bloquear=True, retomar=True):
 
     browser = await playwright.chromium.launch(headless=True)  # NÃO ABRE JANELA
-    page = await browser.new_page()
-
-    try:
-        await page.goto(url, timeout=60000)
-        await page.wait_for_selector("a.poly-component__title", timeout=30000)
-
-        # === SCROLL AUTOMÁTICO PARA CARREGAR MUITOS PRODUTOS ===
-        previous_height = await page.evaluate("document.body.scrollHeight")
+    context = await browser.new_context()
+    bloqueio = await bloquear_recursos(context) if bloquear else None
 
-        for _ in range(40):  # CONFIGURE A QUANTIDADE DE SCROLLS
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await page.wait_for_timeout(1500)
+    # === CHECKPOINT: itens já concluídos desta busca não são visitados de novo ===
+    diario = Diario(url) if retomar else None
 
-            new_height = await page.evaluate("document.body.scrollHeight")
-            if new_height == previous_height:
-                break
-            previous_height = new_height
+    # === LIMITE ADAPTATIVO POR HOST: desacelera sozinho diante de 429/captcha ===
+    limitador = LimitadorPorHost()
 
-        # === EXTRAIR LINKS ===
-        itens = await page.locator("a.poly-component__title").evaluate_all(
-            "nodes => nodes.map(n => ({title: n.innerText.trim(), href: n.href}))"
-        )
+    try:
+        # === PAGINAÇÃO EM PARALELO PARA CARREGAR MUITOS PRODUTOS ===
+        # Busca as páginas _Desde_N da listagem simultaneamente até max_itens,
+        # parando quando uma página não traz itens novos
+        itens = await coletar_listagem(url, alvo=max_itens, context=context)
+        itens, _ = deduplicar(itens)
 
         print(f"🔍 Itens encontrados: {len(itens)}")
 
-        resultados = []
-
-        for item in itens:
-            try:
-                produto_page = await browser.new_page()
-                await produto_page.goto(item["href"], timeout=60000)
-
-                html = await produto_page.content()
-                json_ld = extrair_json_ld(html)
-
-                titulo = limpar(json_ld.get("name", item["title"]))
-                preco = json_ld.get("offers", {}).get("price", "")
-                loja = json_ld.get("brand", {}).get("name", "")
-
-                resultados.append({
-                    "titulo": titulo,
-                    "preco": preco,
-                    "loja": loja,
-                    "link": item["href"]
-                })
-
-                await produto_page.close()
-
-            except Exception as e:
-                print(f"Erro no item: {e}")
-
+        pendentes = [it for it in itens if diario is None or diario.buscar(it["href"]) is None]
+
+        async def processar(produto_page, item):
+            async with limitador.requisicao(item["href"]) as req:
+                resp = await produto_page.goto(item["href"], timeout=60000)
+                req.resposta(resp.status if resp else None, produto_page.url)
+
+            html = await produto_page.content()
+            json_ld = extrair_json_ld(html)
+
+            titulo = limpar(json_ld.get("name", item["title"]))
+            preco = json_ld.get("offers", {}).get("price", "")
+            loja = json_ld.get("brand", {}).get("name", "")
+
+            registro = {
+                "titulo": titulo,
+                "preco": preco,
+                "loja": loja,
+                "link": item["href"]
+            }
+            if diario is not None:
+                diario.registrar(item["href"], registro)
+            return registro
+
+        resultados = await executar_em_abas(context, pendentes, processar, max_concurrency=max_concurrency)
+        if diario is not None:
+            resultados = [diario.buscar(it["href"]) for it in itens]
+        # Registros compactos e tipados (preço em centavos, lojas codificadas)
+        resultados = Ofertas.de_registros((r for r in resultados if r is not None), ESQUEMA_CRAWL, produto=url)
+
+        if bloqueio:
+            resumo_bloqueio(bloqueio)
+        limitador.resumo()
         await browser.close()
+        if diario is not None:
+            diario.fechar(concluido=True)
         return resultados
 
     except Exception as e:
         await browser.close()
+        if diario is not None:
+            # Mantém o diário: a próxima execução da mesma URL continua daqui
+            diario.fechar()
         print(f"Erro geral na URL: {e}")
-        return []
-
-
-# === SALVAR CSV ===
-def salvar_csv(dados):
-    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=dados[0].keys())
-        writer.writeheader()
-        writer.writerows(dados)
+        return Ofertas()
 
 
-# === SALVAR EXCEL ===
-def salvar_excel(dados):
-    df = pd.DataFrame(dados)
-    df.to_excel(OUTPUT_XLSX, index=False)
+# === SALVAR PARQUET (CSV/XLSX SÃO VISÕES DELE) ===
+def salvar_dados(ofertas, csv=True, excel=True):
+    salvar_parquet(ofertas.para_arrow(), OUTPUT_PARQUET)
+    gerar_visoes(
+        OUTPUT_PARQUET,
+        csv=OUTPUT_CSV if csv else None,
+        xlsx=OUTPUT_XLSX if excel else None,
+    )
+    registrar_coleta(ofertas)
 
 
 # === RODAR SCRAPER ===
@@ -129,8 +141,7 @@ async def main():
     print(f"\n📦 Total coletado: {len(resultados)} produtos")
 
     if resultados:
-        salvar_csv(resultados)
-        salvar_excel(resultados)
+        salvar_dados(resultados)
         print("✅ Dados salvos com sucesso!")
 
 
@@ -0,0 +1,23 @@
+from atributos import decidir_por_regras
+
+PRINCIPAL = "Smart Tv LG 50 4k Uhd Hdr Thinq Ai Pro Wi-fi Bluetooth Alexa Apple Airplay - 50tu801c0sa"
+
+
+def _decidir(concorrentes):
+    return decidir_por_regras([PRINCIPAL] * len(concorrentes), concorrentes, verbose=False).tolist()
+
+
+def test_marca_de_recurso_nao_conflita():
+    assert _decidir(["Smart TV 50'' 4K Apple Airplay LG 50TU801C0SA"]) == ["SIM"]
+
+
+def test_marca_sem_nada_em_comum_e_nao():
+    assert _decidir(["Smart TV Samsung 50'' 4K UN50TU8000"]) == ["NÃO"]
+
+
+def test_codigo_parcial_vai_para_a_ia():
+    assert _decidir(["Smart TV LG 50'' 4K 50TU801C"]) == [None]
+
+
+def test_codigo_ausente_e_nao():
+    assert _decidir(["Smart TV LG 50'' 4K 50UR7800PSA"]) == ["NÃO"]
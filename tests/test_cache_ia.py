@@ -0,0 +1,35 @@
+from cache_ia import CacheIA, abrir_cache_ia
+
+PROMPT = "Compare {principal} com {concorrente}"
+
+
+def test_chave_normaliza_titulos_e_muda_com_o_prompt(tmp_path):
+    cache = CacheIA(tmp_path / "ia.sqlite")
+    cache.guardar("Smart TV  LG 50", "TV LG 50TU801", "m", PROMPT, "SIM")
+    assert cache.buscar("smart tv lg 50", "TV LG 50TU801 ", "m", PROMPT) == "SIM"
+    assert cache.buscar("Smart TV LG 50", "TV LG 50TU801", "m", PROMPT + " v2") is None
+    assert cache.buscar("Smart TV LG 50", "TV LG 50TU801", "outro", PROMPT) is None
+    cache.fechar()
+
+
+def test_hit_nao_grava_ate_resumo(tmp_path):
+    cache = CacheIA(tmp_path / "ia.sqlite")
+    cache.guardar("A", "B", "m", PROMPT, "NÃO")
+    (antes,) = cache.conn.execute("SELECT acessado FROM respostas").fetchone()
+
+    assert cache.buscar("A", "B", "m", PROMPT) == "NÃO"
+    assert cache.conn.in_transaction is False
+    assert cache.conn.execute("SELECT acessado FROM respostas").fetchone()[0] == antes
+
+    cache.resumo()
+    assert cache.conn.execute("SELECT acessado FROM respostas").fetchone()[0] > antes
+    cache.fechar()
+
+
+def test_abrir_cache_ia_compartilha_a_conexao(tmp_path):
+    caminho = tmp_path / "ia.sqlite"
+    cache = abrir_cache_ia(caminho)
+    assert abrir_cache_ia(caminho) is cache
+    cache.fechar()
+    assert abrir_cache_ia(caminho) is not cache
+    abrir_cache_ia(caminho).fechar()
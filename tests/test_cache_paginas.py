@@ -0,0 +1,80 @@
+import sqlite3
+
+import cache_paginas
+from cache_paginas import CachePaginas
+
+
+def _link(n):
+    return f"https://produto.mercadolivre.com.br/MLB-{1000000 + n}-tv-_JM"
+
+
+def _relogio(monkeypatch, inicio=1000.0):
+    agora = [inicio]
+    monkeypatch.setattr(cache_paginas.time, "time", lambda: agora[0])
+    return agora
+
+
+def test_ttl_vence_o_registro(tmp_path, monkeypatch):
+    agora = _relogio(monkeypatch)
+    cache = CachePaginas(tmp_path / "c.sqlite", ttl=60)
+    cache.guardar(_link(1), {"titulo": "TV"})
+
+    agora[0] += 30
+    assert cache.buscar(_link(1)) == {"titulo": "TV"}
+    agora[0] += 31
+    assert cache.buscar(_link(1)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.fechar()
+
+
+def test_descarte_lru_preserva_o_acessado_recentemente(tmp_path, monkeypatch):
+    agora = _relogio(monkeypatch)
+    cache = CachePaginas(tmp_path / "c.sqlite", ttl=3600, max_entradas=3)
+    for n in range(3):
+        agora[0] += 1
+        cache.guardar(_link(n), {"n": n})
+
+    # Hit no mais antigo: o acesso fica pendente e vai para o disco no próximo guardar
+    agora[0] += 1
+    assert cache.buscar(_link(0)) == {"n": 0}
+    agora[0] += 1
+    cache.guardar(_link(3), {"n": 3})
+
+    # Estourou: desce até (1 - folga) × 3 = 2 entradas, tirando os menos usados
+    assert cache.entradas == 2
+    assert cache.buscar(_link(0)) == {"n": 0}
+    assert cache.buscar(_link(3)) == {"n": 3}
+    assert cache.buscar(_link(1)) is None and cache.buscar(_link(2)) is None
+    cache.fechar()
+
+
+def test_acessos_pendentes_sao_gravados_ao_fechar(tmp_path, monkeypatch):
+    agora = _relogio(monkeypatch)
+    caminho = tmp_path / "c.sqlite"
+    cache = CachePaginas(caminho)
+    cache.guardar(_link(1), {"n": 1})
+    agora[0] += 10
+    cache.buscar(_link(1))
+    cache.fechar()
+
+    cache = CachePaginas(caminho)
+    (acessado,) = cache.conn.execute("SELECT acessado FROM paginas").fetchone()
+    assert acessado == agora[0]
+    cache.fechar()
+
+
+def test_banco_travado_por_outro_processo_nao_derruba_o_scrape(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_paginas, "ESPERA_BLOQUEIO", 0.05)
+    caminho = tmp_path / "c.sqlite"
+    cache = CachePaginas(caminho)
+    outro = sqlite3.connect(caminho)
+    outro.execute("BEGIN IMMEDIATE")
+
+    cache.guardar(_link(1), {"n": 1})
+    assert cache.falhas_escrita == 1
+
+    outro.rollback()
+    outro.close()
+    cache.guardar(_link(1), {"n": 1})
+    assert cache.buscar(_link(1)) == {"n": 1}
+    cache.fechar()
@@ -0,0 +1,53 @@
+from candidatos import IndiceCandidatos, parear_candidatos
+
+PRINCIPAL = "Smart Tv LG 50 4k Uhd Hdr Thinq Ai Pro Wi-fi Bluetooth Alexa Apple Airplay - 50tu801c0sa"
+
+LG = [
+    f"Smart TV LG 50'' 4K UHD 50TU801C0SA {extra}"
+    for extra in (
+        "Preta", "Bivolt", "Wi-Fi", "Bluetooth", "ThinQ AI", "HDR10", "Alexa", "Airplay",
+        "Original", "Nota Fiscal", "Garantia", "Lançamento", "Promoção", "Oferta", "Envio Rápido",
+    )
+]
+OUTRAS = [
+    f"Smart TV {marca} {pol}'' {modelo}"
+    for marca, pol, modelo in (
+        ("Samsung", 50, "UN50CU7700"), ("Samsung", 55, "UN55CU8000"), ("TCL", 50, "50P755"),
+        ("TCL", 43, "43S5400A"), ("Philco", 50, "PTV50G2SGTSSBL"), ("Philco", 32, "PTV32G23AGSSBL"),
+        ("AOC", 43, "43S5135"), ("AOC", 50, "50U6305"), ("Sony", 55, "KD-55X75K"), ("Sony", 65, "KD-65X80K"),
+        ("Multilaser", 32, "TL042M"), ("Semp", 43, "43RK8500"), ("Hisense", 50, "50A51HUA"),
+        ("Toshiba", 55, "55C350LS"), ("Panasonic", 50, "TC50JX700B"), ("Britania", 32, "BTV32G7PR2CSBLH"),
+    )
+]
+
+
+def test_sku_dominante_continua_encontrado():
+    # Quase metade das ofertas é o mesmo SKU: os n-gramas do código estão em
+    # mais de 30% dos títulos e mesmo assim precisam pesar
+    ofertas = [{"concorrente": t, "link": f"l{i}"} for i, t in enumerate(LG + OUTRAS)]
+
+    pares = parear_candidatos([PRINCIPAL], ofertas)
+    assert len(pares) and set(pares["concorrente"]) <= set(LG)
+
+    todos = parear_candidatos([PRINCIPAL], ofertas, k=len(LG), minimo=0.05)
+    assert set(todos["concorrente"]) == set(LG)
+
+
+def test_buscar_ordena_por_similaridade_e_expande_titulos_repetidos():
+    titulos = ["Smart TV LG 50'' 50TU801C0SA", "Smart TV Samsung 43'' UN43T5300", "Smart TV LG 50'' 50TU801C0SA"] + OUTRAS
+    indice = IndiceCandidatos(titulos)
+    achados = indice.buscar(["TV LG 50TU801C0SA", "Samsung UN43T5300"], k=1)
+
+    assert [j for j, _ in achados[0]] == [0, 2]
+    assert [j for j, _ in achados[1]] == [1]
+    assert all(0 < v <= 1 for lista in achados for _, v in lista)
+
+
+
+def test_parear_descarta_compatibilidade_antiga():
+    # Veredito de uma execução contra outro principal não pode virar "já decidido"
+    ofertas = [{"concorrente": LG[0], "principal": "TV antiga", "compatibilidade": "SIM", "similaridade": 0.9}]
+    pares = parear_candidatos([PRINCIPAL], ofertas)
+
+    assert list(pares.columns) == ["concorrente", "principal", "similaridade"]
+    assert pares["principal"].tolist() == [PRINCIPAL]
@@ -0,0 +1,34 @@
+from canonico import deduplicar, id_item, url_canonica
+
+ANUNCIO = "https://produto.mercadolivre.com.br/MLB-1234567890-smart-tv-lg-50-_JM"
+CATALOGO = "https://www.mercadolivre.com.br/smart-tv-lg-50/p/MLB52058084"
+
+
+def test_url_canonica_tira_rastreamento():
+    assert url_canonica(ANUNCIO + "?tracking_id=abc&searchVariation=1#position=3&search_layout=grid") == ANUNCIO
+    assert url_canonica("HTTPS://WWW.MercadoLivre.com.br/smart-tv-lg-50/p/MLB52058084/") == CATALOGO
+    # Sem ID, a query é o que faz o redirecionador funcionar: só cai o fragmento
+    patrocinado = "https://click1.mercadolivre.com.br/mclics/clicks/external/MLB/count?a=xyz"
+    assert url_canonica(patrocinado + "#pos=1") == patrocinado
+
+
+def test_id_item():
+    assert id_item(ANUNCIO) == "MLB1234567890"
+    assert id_item("https://www.mercadolivre.com.br/anuncio/MLB1234567890") == "MLB1234567890"
+    assert id_item(CATALOGO + "?pdp_filters=official_store%3A1614") == "p/MLB52058084"
+    assert id_item("https://www.mercadolivre.com.br/ofertas") is None
+
+
+def test_deduplicar_rastreamento_e_catalogo():
+    itens = [
+        {"href": ANUNCIO + "#position=1", "titulo": "1º"},
+        {"href": ANUNCIO + "?tracking_id=abc#position=7", "titulo": "repetido"},
+        {"href": CATALOGO + "?pdp_filters=official_store%3A1614#reco=1", "titulo": "catálogo"},
+        {"href": "https://www.mercadolivre.com.br/outro-nome/p/MLB52058084#position=9", "titulo": "mesmo /p/"},
+    ]
+    unicos, stats = deduplicar(itens)
+
+    assert [it["titulo"] for it in unicos] == ["1º", "catálogo"]
+    assert [it["href"] for it in unicos] == [ANUNCIO, CATALOGO]
+    assert [it["id"] for it in unicos] == ["MLB1234567890", "p/MLB52058084"]
+    assert stats["removidos"] == 2 and stats["por_id"] == 2
@@ -0,0 +1,46 @@
+from captura_json import ENDPOINTS_JSON, CHAVES, ids_do_link, mapear_payload
+
+LINK = "https://produto.mercadolivre.com.br/MLB-1234567890-smart-tv-lg-50-_JM#position=3"
+
+
+def _novos():
+    return {c: None for c in CHAVES}, {c: None for c in CHAVES}
+
+
+def test_payload_de_recomendacao_nao_preenche_campos():
+    campos, origem = _novos()
+    ids = ids_do_link(LINK)
+    recomendacoes = {
+        "results": [
+            {"id": "MLB999", "title": "Suporte de parede", "price": 89.9, "seller_id": 1},
+            {"id": "MLB998", "title": "Controle remoto", "price": 39.9, "seller_id": 2},
+        ]
+    }
+    assert not mapear_payload(recomendacoes, campos, origem, "https://api.mercadolibre.com/items", ids=ids)
+    assert campos == _novos()[0]
+    assert "vendedor" not in ids
+
+
+def test_item_preenche_so_titulo_e_preco_e_ignora_aninhados():
+    campos, origem = _novos()
+    ids = ids_do_link(LINK)
+    _, escopo, permitidos = ENDPOINTS_JSON[0]
+    item = {
+        "id": "MLB1234567890",
+        "seller_id": 42,
+        "price": 2199.9,
+        "title": "Smart TV LG 50 4K 50TU801C0SA",
+        "sold_quantity": 500,
+        "relacionados": [{"id": "MLB777", "title": "Outro", "nickname": "OUTRA_LOJA"}],
+    }
+    assert mapear_payload(item, campos, origem, "https://api.mercadolibre.com/items/MLB1234567890", escopo, permitidos, ids)
+    assert campos["titulo"] == "Smart TV LG 50 4K 50TU801C0SA"
+    assert campos["preco"] == 2199.9
+    assert campos["loja"] is None and campos["qtd_vendida"] is None
+    assert ids["vendedor"] == {"42"}
+
+    # Vendedor: só o do anúncio, não o de um payload de outros vendedores
+    _, escopo, permitidos = ENDPOINTS_JSON[1]
+    assert not mapear_payload({"id": 7, "nickname": "DECOY"}, campos, origem, "https://api.mercadolibre.com/users/7", escopo, permitidos, ids)
+    assert mapear_payload({"id": 42, "nickname": "LG_OFICIAL"}, campos, origem, "https://api.mercadolibre.com/users/42", escopo, permitidos, ids)
+    assert campos["loja"] == "LG_OFICIAL"
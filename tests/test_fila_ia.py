@@ -0,0 +1,26 @@
+from fila_ia import PENDENTE, FilaIA, abrir_fila_ia
+
+
+def test_falha_espera_e_conclusao(tmp_path):
+    fila = FilaIA(tmp_path / "fila.sqlite", backoff_base=3600)
+    assert fila.adicionar("TV LG", "TV Samsung", RuntimeError("429")) == PENDENTE
+
+    vereditos = [PENDENTE, None, "SIM"]
+    mascara = fila.a_reprocessar(["TV LG", "TV LG", "TV LG"], ["TV Samsung", "TV Philco", "TV LG"], vereditos)
+    # O par que falhou ainda está no backoff; o sem veredito vai; o resolvido não
+    assert mascara.tolist() == [False, True, False]
+
+    fila.concluir(["TV LG"], ["TV Samsung"])
+    mascara = fila.a_reprocessar(["TV LG"], ["TV Samsung"], [PENDENTE])
+    assert mascara.tolist() == [True]
+    fila.fechar()
+
+
+def test_abrir_fila_ia_compartilha_e_reabre_depois_de_fechar(tmp_path):
+    caminho = tmp_path / "fila.sqlite"
+    fila = abrir_fila_ia(caminho)
+    assert abrir_fila_ia(caminho) is fila
+    fila.fechar()
+    nova = abrir_fila_ia(caminho)
+    assert nova is not fila
+    nova.fechar()
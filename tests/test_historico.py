@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+
+from historico import HistoricoPrecos
+
+LINK = "https://produto.mercadolivre.com.br/MLB-1234567890-smart-tv-_JM"
+
+
+def _meio_dia():
+    # Longe da meia-noite: as coletas do mesmo teste caem no dia esperado
+    return datetime.now().replace(hour=12, minute=0, second=0, microsecond=0).timestamp()
+
+
+def _coleta(preco, loja="L1", compat="SIM", link=LINK):
+    return [{"principal": "TV LG 50", "concorrente": "TV LG", "Preço": preco, "Loja": loja, "link": link, "compatibilidade": compat}]
+
+
+@pytest.fixture
+def historico(tmp_path):
+    h = HistoricoPrecos(tmp_path / "h.sqlite")
+    yield h
+    h.fechar()
+
+
+def test_tendencia_com_um_dia_so(historico):
+    agora = _meio_dia()
+    historico.registrar(_coleta("R$ 2.199,90"), coletado=agora - 60)
+    historico.registrar(_coleta("R$ 2.099,90"), coletado=agora)
+
+    tendencia = historico.tendencia(produto="TV LG 50")
+    # Duas coletas no mesmo dia: um ponto (o mínimo) e nenhuma reta
+    assert [minimo for _, minimo in tendencia["serie"]] == [209990]
+    assert tendencia["centavos_por_dia"] is None
+
+
+def test_tendencia_caindo_e_consultas(historico):
+    agora = _meio_dia()
+    for dias_atras, preco in ((3, "R$ 2.300,00"), (2, "R$ 2.200,00"), (1, "R$ 2.100,00")):
+        historico.registrar(_coleta(preco), coletado=agora - dias_atras * 86400)
+    historico.registrar(_coleta("R$ 1.500,00", loja="L2", compat="NÃO", link=LINK + "?tracking_id=x"), coletado=agora - 86400)
+
+    assert historico.tendencia(produto="TV LG 50", apenas_compativeis=True)["centavos_por_dia"] == pytest.approx(-10000)
+    assert historico.ultimo_preco(produto="TV LG 50")["preco_centavos"] == 150000
+    assert historico.mais_barato(item=LINK)["preco_centavos"] == 210000
+    assert historico.faixa(produto="TV LG 50")["observacoes"] == 4
+    assert historico.tendencia(produto="outro")["serie"] == []
+
+
+def test_consulta_exige_produto_ou_item(historico):
+    with pytest.raises(ValueError):
+        historico.faixa()
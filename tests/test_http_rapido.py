@@ -0,0 +1,142 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_rapido import coletar_detalhes, extrair_campos_html
+from limitador import LimitadorPorHost
+
+JSON_LD = {
+    "@type": "Product",
+    "name": "Smart TV LG 50TU801C0SA",
+    "offers": {"price": 2199.9, "seller": {"name": "Loja LG"}},
+}
+
+PAGINAS = {
+    "/jsonld": f"""
+        <html><head><script type="application/ld+json">{json.dumps(JSON_LD)}</script></head>
+        <body><h1 class="ui-pdp-title">Outro título</h1></body></html>
+    """,
+    "/seletores": """
+        <html><body>
+          <h1 class="ui-pdp-title">Smart TV LG 50TU801C0SA</h1>
+          <span class="andes-money-amount__fraction">2.099</span>
+          <span class="price-tag-fraction">1.999</span>
+          <span class="andes-money-amount__cents">90</span>
+          <span class="ui-pdp-seller__label-text-with-icon">Loja Oficial<svg><title>ícone</title></svg> verificada</span>
+          <p class="ui-pdp-seller__header__subtitle">+1000 vendidos</p>
+        </body></html>
+    """,
+    "/sem-loja": """
+        <html><body>
+          <h1>Smart TV</h1>
+          <span class="andes-money-amount__fraction">1.999</span>
+        </body></html>
+    """,
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.acessos.append(self.path)
+        if self.path == "/limitado":
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.end_headers()
+            return
+        corpo = PAGINAS.get(self.path)
+        if corpo is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        dados = corpo.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.acessos = []
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv, f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def _coletar(itens, limitador=None):
+    via_navegador = []
+
+    def montar(it, campos):
+        return {**campos, "link": it["href"], "via": "http"}
+
+    async def fallback(faltantes):
+        via_navegador.extend(it["href"] for it in faltantes)
+        return [{"link": it["href"], "via": "navegador"} for it in faltantes]
+
+    resultados, stats = asyncio.run(coletar_detalhes(itens, montar, fallback, limitador=limitador))
+    return resultados, stats, via_navegador
+
+
+def test_jsonld_tem_precedencia(servidor):
+    _, base = servidor
+    resultados, stats, via_navegador = _coletar([{"href": f"{base}/jsonld"}])
+
+    assert resultados[0]["titulo"] == "Smart TV LG 50TU801C0SA"
+    assert resultados[0]["preco"] == 2199.9
+    assert resultados[0]["loja"] == "Loja LG"
+    assert stats["http"] == 1 and not via_navegador
+
+
+def test_seletores_seguem_a_cascata_de_extracao(servidor):
+    _, base = servidor
+    resultados, _, via_navegador = _coletar([{"href": f"{base}/seletores"}])
+
+    campos = resultados[0]
+    assert campos["titulo"] == "Smart TV LG 50TU801C0SA"
+    # price-tag-fraction vem antes de andes-money-amount__fraction em CASCATA
+    assert campos["preco"] == "R$ 1.999,90"
+    # "primeiro_no": só o primeiro nó de texto do rótulo
+    assert campos["loja"] == "Loja Oficial"
+    assert campos["qtd_vendida"] == "+1000 vendidos"
+    assert not via_navegador
+
+
+def test_campos_faltando_vao_para_o_navegador(servidor):
+    _, base = servidor
+    itens = [{"href": f"{base}/jsonld"}, {"href": f"{base}/sem-loja"}, {"href": f"{base}/nao-existe"}]
+    resultados, stats, via_navegador = _coletar(itens)
+
+    assert via_navegador == [f"{base}/sem-loja", f"{base}/nao-existe"]
+    assert [r["via"] for r in resultados] == ["http", "navegador", "navegador"]
+    assert stats == {"total": 3, "http": 1, "navegador": 2, "falhas": 0}
+
+
+def test_429_reduz_a_taxa_do_host(servidor):
+    srv, base = servidor
+    limitador = LimitadorPorHost(backoff_base=0.05, backoff_max=0.1)
+    resultados, _, via_navegador = _coletar([{"href": f"{base}/limitado"}], limitador=limitador)
+
+    host = limitador.para(base)
+    assert srv.acessos == ["/limitado"]
+    assert via_navegador == [f"{base}/limitado"]
+    assert resultados[0]["via"] == "navegador"
+    assert host.reducoes == 1 and host.taxa < 4.0
+
+
+def test_html_sem_nada_devolve_none():
+    assert extrair_campos_html("<html><body><p>vazio</p></body></html>") == {
+        "titulo": None,
+        "preco": None,
+        "loja": None,
+        "qtd_vendida": None,
+    }
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+
+from limitador import LimitadorHost, LimitadorPorHost, config_por_processo
+
+
+def test_429_reduz_a_taxa_e_pausa_o_host():
+    lim = LimitadorHost(taxa_inicial=8.0, fator_reducao=0.5, backoff_base=2.0)
+    lim.registrar(latencia=0.2, status=429)
+
+    assert lim.taxa == 4.0
+    assert lim.reducoes == 1 and lim.tokens == 0.0
+    assert 1.0 <= lim.pausado_ate - time.monotonic() <= 2.0
+
+    # Falhas seguidas dobram o teto do backoff; a taxa não passa do mínimo
+    lim.registrar(status=503)
+    lim.registrar(captcha=True)
+    assert lim.taxa == 1.0 and lim.falhas_seguidas == 3
+    for _ in range(5):
+        lim.registrar(erro=True)
+    assert lim.taxa == lim.taxa_min
+
+
+def test_aumento_aditivo_e_lentidao():
+    lim = LimitadorHost(taxa_inicial=2.0, aumento=0.5, alvo_latencia=3.0)
+    lim.registrar(latencia=0.5, status=200)
+    assert lim.taxa == pytest.approx(2.25)
+    lim.registrar(latencia=5.0, status=200)
+    assert lim.taxa == pytest.approx(2.025)
+    assert lim.falhas_seguidas == 0
+
+
+def test_requisicao_por_host_registra_status():
+    limitador = LimitadorPorHost(taxa_inicial=10.0, backoff_base=0.01, backoff_max=0.01)
+
+    async def rodar():
+        async with limitador.requisicao("https://a.com/x") as req:
+            req.resposta(429)
+        async with limitador.requisicao("https://b.com/y") as req:
+            req.resposta(200)
+
+    asyncio.run(rodar())
+    assert limitador.hosts["a.com"].taxa == 5.0
+    assert limitador.hosts["b.com"].taxa > 10.0
+
+
+def test_config_por_processo_reparte_a_taxa():
+    config = config_por_processo(4, taxa_max=8.0)
+    assert config["taxa_inicial"] == 1.0 and config["taxa_max"] == 2.0
+    assert config["taxa_min"] == 0.0625 and config["rajada"] == 1
+    assert LimitadorPorHost(**config).para("https://a.com").taxa == 1.0
@@ -0,0 +1,119 @@
+import json
+import re
+
+import httpx
+
+from ia_lote import interpretar_resposta
+from motor_ia import classificar_em_paralelo
+
+PROMPT = """
+Compare os dois produtos abaixo e diga somente SIM ou NÃO.
+
+Produto principal: {principal}
+Produto concorrente: {concorrente}
+"""
+CRITERIO = "Exija pelo menos 97% de similaridade."
+
+
+def interpretar(conteudo):
+    return "SIM" if re.search(r"\bSIM\b", conteudo.upper()) else "NÃO"
+
+
+def _completion(conteudo):
+    return {
+        "id": "chatcmpl-teste",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "modelo-teste",
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": conteudo}, "finish_reason": "stop"}
+        ],
+        "usage": {"prompt_tokens": 40, "completion_tokens": 5, "total_tokens": 45},
+    }
+
+
+class _API:
+    """Groq falso: responde SIM quando o concorrente traz "LG", com um 429 na primeira chamada."""
+
+    def __init__(self, falhar_sempre=False):
+        self.falhar_sempre = falhar_sempre
+        self.chamadas = 0
+
+    def __call__(self, request):
+        self.chamadas += 1
+        if self.falhar_sempre:
+            return httpx.Response(500, headers={"retry-after-ms": "1"}, json={"error": {"message": "fora do ar"}})
+        if self.chamadas == 1:
+            return httpx.Response(429, headers={"retry-after-ms": "10"}, json={"error": {"message": "limite"}})
+
+        corpo = json.loads(request.content)
+        prompt = corpo["messages"][0]["content"]
+        cabecalhos = {"x-ratelimit-limit-tokens": "6000", "x-ratelimit-remaining-tokens": "5000"}
+        if "Candidatos:" in prompt:
+            # Lote: modo JSON e sem teto de tokens (o raciocínio do modelo não pode cortar o JSON)
+            assert corpo["response_format"] == {"type": "json_object"}
+            assert "max_tokens" not in corpo
+            candidatos = re.findall(r"^(\d+)\. (.*)$", prompt, re.MULTILINE)
+            vereditos = [{"id": int(i), "compativel": "SIM" if "LG" in c else "NÃO"} for i, c in candidatos]
+            return httpx.Response(200, headers=cabecalhos, json=_completion(json.dumps({"vereditos": vereditos})))
+        concorrente = prompt.split("Produto concorrente:")[1]
+        return httpx.Response(200, headers=cabecalhos, json=_completion("SIM" if "LG" in concorrente else "NÃO"))
+
+
+def _classificar(api, **kwargs):
+    principais = ["TV LG 50", "TV LG 50", "TV LG 50", "TV Samsung 55"]
+    concorrentes = ["Smart TV LG 50UR", "TV Philco 50", "Smart TV LG 50UR", "TV LG 55"]
+    cliente = httpx.AsyncClient(transport=httpx.MockTransport(api))
+    return classificar_em_paralelo(
+        principais, concorrentes, "chave-teste", "modelo-teste", PROMPT, interpretar,
+        rpm=1000, tpm=100_000, http_client=cliente, **kwargs,
+    )
+
+
+def test_um_par_por_requisicao():
+    api = _API()
+    assert _classificar(api) == ["SIM", "NÃO", "SIM", "SIM"]
+    # 3 pares distintos + o 429 repetido
+    assert api.chamadas == 4
+
+
+def test_em_lote():
+    api = _API()
+    assert _classificar(api, criterio_lote=CRITERIO) == ["SIM", "NÃO", "SIM", "SIM"]
+    # Um lote por principal + o 429 repetido
+    assert api.chamadas == 3
+
+
+def test_falha_vira_pendente_e_vai_para_a_fila():
+    class Fila:
+        def __init__(self):
+            self.pares = []
+
+        def adicionar(self, principal, concorrente, erro=None):
+            self.pares.append((principal, concorrente))
+            return "PENDENTE"
+
+    fila = Fila()
+    vereditos = _classificar(_API(falhar_sempre=True), criterio_lote=CRITERIO, falha="PENDENTE", fila=fila)
+
+    assert vereditos == ["PENDENTE"] * 4
+    assert sorted(fila.pares) == [
+        ("TV LG 50", "Smart TV LG 50UR"),
+        ("TV LG 50", "TV Philco 50"),
+        ("TV Samsung 55", "TV LG 55"),
+    ]
+
+
+def test_interpretar_resposta_aceita_objeto_array_e_cerca():
+    assert interpretar_resposta('{"vereditos": [{"id": 2, "compativel": "nao"}, {"id": 1, "compativel": true}]}', 2) == ["SIM", "NÃO"]
+    assert interpretar_resposta('```json\n[{"id": 1, "compativel": "SIM"}, {"id": 2, "compativel": "talvez"}]\n```', 2) == ["SIM", None]
+    assert interpretar_resposta('["NÃO", "SIM"]', 2) == ["NÃO", "SIM"]
+
+
+def test_interpretar_resposta_recusa_lote_com_ids_fora_de_1_a_n():
+    # id fora da faixa, repetido, faltando ou misturado com itens sem id: o lote todo cai
+    assert interpretar_resposta('[{"id": 2, "compativel": "NÃO"}, {"id": 9, "compativel": "SIM"}]', 2) == [None, None]
+    assert interpretar_resposta('[{"id": 1, "compativel": "SIM"}, {"id": 1, "compativel": "NÃO"}]', 2) == [None, None]
+    assert interpretar_resposta('{"vereditos": [{"id": 1, "compativel": "SIM"}]}', 2) == [None, None]
+    assert interpretar_resposta('[{"id": 1, "compativel": "SIM"}, "NÃO"]', 2) == [None, None]
+    assert interpretar_resposta("sem json", 2) == [None, None]
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from normalizacao import centavos_de, preco_centavos, qtd_vendida_min, vendidos_min_de
+
+PRECOS = ["R$ 2.199,90", "2199.00", "R$\xa089,90", "2.199", "2199.5", "Indisponível", None]
+CENTAVOS = [219990, 219900, 8990, 219900, 219950, None, None]
+
+VENDIDOS = ["+2,5 mil vendidos", "+10mil vendidos", "+1.000 vendidos", "+1 mi vendidos", "Mais de 50 vendidos", "Não informado"]
+MINIMOS = [2500, 10000, 1000, 1_000_000, 50, None]
+
+
+def _lista(serie):
+    return [None if pd.isna(v) else int(v) for v in serie]
+
+
+def test_preco_centavos_vetorizado_e_escalar():
+    assert _lista(preco_centavos(PRECOS)) == CENTAVOS
+    assert [centavos_de(p) for p in PRECOS] == CENTAVOS
+    assert str(preco_centavos(PRECOS).dtype) == "Int64"
+
+
+def test_preco_numerico_sem_erro_de_float():
+    assert _lista(preco_centavos(pd.Series([2199.9, 0.29]))) == [219990, 29]
+    assert centavos_de(0.29) == 29
+
+
+def test_qtd_vendida_min_vetorizado_e_escalar():
+    assert _lista(qtd_vendida_min(VENDIDOS)) == MINIMOS
+    assert [vendidos_min_de(v) for v in VENDIDOS] == MINIMOS
@@ -0,0 +1,31 @@
+import pyarrow as pa
+
+from oferta import ESQUEMA_ARROW, ESQUEMA_RASPAGEM, Oferta, Ofertas
+
+REGISTRO = {
+    "principal": "Smart TV LG 43 4K",
+    "Preço": "R$ 2.199,90",
+    "Loja": "LG",
+    "qtd_vendida": "+2,5 mil vendidos",
+    "link": "https://produto.mercadolivre.com.br/MLB-1234567890-tv-_JM",
+    "concorrente": "Smart Tv De 43 LG",
+}
+
+
+def test_registro_da_raspagem_vira_oferta_tipada():
+    oferta = Oferta.de_registro(REGISTRO, ESQUEMA_RASPAGEM)
+    assert (oferta.produto, oferta.titulo) == ("Smart Tv De 43 LG", "Smart TV LG 43 4K")
+    assert (oferta.preco_centavos, oferta.qtd_vendida_min, oferta.item) == (219990, 2500, "MLB1234567890")
+
+
+def test_colecao_exporta_e_continua_recebendo():
+    ofertas = Ofertas.de_registros([REGISTRO, {**REGISTRO, "Preço": None, "Loja": "LG"}], ESQUEMA_RASPAGEM)
+    tabela = ofertas.para_arrow()
+    df = ofertas.para_pandas()
+
+    ofertas.adicionar(Oferta("Outro produto", preco_centavos=100))
+    assert tabela.schema == ESQUEMA_ARROW and tabela.num_rows == 2
+    assert tabela.column("preco_centavos").to_pylist() == [219990, None]
+    assert pa.types.is_dictionary(tabela.column("loja").type)
+    assert df["preco_centavos"].tolist()[0] == 219990 and len(ofertas) == 3
+    assert ofertas.loja.valores == ["LG"]
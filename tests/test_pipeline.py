@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from pipeline import executar_pipeline
+
+
+class _Aba:
+    def is_closed(self):
+        return False
+
+    async def close(self):
+        pass
+
+
+class _Context:
+    async def new_page(self):
+        return _Aba()
+
+
+class _Escritor:
+    def __init__(self, falhar_em=None):
+        self.falhar_em = falhar_em
+        self.linhas = []
+        self.fechado = False
+
+    def escrever(self, registro):
+        if len(self.linhas) == self.falhar_em:
+            raise OSError("disco cheio")
+        self.linhas.append(registro)
+
+    def fechar(self):
+        self.fechado = True
+
+
+async def _extrair(aba, it):
+    await asyncio.sleep(0)
+    return {"link": it["href"]}
+
+
+def _itens(n):
+    return [{"href": f"https://x/{i}"} for i in range(n)]
+
+
+def test_ordem_da_listagem_e_escritores():
+    escritor = _Escritor()
+    resultados = asyncio.run(
+        executar_pipeline(_Context(), _itens(20), _extrair, lambda r: "SIM", [escritor], max_abas=3, max_ia=2, tamanho_fila=2)
+    )
+    assert [r["link"] for r in resultados] == [f"https://x/{i}" for i in range(20)]
+    assert len(escritor.linhas) == 20 and escritor.fechado
+
+
+def test_erro_no_gravador_nao_trava_as_outras_etapas():
+    escritor = _Escritor(falhar_em=2)
+
+    async def rodar():
+        with pytest.raises(OSError):
+            await asyncio.wait_for(
+                executar_pipeline(_Context(), _itens(50), _extrair, lambda r: "SIM", [escritor], max_abas=2, max_ia=2, tamanho_fila=2),
+                timeout=5,
+            )
+        # Nenhuma tarefa do pipeline fica pendurada numa fila depois do erro
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(rodar())
+    assert escritor.fechado
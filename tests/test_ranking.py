@@ -0,0 +1,25 @@
+import pandas as pd
+
+from ranking import ranking_por_principal
+
+
+def _valores(serie):
+    return [None if pd.isna(v) else v for v in serie]
+
+
+def test_ranking_e_preco_indicado_por_principal():
+    df = pd.DataFrame({
+        "principal": ["TV A"] * 5 + ["TV B"] * 2,
+        "Loja": ["Comprebel (Oficial)", "L1", "L2", "L3", "L4", "L5", "L6"],
+        "Preço": ["R$ 2.500,00", "R$ 2.100,00", "R$ 1.900,00", "R$ 1.800,00", "sem preço", "R$ 999,90", "R$ 1.099,00"],
+        "compatibilidade": ["SIM", "SIM", "SIM", "NÃO", "SIM", "SIM", None],
+        "qtd_vendida": ["+100 vendidos"] * 7,
+    })
+    df = ranking_por_principal(df)
+
+    # Incompatível fica sem ranking; sem preço vai para o fim
+    assert _valores(df["ranking"]) == [3, 2, 1, None, 4, 1, None]
+    # 3º compatível com preço em A; B só tem um, então vale o mais caro disponível
+    assert _valores(df["preco_indicado_centavos"]) == [250000] * 5 + [99990] * 2
+    assert _valores(df["preco_oficial_centavos"]) == [250000] * 5 + [None] * 2
+    assert df["preço_indicado"].iloc[-1] == 999.9